@@ -1,189 +1,203 @@
 # Author: Colin Francis
 # Description: Code for back propagation algorithm used to solve Sudoku puzzles
 import time
+from geometry import Geometry, get_geometry, box_size_for, MAX_BOX_SIZE
+from solve_result import SolveResult, Budget, make_result, stats_wanted, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+
+DOT = ord('.')  # the stored value of an empty square
+
+# kinds of the steps yielded by SolveSudoku.steps
+PLACE, REMOVE, BACKTRACK = 'place', 'remove', 'backtrack'
+
+# a checkpoint holds the 81 squares, the preset bitmask and the search position
+PRESET_BYTES = 11
+CHECKPOINT_SIZE = 81 + PRESET_BYTES + 1
+
+
+def checkpoint_layout(cell_count: int) -> tuple:
+    """
+    Returns the layout of a checkpoint for a board with `cell_count` squares. A 9x9
+    checkpoint is CHECKPOINT_SIZE bytes.
+
+    :param cell_count: The number of squares of the board.
+    :return: A tuple containing the number of bytes of the preset bitmask, the number of
+        bytes of the search position and the total size.
+    """
+    preset_bytes = (cell_count + 7) // 8
+    position_bytes = 1 if cell_count < 255 else 2
+    return preset_bytes, position_bytes, cell_count + preset_bytes + position_bytes
 
 
 class SolveSudoku(object):
-    """A class used to solve Sudoku puzzles."""
-    def __init__(self, puzzle):
-        """Creates a SolveSudoku object with a puzzle attribute."""
-        self._puzzle = Puzzle(puzzle)
-
-    def solve(self):
-        """
-        Used to solve Sudoku puzzles.
-
-        :return:
-        """
-        row_index, col_index = 0, 0
-        start_time = time.perf_counter()
-        while not self._solved():
-            if col_index > 8:
-                col_index = 0
-                row_index += 1
-
-            if self._puzzle.get_number(row_index, col_index) == '.' and not \
-                    self._puzzle.is_preset(row_index, col_index):
-                for number in range(1, 10):
-                    if not self._in_row(row_index, str(number)) and not self._in_col(col_index, str(number)) and not \
-                            self._in_square(row_index, col_index, str(number)):
-                        self._puzzle.set(row_index, col_index, str(number))
-                        col_index += 1
-                        break
-                else:
-                    row_index, col_index = self._back_prop(row_index, col_index - 1)
-            elif not self._puzzle.is_preset(row_index, col_index):
-                start_number = int(self._puzzle.get_number(row_index, col_index)) + 1
-                for number in range(start_number, 10):
-                    if not self._in_row(row_index, str(number)) and not self._in_col(col_index, str(number)) and not \
-                            self._in_square(row_index, col_index, str(number)):
-                        self._puzzle.set(row_index, col_index, str(number))
-                        col_index += 1
-                        break
-                else:
-                    self._puzzle.set(row_index, col_index, '.')
-                    row_index, col_index = self._back_prop(row_index, col_index - 1)
-            else:
-                col_index += 1
-            print(self)
-        end_time = time.perf_counter()
-        print("Solution Speed: {:.2f}s".format(end_time - start_time))
+    """
+    A class used to solve Sudoku puzzles. The search walks forwards and backwards over
+    the variable squares in row-major order. Its whole state is the puzzle and the
+    position in that walk, so it can be saved with `checkpoint` at any step and carried on
+    later, even in another process, with `restore`.
+    """
+    def __init__(self, puzzle, box_size: int = None, geometry: Geometry = None):
+        """Creates a SolveSudoku object with puzzle and search position attributes."""
+        self._puzzle = Puzzle(puzzle, box_size, geometry)
+        self._check_count = 0
+        self._start_search()
+
+    @classmethod
+    def restore(cls, checkpoint: bytes, geometry: Geometry = None) -> 'SolveSudoku':
+        """
+        Creates a solver that carries on the search saved by `checkpoint`.
 
-    def _back_prop(self, row_index: int, col_index: int) -> tuple:
+        :param checkpoint: The bytes returned by `checkpoint`.
+        :param geometry: The layout of a variant puzzle, which is not part of the
+            checkpoint, or None for a standard board.
+        :return: A solver of this class with the saved puzzle and search position.
+        """
+        for box_size in range(1, MAX_BOX_SIZE + 1):
+            cell_count = box_size ** 4
+            preset_bytes, position_bytes, size = checkpoint_layout(cell_count)
+            if len(checkpoint) == size:
+                break
+        else:
+            sizes = ["{} ({}x{})".format(checkpoint_layout(box_size ** 4)[2], box_size ** 2, box_size ** 2)
+                     for box_size in range(1, MAX_BOX_SIZE + 1)]
+            raise ValueError("A checkpoint has {} bytes, got {}".format(', '.join(sizes), len(checkpoint)))
+        solver = cls(checkpoint[:cell_count], geometry=geometry)
+        solver._puzzle.set_presets(int.from_bytes(checkpoint[cell_count:cell_count + preset_bytes], 'big'))
+        solver._start_search()
+        solver._square_index = int.from_bytes(checkpoint[-position_bytes:], 'big') - 1
+        return solver
+
+    def checkpoint(self) -> bytes:
         """
-        Recursively moves backwards through the Sudoku puzzle until a non-preset
-        value less than 9 is found.
+        Saves the state of the search: the 81 squares, the preset squares and the position
+        in the walk over the variable squares.
 
-        :param row_index: The current row index in the puzzle.
-        :param col_index: The current column index in the puzzle
-        :return: A tuple containing the row index and column index where the
-            non-preset value was found.
+        :return: A byte string that can be passed to `restore`, CHECKPOINT_SIZE bytes for
+            a 9x9 puzzle.
         """
-        if col_index < 0:
-            col_index = 8
-            row_index -= 1
+        preset_bytes, position_bytes, _ = checkpoint_layout(len(self._puzzle.get_values()))
+        return bytes(self._puzzle.get_values()) + self._puzzle.get_presets().to_bytes(preset_bytes, 'big') + \
+            (self._square_index + 1).to_bytes(position_bytes, 'big')
 
-        # base case
-        if self._puzzle.get_number(row_index, col_index) != '9' and not self._puzzle.is_preset(row_index, col_index):
-            return row_index, col_index
+    def solve(self, budget: Budget = None, collect_stats: bool = False) -> SolveResult:
+        """
+        Used to solve Sudoku puzzles. Runs the search without any output until it ends or
+        the budget runs out; use `steps` to follow the search as it goes. Calling `solve`
+        again after the budget ran out carries on the same search.
+
+        :param budget: The limits of the solve, or None for no limits. Each number placed
+            counts as a search node.
+        :param collect_stats: If True, the result carries a SolveStats. Stats are also
+            collected while a stats hook is registered.
+        :return: A SolveResult that is truthy if a solution has been found.
+        """
+        budget = budget or Budget()
+        next_check = budget.start()
+        collect_stats = stats_wanted(collect_stats)
+        self._check_count = 0
+        node_count = backtrack_count = max_depth = 0
+        reason = None
+        for kind, _, _, _ in self.steps():
+            if kind == PLACE:
+                node_count += 1
+                if self._square_index > max_depth:
+                    max_depth = self._square_index
+                if node_count >= next_check:
+                    reason = budget.exceeded(node_count)
+                    if reason is not None:
+                        break
+                    next_check = budget.next_check(node_count)
+            elif kind == BACKTRACK:
+                backtrack_count += 1
 
-        if self._puzzle.get_number(row_index, col_index) == '9' and not self._puzzle.is_preset(row_index, col_index):
-            self._puzzle.set(row_index, col_index, '.')
-            return self._back_prop(row_index, col_index - 1)
-        elif self._puzzle.is_preset(row_index, col_index):
-            return self._back_prop(row_index, col_index - 1)
+        if reason is not None:
+            status = BUDGET_EXHAUSTED
+        else:
+            status = SOLVED if self._solved() else UNSOLVABLE
+        return make_result(type(self).__name__, status, node_count, budget.get_elapsed(), reason, collect_stats,
+                           self._check_count, backtrack_count, max_depth)
 
-    def _in_row(self, row_index: int, number: str) -> bool:
+    def steps(self):
+        """
+        Solves the puzzle one step at a time. Each change to the puzzle is yielded as a
+        (kind, row index, col index, number) tuple: PLACE when a number is placed in a
+        square, REMOVE when a square is cleared, and BACKTRACK when no number fits in a
+        square and the search turns back ('.' is given as the number of REMOVE and
+        BACKTRACK steps). The puzzle is up to date whenever a step is yielded, so callers
+        can print or draw it after every step, every few steps, or not at all. The search
+        carries on from where the last call stopped. A puzzle with a repeated number or a
+        character that is not a symbol yields no steps and ends the search unsolved.
+
+        :return: A generator of step tuples.
         """
-        Searches the Sudoku puzzle to see if `number` exists in the specified row index.
+        if not self._puzzle.is_valid():
+            self._square_index = -1
+            return
+        indices, squares = self._indices, self._squares
+        symbols = self._puzzle.get_geometry().symbols
+        while 0 <= self._square_index < len(squares):
+            index = indices[self._square_index]
+            row_index, col_index = squares[self._square_index]
+            number = self._puzzle.get_number(row_index, col_index)
+            # only numbers greater than the current one are left to try in this square
+            start_number = 0 if number == '.' else symbols.index(number) + 1
+            for number in symbols[start_number:]:
+                self._check_count += 1
+                if not self._in_peers(index, number):
+                    self._puzzle.set(row_index, col_index, number)
+                    self._square_index += 1
+                    yield PLACE, row_index, col_index, number
+                    break
+            else:
+                if start_number > 0:
+                    self._puzzle.set(row_index, col_index, '.')
+                    yield REMOVE, row_index, col_index, '.'
+                self._square_index -= 1  # back propagate
+                yield BACKTRACK, row_index, col_index, '.'
 
-        :param row_index: The row index in the Sudoku puzzle to search in.
-        :param number: The number to search for.
-        :return: True if the number is found in the row. Otherwise, False.
+    def _start_search(self) -> None:
         """
-        if number in self._puzzle.get_row(row_index):
-            return True
-        return False
+        Lists the variable squares in the order they are visited and moves the search to
+        the first of them.
+
+        :return: None.
+        """
+        geometry, presets = self._puzzle.get_geometry(), self._puzzle.get_presets()
+        self._indices = [index for index in range(geometry.cell_count) if not presets >> index & 1]
+        self._squares = [(geometry.row_of[index], geometry.col_of[index]) for index in self._indices]
+        self._square_index = 0
 
-    def _in_col(self, col_index: int, number: str) -> bool:
+    def _in_peers(self, index: int, number: str) -> bool:
         """
-        Searches the Sudoku puzzle to see if 'number' exists in the specified column
-        index.
+        Searches the peers of a square (the other squares of its row, column and square
+        region, and of any extra units of a variant puzzle) to see if `number` exists in
+        one of them.
 
-        :param col_index: The column index in the Sudoku puzzle to search in.
+        :param index: The index of the square (row by row).
         :param number: The number to search for.
-        :return: True if the number is found in the column. Otherwise, False.
+        :return: True if the number is found in a peer of the square. Otherwise, False.
         """
-        for row in self._puzzle.get_layout():
-            if row[col_index] == number:
+        values, value = self._puzzle.get_values(), ord(number)
+        for peer in self._puzzle.get_geometry().peers[index]:
+            if values[peer] == value:
                 return True
         return False
 
-    def _in_square(self, row_index: int, col_index: int, number: str) -> bool:
+    def _solved(self) -> bool:
         """
-        Searches the Sudoku puzzle to see if the `number` exists in the square
-        region of the Sudoku board as indicated by the specified row index and
-        column index.
+        Determines if a solution has been found, i.e. the search has filled every variable
+        square.
 
-        :param row_index: The row index of the Sudoku puzzle to search in.
-        :param col_index: The column index of the Sudoku puzzle to search
-            in.
-        :param number: The number to search for.
-        :return: True if the number is found in the square region. Otherwise,
-            False.
-        """
-        squares = {1: self._puzzle.get_layout()[0][:3] + self._puzzle.get_layout()[1][:3] +
-                   self._puzzle.get_layout()[2][:3],
-                   2: self._puzzle.get_layout()[0][3:6] + self._puzzle.get_layout()[1][3:6] +
-                   self._puzzle.get_layout()[2][3:6],
-                   3: self._puzzle.get_layout()[0][6:] + self._puzzle.get_layout()[1][6:] +
-                   self._puzzle.get_layout()[2][6:],
-                   4: self._puzzle.get_layout()[3][:3] + self._puzzle.get_layout()[4][:3] +
-                   self._puzzle.get_layout()[5][:3],
-                   5: self._puzzle.get_layout()[3][3:6] + self._puzzle.get_layout()[4][3:6] +
-                   self._puzzle.get_layout()[5][3:6],
-                   6: self._puzzle.get_layout()[3][6:] + self._puzzle.get_layout()[4][6:] +
-                   self._puzzle.get_layout()[5][6:],
-                   7: self._puzzle.get_layout()[6][:3] + self._puzzle.get_layout()[7][:3] +
-                   self._puzzle.get_layout()[8][:3],
-                   8: self._puzzle.get_layout()[6][3:6] + self._puzzle.get_layout()[7][3:6] +
-                   self._puzzle.get_layout()[8][3:6],
-                   9: self._puzzle.get_layout()[6][6:] + self._puzzle.get_layout()[7][6:] +
-                   self._puzzle.get_layout()[8][6:]
-                   }
-
-        if row_index == 0 or row_index == 1 or row_index == 2:
-            if 0 <= col_index < 3:
-                if number in squares[1]:
-                    return True
-                return False
-            elif 3 <= col_index < 6:
-                if number in squares[2]:
-                    return True
-                return False
-            else:
-                if number in squares[3]:
-                    return True
-                return False
-        elif row_index == 3 or row_index == 4 or row_index == 5:
-            if 0 <= col_index < 3:
-                if number in squares[4]:
-                    return True
-                return False
-            elif 3 <= col_index < 6:
-                if number in squares[5]:
-                    return True
-                return False
-            else:
-                if number in squares[6]:
-                    return True
-                return False
-        else:
-            if 0 <= col_index < 3:
-                if number in squares[7]:
-                    return True
-                return False
-            elif 3 <= col_index < 6:
-                if number in squares[8]:
-                    return True
-                return False
-            else:
-                if number in squares[9]:
-                    return True
-                return False
+        :return: True if a solution has been found. Otherwise, False.
+        """
+        return self._square_index == len(self._squares)
 
-    def _solved(self) -> bool:
+    def get_puzzle(self) -> 'Puzzle':
         """
-        Searches each row in the Sudoku puzzle to determine if a solution has been
-        found.
+        Returns the puzzle being solved, which holds the solution once `solve` succeeds.
 
-        :return: True if a solution has been found. Otherwise, False.
+        :return: The Puzzle object.
         """
-        if '.' in self._puzzle.get_row(0) or '.' in self._puzzle.get_row(1) or '.' in self._puzzle.get_row(2) or \
-                '.' in self._puzzle.get_row(3) or '.' in self._puzzle.get_row(4) or '.' in self._puzzle.get_row(5) or \
-                '.' in self._puzzle.get_row(6) or '.' in self._puzzle.get_row(7) or '.' in self._puzzle.get_row(8):
-            return False
-        return True
+        return self._puzzle
 
     def __str__(self):
         """Prints the current state of the puzzle in human-readable form."""
@@ -191,20 +205,52 @@ class SolveSudoku(object):
 
 
 class Puzzle(object):
-    """Represents a Sudoku puzzle."""
-    def __init__(self, puzzle):
-        """Creates a puzzle object with layout and preset_layout attributes."""
-        self._layout = puzzle
-        self._preset_layout = self._find_presets()
+    """
+    Represents a Sudoku puzzle. The squares are stored row by row in a single bytearray
+    of ASCII characters ('.' for an empty square) and the preset squares in an integer
+    mask with one bit per square. A 9x9 puzzle uses '1' - '9'; larger puzzles (16x16,
+    25x25) use the symbols of their Geometry, e.g. '1' - '9' and 'A' - 'G'.
+    """
+    __slots__ = ('_values', '_presets', '_geometry', '_size')
+
+    def __init__(self, puzzle, box_size: int = None, geometry: Geometry = None):
+        """
+        Creates a puzzle object with values, presets and geometry attributes.
+
+        :param puzzle: The puzzle as a matrix (list-of-lists) of one-character strings, or
+            in the line format (81 characters for 9x9) as a str, bytes or bytearray ('.'
+            or '0' for blanks). The puzzle is copied, so the caller's object is never
+            changed.
+        :param box_size: The side of a square region, e.g. 4 for 16x16. Defaults to the
+            box size that matches the number of squares.
+        :param geometry: The layout of a variant puzzle, e.g. from get_jigsaw_geometry or
+            get_diagonal_geometry. Defaults to the standard board of the box size.
+        """
+        if isinstance(puzzle, (bytes, bytearray)):
+            self._values = bytearray(puzzle)
+        elif isinstance(puzzle, str):
+            self._values = bytearray(puzzle, 'ascii')
+        else:
+            self._values = bytearray(''.join(''.join(row) for row in puzzle), 'ascii')
+        if geometry is None:
+            geometry = get_geometry(box_size_for(len(self._values)) if box_size is None else box_size)
+        self._geometry = geometry
+        self._size = self._geometry.size
+        if len(self._values) != self._geometry.cell_count:
+            raise ValueError("A {0}x{0} Sudoku puzzle has {1} squares, got {2}".format(
+                self._size, self._geometry.cell_count, len(self._values)))
+        if b'0' in self._values:
+            self._values[:] = self._values.replace(b'0', b'.')
+        self._presets = self._find_presets()
 
     def get_layout(self) -> list:
         """
         Returns the current layout of the Sudoku puzzle.
 
-        :return: A matrix (list-of-lists) representing the Sudoku puzzle in its
+        :return: A new matrix (list-of-lists) representing the Sudoku puzzle in its
             current state.
         """
-        return self._layout
+        return [self.get_row(row_index) for row_index in range(self._size)]
 
     def get_row(self, row_index: int) -> list:
         """
@@ -213,7 +259,16 @@ class Puzzle(object):
         :param row_index: The index of the row to get.
         :return: The row corresponding to the provided row index.
         """
-        return self._layout[row_index]
+        return list(self._values[row_index * self._size:(row_index + 1) * self._size].decode('ascii'))
+
+    def get_col(self, col_index: int) -> list:
+        """
+        Returns the column that corresponds to the specified column index.
+
+        :param col_index: The index of the column to get.
+        :return: The column corresponding to the provided column index.
+        """
+        return list(self._values[col_index::self._size].decode('ascii'))
 
     def get_number(self, row_index: int, col_index: int) -> str:
         """
@@ -225,7 +280,24 @@ class Puzzle(object):
         :return: The number corresponding to the specified row index and column
             index.
         """
-        return self._layout[row_index][col_index]
+        return chr(self._values[row_index * self._size + col_index])
+
+    def get_values(self) -> bytearray:
+        """
+        Returns the storage of the puzzle: one ASCII character per square, row by row,
+        with '.' for an empty square. The bytearray is shared with the puzzle, not copied.
+
+        :return: The bytearray holding the puzzle.
+        """
+        return self._values
+
+    def get_empty_count(self) -> int:
+        """
+        Returns the number of empty squares in the puzzle.
+
+        :return: The number of empty squares.
+        """
+        return self._values.count(b'.')
 
     def set(self, row_index: int, col_index: int, number: str) -> None:
         """
@@ -237,7 +309,7 @@ class Puzzle(object):
         :param number: The number to place in the puzzle.
         :return: None.
         """
-        self._layout[row_index][col_index] = number
+        self._values[row_index * self._size + col_index] = ord(number)
 
     def is_preset(self, row_index: int, col_index: int) -> bool:
         """
@@ -247,45 +319,97 @@ class Puzzle(object):
         :param col_index: The column corresponding to the value in the puzzle to check.
         :return: True if the value is preset. Otherwise, False.
         """
-        if self._preset_layout[row_index][col_index]:
-            return True
-        else:
-            return False
+        return bool(self._presets >> (row_index * self._size + col_index) & 1)
+
+    def get_presets(self) -> int:
+        """
+        Returns the preset squares of the puzzle.
+
+        :return: An integer with bit `row * size + col` set for each preset value.
+        """
+        return self._presets
+
+    def set_presets(self, presets: int) -> None:
+        """
+        Marks the squares given by `presets` as preset values, e.g. when restoring a
+        puzzle that has already been partly solved.
+
+        :param presets: An integer with bit `row * size + col` set for each preset value.
+        :return: None.
+        """
+        self._presets = presets
+
+    def lock_presets(self) -> None:
+        """
+        Marks every square that currently holds a number as a preset value.
 
-    def _find_presets(self) -> list:
+        :return: None.
+        """
+        self._presets = self._find_presets()
+
+    def is_valid(self) -> bool:
+        """
+        Determines whether the puzzle only holds symbols of its board and the numbers are
+        free of duplicates.
+
+        :return: True if every square is empty or holds a symbol, and no number is
+            repeated in a row, column or square region. Otherwise, False.
+        """
+        values = self._values
+        if values.translate(None, self._geometry.symbol_of.encode('ascii')):
+            return False  # something other than '.' and the symbols is left
+        for unit in self._geometry.units:
+            numbers = [values[index] for index in unit if values[index] != DOT]
+            if len(set(numbers)) != len(numbers):
+                return False
+        return True
+
+    def get_geometry(self) -> Geometry:
+        """
+        Returns the index tables of the puzzle's board.
+
+        :return: The Geometry object.
+        """
+        return self._geometry
+
+    def get_size(self) -> int:
+        """
+        Returns the number of rows (and columns, boxes and numbers) of the puzzle.
+
+        :return: The size, e.g. 9 for a 9x9 puzzle.
+        """
+        return self._size
+
+    def to_string(self) -> str:
+        """
+        Returns the puzzle in the line format.
+
+        :return: The puzzle as a string of one character per square (81 for 9x9), '.' for
+            blanks.
+        """
+        return self._values.decode('ascii')
+
+    def _find_presets(self) -> int:
         """
-        Iterates through the initial Sudoku puzzle and determines which values are preset and
+        Iterates through the Sudoku puzzle and determines which values are preset and
         which values are variable.
 
-        :return: A matrix (list-of-lists) containing boolean values - True for preset, False
-            for variable.
+        :return: An integer with bit `row * size + col` set for each preset value.
         """
-        preset_values = []
-        for row_index, row in enumerate(self._layout):
-            preset_row = []
-            for col_index, col_value in enumerate(row):
-                if col_value == '.':
-                    preset_row.append(False)
-                else:
-                    preset_row.append(True)
-            preset_values.append(list(preset_row))
-            preset_row.clear()
-        return preset_values
+        presets = 0
+        for index, value in enumerate(self._values):
+            if value != DOT:
+                presets |= 1 << index
+        return presets
 
-    def __str__(self) -> None:
+    def __str__(self) -> str:
         """
         Prints the current puzzle values in a human-readable format.
 
-        :return: None.
+        :return: The puzzle as one line of space separated values per row.
         """
-        output = ''  # initialize the string to return
-        # iterate through each row in the puzzle
-        for row in self._layout:
-            # iterate through each value in the current row
-            for index, value in enumerate(row):
-                # append value to output string, if index is 8 then start a new line
-                output = (output + value + '\n') if index == 8 else (output + value + ' ')
-        return output
+        text, size = self.to_string(), self._size
+        return ''.join(' '.join(text[row_index * size:(row_index + 1) * size]) + '\n' for row_index in range(size))
 
 
 if __name__ == "__main__":
@@ -299,4 +423,26 @@ if __name__ == "__main__":
                      [".", ".", ".", "4", "1", "9", ".", ".", "5"],
                      [".", ".", ".", ".", "8", ".", ".", "7", "9"]]
     solve = SolveSudoku(sudoku_puzzle)
+    start_time = time.perf_counter()
     solve.solve()
+    end_time = time.perf_counter()
+    print(solve)
+    print("Solution Speed: {:.2f}s".format(end_time - start_time))
+
+    # follow the search, printing every 1000th step, and stop it half way
+    solve = SolveSudoku(sudoku_puzzle)
+    for step_count, step in enumerate(solve.steps(), 1):
+        if step_count % 1000 == 0:
+            print(step_count, step)
+        if step_count == 5000:
+            break
+    # carry on from a checkpoint, as a restarted worker would
+    checkpoint = solve.checkpoint()
+    print("Checkpoint: {} bytes".format(len(checkpoint)))
+    solve = SolveSudoku.restore(checkpoint)
+    print("Solved after restore:", solve.solve())
+    print(solve)
+
+    # an unsolvable puzzle, and a solve that is stopped by a node limit
+    print(SolveSudoku('12345678.' + '........9' + '.' * 63).solve())
+    print(SolveSudoku(sudoku_puzzle).solve(Budget(max_nodes=1000)))
@@ -0,0 +1,321 @@
+# Author: Colin Francis
+# Description: Command line tool used to solve files of Sudoku puzzles one line at a time
+import argparse
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from canonical_cache import SolutionCache
+from engines import ENGINES, DEFAULT_ENGINE, get_engine
+from geometry import get_geometry, box_size_for
+from solve_result import Budget, SOLVED, BUDGET_EXHAUSTED
+
+# the line lengths of 9x9, 16x16 and 25x25 puzzles, and the characters used for blanks
+PUZZLE_LENGTHS = (81, 256, 625)
+BLANK_CHARACTERS = set('.0')
+
+# the status of a blank line or a comment (a line starting with '#'), which is written out
+#   unchanged so that the output keeps one line per line of input
+SKIPPED = 'skipped'
+
+# the most seconds a puzzle may take when the command line gives no limit, so that one
+#   pathological puzzle cannot hold up a batch for good
+DEFAULT_TIME_LIMIT = 10.0
+
+# the chunks of puzzles that may be in flight in the worker processes at once, and the
+#   finished chunks that may wait behind a slow one for their turn in input order, per worker
+IN_FLIGHT_CHUNKS_PER_WORKER = 4
+WAITING_CHUNKS_PER_WORKER = 64
+
+# solution caches of this process, keyed on (engine name, cache size)
+_caches = {}
+
+
+def solve_line(line: str, engine: str = DEFAULT_ENGINE, cache: SolutionCache = None, time_limit: float = None,
+               max_nodes: int = None) -> tuple:
+    """
+    Solves a single puzzle in the line format: 81 characters for a 9x9 board, or 256 or
+    625 for a 16x16 or 25x25 board.
+
+    :param line: The puzzle, '.' or '0' for blanks. Surrounding whitespace is ignored.
+    :param engine: The name of the solver engine to use.
+    :param cache: A solution cache to answer repeated 9x9 puzzles from, or None.
+    :param time_limit: The most seconds the puzzle may take, or None for no limit.
+    :param max_nodes: The most search nodes the puzzle may take, or None for no limit.
+    :return: A tuple containing the solution in the line format (or the puzzle unchanged
+        if it could not be solved) and the status of the solve (SOLVED, UNSOLVABLE or
+        BUDGET_EXHAUSTED).
+    """
+    puzzle = line.strip()
+    if len(puzzle) not in PUZZLE_LENGTHS or \
+            not set(puzzle) <= BLANK_CHARACTERS | set(get_geometry(box_size_for(len(puzzle))).symbols):
+        raise ValueError("Not an 81, 256 or 625-character puzzle: {!r}".format(puzzle))
+
+    budget = Budget(time_limit, max_nodes)
+    if cache is not None and len(puzzle) == 81:  # the canonical forms are of 9x9 boards
+        solution, status = cache.solve_with_status(puzzle, budget)
+        return (solution if solution is not None else puzzle), status
+
+    solver = get_engine(engine)(puzzle)
+    result = solver.solve(budget)
+    if result:
+        return solver.get_puzzle().to_string(), SOLVED
+    return puzzle, result.get_status()
+
+
+def solve_batch(lines, engine: str = DEFAULT_ENGINE, workers: int = None, chunksize: int = 64,
+                ordered: bool = True, cache_size: int = 0, time_limit: float = None):
+    """
+    Solves the puzzles read from `lines` across a pool of worker processes. Puzzles are
+    sent to the workers in chunks to keep the inter-process overhead low, and no more
+    than a few chunks per worker are in flight at once, so memory stays flat for any
+    size of input. A new chunk is sent whenever one finishes, even if its results have
+    to wait behind a slow chunk for their turn in input order, so one slow puzzle does
+    not leave the other workers idle; the waiting chunks are bounded too. Chunks are
+    only sent as results come in, so a caller that stops early (or
+    closes the generator) leaves nothing waiting on it. Blank lines and lines
+    starting with '#' are passed through with the status SKIPPED.
+
+    :param lines: An iterable of puzzle lines, e.g. an open file.
+    :param engine: The name of the solver engine to use.
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :param chunksize: The number of puzzles sent to a worker at a time.
+    :param ordered: If True, results are yielded in input order. Otherwise, results are
+        yielded as soon as they are ready, so a slow puzzle does not hold back the rest.
+    :param cache_size: If not 0, each worker process keeps a canonical form solution cache
+        of this size.
+    :param time_limit: The most seconds each puzzle may take, or None for no limit.
+    :return: A generator of (line number, solution, status, error) tuples, where error is
+        None or the message for a line that is not a valid puzzle.
+    """
+    workers = workers or os.cpu_count()
+    max_chunks = workers * IN_FLIGHT_CHUNKS_PER_WORKER
+    max_pending = max_chunks + workers * WAITING_CHUNKS_PER_WORKER
+    tasks = ((line_number, line, engine, cache_size, time_limit, None) for line_number, line in enumerate(lines, 1))
+    finished = queue.Queue()  # (chunk number, results or exception) of each chunk as it finishes
+
+    with multiprocessing.Pool(workers) as pool:
+        def submit(chunk_number: int) -> bool:
+            # sends the next chunk of tasks to the pool, returning False once there are none
+            chunk = list(itertools.islice(tasks, chunksize))
+            if not chunk:
+                return False
+            pool.apply_async(_solve_chunk, (chunk,), callback=lambda results: finished.put((chunk_number, results)),
+                             error_callback=lambda error: finished.put((chunk_number, error)))
+            return True
+
+        submitted, received, next_chunk, exhausted = 0, 0, 0, False
+        done = {}
+        while True:
+            # keep the window full, even while finished chunks wait for a slow one
+            while (not exhausted and submitted - received < max_chunks
+                   and submitted - next_chunk < max_pending):
+                if submit(submitted):
+                    submitted += 1
+                else:
+                    exhausted = True
+            if next_chunk == submitted:
+                return
+            chunk_number, results = finished.get()
+            if isinstance(results, BaseException):
+                raise results
+            # in input order, chunks that finish early wait for the ones before them
+            done[chunk_number if ordered else received] = results
+            received += 1
+            while next_chunk in done:
+                results = done.pop(next_chunk)
+                next_chunk += 1
+                yield from results
+
+
+def solve_stream(lines, output, engine: str = DEFAULT_ENGINE, workers: int = 1, chunksize: int = 64,
+                 ordered: bool = True, cache_size: int = 0, time_limit: float = None,
+                 line_numbers: bool = False) -> dict:
+    """
+    Solves the puzzles read from `lines` and writes each solution to `output` as soon as
+    it is found. The output has one line for each line of input: blank lines and lines
+    starting with '#' are copied, and a line that is not a valid puzzle is replaced by a
+    comment with the error, e.g. "# Not an 81, 256 or 625-character puzzle: 'bad'".
+
+    :param lines: An iterable of puzzle lines, e.g. an open file.
+    :param output: A writable text stream.
+    :param engine: The name of the solver engine to use.
+    :param workers: The number of worker processes. With 1, puzzles are solved in this
+        process.
+    :param chunksize: The number of puzzles sent to a worker process at a time.
+    :param ordered: If False, solutions from worker processes are written as soon as they
+        are ready instead of in input order.
+    :param cache_size: If not 0, repeated puzzles are answered from a canonical form
+        solution cache of this size (one per process).
+    :param time_limit: The most seconds each puzzle may take, or None for no limit. A
+        puzzle that runs out of time is written unchanged, like an unsolvable one.
+    :param line_numbers: If True, each output line starts with the number of its input
+        line and a tab, which matches solutions to puzzles when `ordered` is False.
+    :return: A dictionary with the number of puzzles read, solved, timed out and rejected,
+        the elapsed time in seconds and, for a cache in this process, the cache hits,
+        misses and puzzles settled by propagation.
+    """
+    stats = {'puzzles': 0, 'solved': 0, 'timed_out': 0, 'invalid': 0, 'seconds': 0.0}
+    start_time = time.perf_counter()
+    if workers == 1:
+        results = (_line_task((line_number, line, engine, cache_size, time_limit, None))
+                   for line_number, line in enumerate(lines, 1))
+    else:
+        results = solve_batch(lines, engine, workers, chunksize, ordered, cache_size, time_limit)
+
+    for line_number, solution, status, error in results:
+        if error is not None:
+            stats['invalid'] += 1
+            print("line {}: {}".format(line_number, error), file=sys.stderr)
+            solution = '# ' + error
+        elif status != SKIPPED:
+            stats['puzzles'] += 1
+            stats['solved'] += status == SOLVED
+            if status == BUDGET_EXHAUSTED:
+                stats['timed_out'] += 1
+                print("line {}: not solved within the time limit".format(line_number), file=sys.stderr)
+        if line_numbers:
+            output.write('{}\t'.format(line_number))
+        output.write(solution + '\n')
+    stats['seconds'] = time.perf_counter() - start_time
+    if workers == 1 and cache_size:
+        cache = _process_cache(engine, cache_size)
+        stats['cache_hits'], stats['cache_misses'] = cache.get_hit_count(), cache.get_miss_count()
+        stats['cache_propagated'] = cache.get_propagated_count()
+    return stats
+
+
+def _process_cache(engine: str, cache_size: int) -> SolutionCache:
+    """
+    Returns the solution cache of this process for the engine and cache size, creating it
+    on first use.
+
+    :param engine: The name of the solver engine used on a cache miss.
+    :param cache_size: The largest number of solutions to keep.
+    :return: The solution cache.
+    """
+    if (engine, cache_size) not in _caches:
+        _caches[(engine, cache_size)] = SolutionCache(cache_size, get_engine(engine))
+    return _caches[(engine, cache_size)]
+
+
+def _solve_task(task: tuple) -> tuple:
+    """
+    Solves a single numbered puzzle line. Used directly and by the worker processes.
+
+    :param task: A tuple containing the line number, the line, the engine name, the cache
+        size, and the time limit and node limit of the puzzle (either may be None).
+    :return: A tuple containing the line number, the solution, the status of the solve and
+        None or the error message for an invalid line.
+    """
+    line_number, line, engine, cache_size, time_limit, max_nodes = task
+    cache = _process_cache(engine, cache_size) if cache_size else None
+    try:
+        solution, status = solve_line(line, engine, cache, time_limit, max_nodes)
+    except ValueError as error:
+        return line_number, None, None, str(error)
+    return line_number, solution, status, None
+
+
+def _line_task(task: tuple) -> tuple:
+    """
+    Solves a single numbered line of a batch, passing blank lines and comments through.
+
+    :param task: A task as taken by _solve_task.
+    :return: A result as returned by _solve_task; a blank line or a comment comes back
+        unchanged (without its line ending) with the status SKIPPED.
+    """
+    line_number, line = task[:2]
+    if not line.strip() or line.startswith('#'):
+        return line_number, line.rstrip('\r\n'), SKIPPED, None
+    return _solve_task(task)
+
+
+def _solve_chunk(chunk: list) -> list:
+    """
+    Solves a chunk of numbered puzzle lines in a worker process.
+
+    :param chunk: A list of tasks (see _solve_task).
+    :return: A list of the results of the tasks.
+    """
+    return [_line_task(task) for task in chunk]
+
+
+def silence_stdout() -> None:
+    """
+    Points stdout at the null device after the reader of a pipe has gone away, so that the
+    interpreter's final flush of the unwritten output does not raise BrokenPipeError again.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    :param argv: The arguments to parse. Defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Solve Sudoku puzzles written one per line in the "
+                                                 "81-character format ('.' or '0' for blanks), or 256 or "
+                                                 "625 characters for 16x16 or 25x25 boards.")
+    parser.add_argument('input', nargs='?', default='-', help="puzzle file to read, '-' for stdin (default)")
+    parser.add_argument('-o', '--output', default='-', help="file to write solutions to, '-' for stdout (default)")
+    parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                        help="solver engine to use (default: {})".format(DEFAULT_ENGINE))
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument('-c', '--chunksize', type=int, default=64,
+                        help="puzzles sent to a worker process at a time (default: 64)")
+    parser.add_argument('-u', '--unordered', action='store_true',
+                        help="write solutions from worker processes as they finish instead of in input order")
+    parser.add_argument('--cache', type=int, default=0, metavar='SIZE',
+                        help="answer repeated puzzles (up to Sudoku symmetry) from a solution cache of this size")
+    parser.add_argument('-n', '--line-numbers', action='store_true',
+                        help="start each output line with the number of its input line and a tab")
+    parser.add_argument('-t', '--time-limit', type=float, default=DEFAULT_TIME_LIMIT, metavar='SECONDS',
+                        help="give up on a puzzle after this many seconds and write it unchanged, 0 for no limit "
+                             "(default: {:g})".format(DEFAULT_TIME_LIMIT))
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the batch solver from the command line and prints the throughput to stderr.
+
+    :param argv: The command line arguments. Defaults to sys.argv.
+    :return: The exit status.
+    """
+    args = parse_args(argv)
+    source = sys.stdin if args.input == '-' else open(args.input)
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        stats = solve_stream(source, destination, args.engine, args.workers or os.cpu_count(),
+                             args.chunksize, not args.unordered, args.cache, args.time_limit or None,
+                             args.line_numbers)
+        destination.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. `| head`): stop quietly, as other command line tools do
+        silence_stdout()
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
+
+    rate = stats['puzzles'] / stats['seconds'] if stats['seconds'] else 0.0
+    print("{} puzzles ({} solved, {} timed out, {} invalid) in {:.2f}s: {:.1f} puzzles/sec".format(
+        stats['puzzles'], stats['solved'], stats['timed_out'], stats['invalid'], stats['seconds'], rate),
+        file=sys.stderr)
+    if 'cache_hits' in stats:
+        print("cache: {} hits, {} misses, {} settled by propagation".format(
+            stats['cache_hits'], stats['cache_misses'], stats['cache_propagated']), file=sys.stderr)
+    return 0 if stats['invalid'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# Author: Colin Francis
+# Description: Benchmarks the Sudoku solver engines on graded puzzle corpora
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from engines import ENGINES, get_engine
+from puzzle_corpus import CORPORA
+from solve_result import Budget, SOLVED, BUDGET_EXHAUSTED
+
+# the latency percentiles that are reported
+PERCENTILES = (('p50', 0.50), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of a list of values.
+
+    :param values: The values, in any order.
+    :param fraction: The percentile as a fraction, e.g. 0.95 for p95.
+    :return: The smallest value that is greater than or equal to `fraction` of the values.
+    """
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * fraction)) - 1]
+
+
+def time_solve(engine, puzzle: str, time_limit: float = None) -> tuple:
+    """
+    Builds a solver for the puzzle and solves it, timing both.
+
+    :param engine: The solver class.
+    :param puzzle: The puzzle in the 81-character line format.
+    :param time_limit: The most seconds the solve may take, or None for no limit.
+    :return: A tuple containing the elapsed time in seconds and the SolveResult.
+    """
+    start_time = time.perf_counter()
+    result = engine(puzzle).solve(Budget(time_limit=time_limit))
+    return time.perf_counter() - start_time, result
+
+
+def peak_memory(engine, puzzles: list, time_limit: float = None) -> int:
+    """
+    Measures the peak memory allocated by a single solve. Tracing allocations slows the
+    solvers down, so this is done in a separate, untimed pass.
+
+    :param engine: The solver class.
+    :param puzzles: The puzzles in the 81-character line format.
+    :param time_limit: The most seconds each solve may take, or None for no limit.
+    :return: The largest peak, in bytes, over the puzzles.
+    """
+    peak = 0
+    tracemalloc.start()
+    try:
+        for puzzle in puzzles:
+            tracemalloc.reset_peak()
+            engine(puzzle).solve(Budget(time_limit=time_limit))
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_engine(name: str, corpus: str, repeats: int = 3, warmup: int = 1, time_limit: float = None) -> dict:
+    """
+    Benchmarks one engine on one corpus. The corpus is solved `warmup` times without
+    timing, then `repeats` times with every solve timed.
+
+    :param name: The name of the engine (see ENGINES).
+    :param corpus: The name of the corpus (see CORPORA).
+    :param repeats: The number of timed passes over the corpus.
+    :param warmup: The number of untimed passes over the corpus.
+    :param time_limit: The most seconds each solve may take, or None for no limit.
+        Solves that run out of time count toward `budget_exhausted` and their capped
+        time is included in the latencies.
+    :return: A dictionary of the measurements.
+    """
+    engine, puzzles = get_engine(name), CORPORA[corpus]
+    for _ in range(warmup):
+        for puzzle in puzzles:
+            time_solve(engine, puzzle, time_limit)
+
+    latencies, node_count, statuses = [], 0, {}
+    for _ in range(repeats):
+        for puzzle in puzzles:
+            seconds, result = time_solve(engine, puzzle, time_limit)
+            latencies.append(seconds)
+            node_count += result.get_node_count()
+            statuses[result.get_status()] = statuses.get(result.get_status(), 0) + 1
+
+    total_seconds = sum(latencies)
+    return {
+        'engine': name,
+        'corpus': corpus,
+        'puzzles': len(puzzles),
+        'solves': len(latencies),
+        'solved': statuses.get(SOLVED, 0),
+        'budget_exhausted': statuses.get(BUDGET_EXHAUSTED, 0),
+        'seconds': total_seconds,
+        'puzzles_per_sec': len(latencies) / total_seconds if total_seconds else 0.0,
+        'latency_ms': {label: percentile(latencies, fraction) * 1000 for label, fraction in PERCENTILES},
+        'nodes': node_count,
+        'nodes_per_sec': node_count / total_seconds if total_seconds else 0.0,
+        'peak_memory_bytes': peak_memory(engine, puzzles, time_limit),
+    }
+
+
+def run_benchmarks(engines: list, corpora: list, repeats: int = 3, warmup: int = 1, time_limit: float = None,
+                   progress=None) -> dict:
+    """
+    Benchmarks every engine on every corpus.
+
+    :param engines: The names of the engines to benchmark.
+    :param corpora: The names of the corpora to solve.
+    :param repeats: The number of timed passes over each corpus.
+    :param warmup: The number of untimed passes over each corpus.
+    :param time_limit: The most seconds each solve may take, or None for no limit.
+    :param progress: A writable text stream for a summary line per run, or None.
+    :return: A dictionary with the benchmark settings, the environment and a list of
+        results from `benchmark_engine`.
+    """
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'warmup': warmup,
+        'time_limit': time_limit,
+        'results': [],
+    }
+    for name in engines:
+        for corpus in corpora:
+            result = benchmark_engine(name, corpus, repeats, warmup, time_limit)
+            report['results'].append(result)
+            if progress is not None:
+                print("{:<17} {:<13} {:>9.1f} puzzles/sec  p50 {:>8.2f}ms  p99 {:>8.2f}ms  max {:>8.2f}ms  "
+                      "{:>10.0f} nodes/sec  {:>7.1f} KiB  {} exhausted".format(
+                          name, corpus, result['puzzles_per_sec'], result['latency_ms']['p50'],
+                          result['latency_ms']['p99'], result['latency_ms']['max'], result['nodes_per_sec'],
+                          result['peak_memory_bytes'] / 1024, result['budget_exhausted']), file=progress)
+    return report
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    :param argv: The arguments to parse. Defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solver engines on graded puzzle corpora "
+                                                 "and write the results as JSON.")
+    parser.add_argument('-e', '--engine', action='append', choices=sorted(ENGINES),
+                        help="engine to benchmark, may be repeated (default: all)")
+    parser.add_argument('-c', '--corpus', action='append', choices=list(CORPORA),
+                        help="corpus to solve, may be repeated (default: all)")
+    parser.add_argument('-r', '--repeats', type=int, default=3, help="timed passes over each corpus (default: 3)")
+    parser.add_argument('-w', '--warmup', type=int, default=1, help="untimed passes over each corpus (default: 1)")
+    parser.add_argument('-t', '--time-limit', type=float, default=1.0,
+                        help="seconds allowed per solve, 0 for no limit (default: 1)")
+    parser.add_argument('-o', '--output', default='-', help="file to write the JSON report to, '-' for stdout "
+                                                            "(default)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the benchmarks from the command line, printing a summary line per run to stderr.
+
+    :param argv: The command line arguments. Defaults to sys.argv.
+    :return: The exit status.
+    """
+    args = parse_args(argv)
+    report = run_benchmarks(args.engine or sorted(ENGINES), args.corpus or list(CORPORA), args.repeats,
+                            args.warmup, args.time_limit or None, progress=sys.stderr)
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        json.dump(report, destination, indent=2)
+        destination.write('\n')
+    finally:
+        if destination is not sys.stdout:
+            destination.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,404 @@
+# Author: Colin Francis
+# Description: Bitmask version of the back propagation algorithm used to solve Sudoku puzzles
+import sys
+import time
+from back_propagation_algorithm import SolveSudoku, Puzzle, DOT
+from geometry import Geometry
+from puzzle_corpus import PUZZLES
+from solve_result import SolveResult, Budget, make_result, stats_wanted, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+
+# bit `n` of a mask is set when the number `n` is present, so bits 1 - 9 are used on a
+#   9x9 board (bits 1 - size on larger boards, see Geometry.all_numbers)
+ALL_NUMBERS = 0b1111111110
+
+# the search nodes each solver may visit per puzzle in verify_against_reference; SolveSudoku
+#   takes minutes to finish the harder puzzles of the corpus, and both solvers stop at the
+#   same node of the same search
+VERIFY_MAX_NODES = 60000
+
+
+class BitmaskSolveSudoku(SolveSudoku):
+    """
+    A class used to solve Sudoku puzzles. Works exactly like SolveSudoku, but each
+    legality check is a single AND against the row, column and square bitmasks kept
+    by a BitmaskPuzzle instead of a scan of the puzzle layout.
+    """
+    def __init__(self, puzzle, box_size: int = None, geometry: Geometry = None):
+        """Creates a BitmaskSolveSudoku object with puzzle and search position attributes."""
+        self._puzzle = bitmask_puzzle(puzzle, box_size, geometry)
+        self._number_of = self._puzzle.get_geometry().number_of
+        self._check_count = 0
+        self._start_search()
+
+    def solve(self, budget: Budget = None, collect_stats: bool = False) -> SolveResult:
+        """
+        Used to solve Sudoku puzzles. Visits the variable squares in the same order as
+        SolveSudoku and tries numbers in ascending order, so both find the same solution.
+        Like SolveSudoku, it carries on from a restored checkpoint or an exhausted budget.
+
+        :param budget: The limits of the solve, or None for no limits. Each number placed
+            counts as a search node.
+        :param collect_stats: If True, the result carries a SolveStats. Stats are also
+            collected while a stats hook is registered.
+        :return: A SolveResult that is truthy if a solution has been found.
+        """
+        budget = budget or Budget()
+        next_check = budget.start()
+        collect_stats = stats_wanted(collect_stats)
+        if not self._puzzle.is_valid():
+            return make_result(type(self).__name__, UNSOLVABLE, 0, budget.get_elapsed(), collect_stats=collect_stats)
+
+        indices, square_index = self._indices, self._square_index
+        geometry = self._puzzle.get_geometry()
+        number_of, symbol_of = geometry.number_of, geometry.symbol_of
+        values, set_at, candidates_at = self._puzzle.get_values(), self._puzzle.set_at, self._puzzle.candidates_at
+        node_count = backtrack_count = max_depth = 0
+        reason = None
+        while 0 <= square_index < len(indices):
+            index = indices[square_index]
+            value = values[index]
+            # only numbers greater than the current one are left to try in this square
+            start_number = number_of[value] + 1
+            if value != DOT:
+                set_at(index, '.')
+
+            free = candidates_at(index) >> start_number << start_number
+            if free:
+                # place the smallest number that is still free and move forward
+                set_at(index, symbol_of[(free & -free).bit_length() - 1])
+                square_index += 1
+                node_count += 1
+                if square_index > max_depth:
+                    max_depth = square_index
+                if node_count >= next_check:
+                    reason = budget.exceeded(node_count)
+                    if reason is not None:
+                        break
+                    next_check = budget.next_check(node_count)
+            else:
+                square_index -= 1  # back propagate
+                backtrack_count += 1
+        self._square_index = square_index
+
+        if reason is not None:
+            status = BUDGET_EXHAUSTED
+        else:
+            status = SOLVED if self._solved() else UNSOLVABLE
+        # each pass of the loop checks the candidates of one square once
+        return make_result(type(self).__name__, status, node_count, budget.get_elapsed(), reason, collect_stats,
+                           node_count + backtrack_count, backtrack_count, max_depth)
+
+    def _in_peers(self, index: int, number: str) -> bool:
+        """
+        Checks the candidate bitmask of a square to see if `number` exists in its row,
+        column, square region or extra units.
+
+        :param index: The index of the square (row by row).
+        :param number: The number to search for.
+        :return: True if the number is found in a unit of the square. Otherwise, False.
+        """
+        return not self._puzzle.candidates_at(index) >> self._number_of[ord(number)] & 1
+
+
+class BitmaskPuzzle(Puzzle):
+    """
+    Represents a Sudoku puzzle along with bitmasks of the numbers placed in each row,
+    column and square region. The bitmasks are updated incrementally on every `set`, and
+    squares are found in them through the row, column and box tables of the Geometry, so
+    the `*_at` methods that take a square index do no index arithmetic.
+    """
+    __slots__ = ('_row_masks', '_col_masks', '_box_masks', '_empty_count', '_valid', '_row_of', '_col_of', '_box_of',
+                 '_number_of', '_all_numbers')
+
+    def __init__(self, puzzle, box_size: int = None, geometry: Geometry = None):
+        """Creates a BitmaskPuzzle object with values, presets and bitmask attributes."""
+        super().__init__(puzzle, box_size, geometry)
+        size = self._size
+        self._row_of = self._geometry.row_of
+        self._col_of = self._geometry.col_of
+        self._box_of = self._geometry.box_of
+        self._number_of = self._geometry.number_of
+        self._all_numbers = self._geometry.all_numbers
+        self._row_masks = [0] * size
+        self._col_masks = [0] * size
+        self._box_masks = [0] * size
+        self._init_masks()
+
+    def _init_masks(self) -> None:
+        """
+        Adds the numbers already in the puzzle to the bitmasks and counts the empty
+        squares.
+
+        :return: None.
+        """
+        self._empty_count = 0
+        self._valid = True
+        for index, value in enumerate(self._values):
+            if value == DOT:
+                self._empty_count += 1
+                continue
+            bit = 1 << self._number_of[value]
+            # a preset number repeated in a row, column or square can never be solved, and
+            #   a character that is not a symbol has number 0, which is never a candidate
+            if bit & ~self.candidates_at(index):
+                self._valid = False
+            self._add(index, bit)
+
+    def set(self, row_index: int, col_index: int, number: str) -> None:
+        """
+        Sets the square in the Sudoku puzzle corresponding to `row_index` and
+        `col_index` and updates the row, column and square bitmasks.
+
+        :param row_index: The index of the row to place the number in.
+        :param col_index: The index of the column to place the number in.
+        :param number: The number to place in the puzzle.
+        :return: None.
+        """
+        self.set_at(row_index * self._size + col_index, number)
+
+    def set_at(self, index: int, number: str) -> None:
+        """
+        Sets the square with the specified index (row by row) and updates the bitmasks.
+
+        :param index: The index of the square.
+        :param number: The number to place in the puzzle, or '.' to clear the square.
+        :return: None.
+        """
+        current = self._values[index]
+        if current != DOT:
+            self._remove(index, 1 << self._number_of[current])
+            self._empty_count += 1
+        value = ord(number)
+        if value != DOT:
+            self._add(index, 1 << self._number_of[value])
+            self._empty_count -= 1
+        self._values[index] = value
+
+    def candidates(self, row_index: int, col_index: int) -> int:
+        """
+        Returns a bitmask of the numbers that are not yet used in the row, column or
+        square region of the specified square.
+
+        :param row_index: The row index of the square.
+        :param col_index: The column index of the square.
+        :return: A bitmask with bit `n` set if the number `n` may be placed.
+        """
+        return self.candidates_at(row_index * self._size + col_index)
+
+    def candidates_at(self, index: int) -> int:
+        """
+        Returns a bitmask of the numbers that are not yet used by any unit of the square
+        with the specified index (row by row).
+
+        :param index: The index of the square.
+        :return: A bitmask with bit `n` set if the number `n` may be placed.
+        """
+        return self._all_numbers & ~(self._row_masks[self._row_of[index]] | self._col_masks[self._col_of[index]] |
+                                     self._box_masks[self._box_of[index]])
+
+    def get_row_mask(self, row_index: int) -> int:
+        """
+        Returns the bitmask of the numbers placed in the specified row.
+
+        :param row_index: The index of the row.
+        :return: The row bitmask.
+        """
+        return self._row_masks[row_index]
+
+    def get_col_mask(self, col_index: int) -> int:
+        """
+        Returns the bitmask of the numbers placed in the specified column.
+
+        :param col_index: The index of the column.
+        :return: The column bitmask.
+        """
+        return self._col_masks[col_index]
+
+    def get_box_mask(self, row_index: int, col_index: int) -> int:
+        """
+        Returns the bitmask of the numbers placed in the square region containing the
+        specified row index and column index.
+
+        :param row_index: The row index of a square in the region.
+        :param col_index: The column index of a square in the region.
+        :return: The square region bitmask.
+        """
+        return self._box_masks[self._box_of[row_index * self._size + col_index]]
+
+    def get_extra_mask(self, row_index: int, col_index: int) -> int:
+        """
+        Returns the bitmask of the numbers placed in the extra units of a variant puzzle
+        that contain the specified square. A standard puzzle has no extra units.
+
+        :param row_index: The row index of the square.
+        :param col_index: The column index of the square.
+        :return: The bitmask, 0 for a standard puzzle.
+        """
+        return 0
+
+    def get_empty_count(self) -> int:
+        """
+        Returns the number of empty squares in the puzzle.
+
+        :return: The number of empty squares.
+        """
+        return self._empty_count
+
+    def is_valid(self) -> bool:
+        """
+        Determines whether the preset values are symbols of the board and free of
+        duplicates.
+
+        :return: True if every preset value is a symbol and none is repeated in a row,
+            column or square region. Otherwise, False.
+        """
+        return self._valid
+
+    def _add(self, index: int, bit: int) -> None:
+        """
+        Adds `bit` to the row, column and square bitmasks of the specified square.
+
+        :param index: The index of the square.
+        :param bit: The bit of the number being placed.
+        :return: None.
+        """
+        self._row_masks[self._row_of[index]] |= bit
+        self._col_masks[self._col_of[index]] |= bit
+        self._box_masks[self._box_of[index]] |= bit
+
+    def _remove(self, index: int, bit: int) -> None:
+        """
+        Removes `bit` from the row, column and square bitmasks of the specified square.
+
+        :param index: The index of the square.
+        :param bit: The bit of the number being removed.
+        :return: None.
+        """
+        self._row_masks[self._row_of[index]] &= ~bit
+        self._col_masks[self._col_of[index]] &= ~bit
+        self._box_masks[self._box_of[index]] &= ~bit
+
+
+class VariantBitmaskPuzzle(BitmaskPuzzle):
+    """
+    A BitmaskPuzzle whose Geometry has extra units, e.g. the diagonals of diagonal
+    Sudoku. Each extra unit has a bitmask of its own. Standard puzzles use BitmaskPuzzle,
+    so that they do not pay for the extra lookups.
+    """
+    __slots__ = ('_extra_units_of', '_extra_masks')
+
+    def _init_masks(self) -> None:
+        """
+        Creates the bitmasks of the extra units, then adds the numbers already in the
+        puzzle to every bitmask.
+
+        :return: None.
+        """
+        self._extra_units_of = self._geometry.extra_units_of
+        # indexed by unit ID, so only the entries of the extra units are used
+        self._extra_masks = [0] * len(self._geometry.units)
+        super()._init_masks()
+
+    def candidates_at(self, index: int) -> int:
+        """
+        Returns a bitmask of the numbers that are not yet used by any unit of the square
+        with the specified index (row by row), including its extra units.
+
+        :param index: The index of the square.
+        :return: A bitmask with bit `n` set if the number `n` may be placed.
+        """
+        used = self._row_masks[self._row_of[index]] | self._col_masks[self._col_of[index]] | \
+            self._box_masks[self._box_of[index]]
+        for unit in self._extra_units_of[index]:
+            used |= self._extra_masks[unit]
+        return self._all_numbers & ~used
+
+    def get_extra_mask(self, row_index: int, col_index: int) -> int:
+        """
+        Returns the bitmask of the numbers placed in the extra units that contain the
+        specified square.
+
+        :param row_index: The row index of the square.
+        :param col_index: The column index of the square.
+        :return: The bitmask, 0 if the square is in no extra unit.
+        """
+        used = 0
+        for unit in self._extra_units_of[row_index * self._size + col_index]:
+            used |= self._extra_masks[unit]
+        return used
+
+    def _add(self, index: int, bit: int) -> None:
+        """
+        Adds `bit` to the bitmasks of every unit of the specified square.
+
+        :param index: The index of the square.
+        :param bit: The bit of the number being placed.
+        :return: None.
+        """
+        super()._add(index, bit)
+        for unit in self._extra_units_of[index]:
+            self._extra_masks[unit] |= bit
+
+    def _remove(self, index: int, bit: int) -> None:
+        """
+        Removes `bit` from the bitmasks of every unit of the specified square.
+
+        :param index: The index of the square.
+        :param bit: The bit of the number being removed.
+        :return: None.
+        """
+        super()._remove(index, bit)
+        for unit in self._extra_units_of[index]:
+            self._extra_masks[unit] &= ~bit
+
+
+def bitmask_puzzle(puzzle, box_size: int = None, geometry: Geometry = None) -> BitmaskPuzzle:
+    """
+    Creates the bitmask puzzle that suits the layout: a VariantBitmaskPuzzle if the
+    Geometry has extra units. Otherwise, a BitmaskPuzzle.
+
+    :param puzzle: The puzzle, in any form that Puzzle accepts.
+    :param box_size: The side of a square region, or None to find it from the puzzle.
+    :param geometry: The layout of a variant puzzle, or None for a standard board.
+    :return: The BitmaskPuzzle object.
+    """
+    if geometry is not None and geometry.extra_units:
+        return VariantBitmaskPuzzle(puzzle, box_size, geometry)
+    return BitmaskPuzzle(puzzle, box_size, geometry)
+
+
+def verify_against_reference(puzzles: dict = None, max_nodes: int = VERIFY_MAX_NODES) -> list:
+    """
+    Solves each puzzle with both SolveSudoku and BitmaskSolveSudoku under the same node
+    budget and compares the outcome, the number of search nodes and the board they end
+    on. The two run the same search, so they must agree whether or not the puzzle is
+    solved within the budget.
+
+    :param puzzles: A dictionary of puzzles in the 81-character line format by name.
+        Defaults to every puzzle in puzzle_corpus.PUZZLES.
+    :param max_nodes: The most search nodes each solver may visit per puzzle.
+    :return: A list of the names of the puzzles the solvers disagree on, empty if they
+        agree on all of them.
+    """
+    mismatches = []
+    for name, puzzle in (PUZZLES if puzzles is None else puzzles).items():
+        reference, bitmask = SolveSudoku(puzzle), BitmaskSolveSudoku(puzzle)
+        reference_result = reference.solve(Budget(max_nodes=max_nodes))
+        bitmask_result = bitmask.solve(Budget(max_nodes=max_nodes))
+        if reference_result.get_status() != bitmask_result.get_status() or \
+                reference_result.get_node_count() != bitmask_result.get_node_count() or \
+                reference.get_puzzle().to_string() != bitmask.get_puzzle().to_string():
+            mismatches.append(name)
+    return mismatches
+
+
+if __name__ == "__main__":
+    solve = BitmaskSolveSudoku(PUZZLES['classic'])
+    start_time = time.perf_counter()
+    solve.solve()
+    end_time = time.perf_counter()
+    print(solve)
+    print("Solution Speed: {:.4f}s".format(end_time - start_time))
+    mismatched = verify_against_reference()
+    print("Matches SolveSudoku:", not mismatched, *mismatched)
+    sys.exit(1 if mismatched else 0)
@@ -0,0 +1,367 @@
+# Author: Colin Francis
+# Description: Solution cache keyed on a canonical form of Sudoku puzzles
+import itertools
+import random
+import time
+from collections import OrderedDict
+from bitmask_algorithm import BitmaskPuzzle
+from constraint_propagation import propagate
+from dancing_links_algorithm import DancingLinksSolveSudoku
+from puzzle_corpus import PUZZLES
+from solve_result import Budget, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+
+# the most row orders (and column orders) that are compared when lines of the puzzle cannot
+#   be told apart by their clue counts
+MAX_TIED_ORDERS = 8
+
+
+class Transform(object):
+    """
+    A Sudoku symmetry: an optional transposition, followed by a row order and a column
+    order (each keeping rows and columns within their bands and stacks) and a relabeling
+    of the numbers.
+    """
+    def __init__(self, transposed: bool, row_order: tuple, col_order: tuple, relabel: dict):
+        """
+        Creates a Transform object.
+
+        :param transposed: True if the puzzle is transposed before reordering.
+        :param row_order: The source row of each row of the result.
+        :param col_order: The source column of each column of the result.
+        :param relabel: A dictionary mapping each number ('1' - '9') to its new number.
+        """
+        self._transposed = transposed
+        self._row_order = row_order
+        self._col_order = col_order
+        self._relabel = relabel
+        self._inverse_relabel = {new: old for old, new in relabel.items()}
+
+    def apply(self, puzzle: str) -> str:
+        """
+        Applies the transform to a puzzle.
+
+        :param puzzle: The puzzle in the 81-character line format.
+        :return: The transformed puzzle in the 81-character line format.
+        """
+        grid = transpose(puzzle) if self._transposed else puzzle
+        return ''.join(self._relabel.get(grid[row * 9 + col], '.') for row in self._row_order
+                       for col in self._col_order)
+
+    def invert(self, puzzle: str) -> str:
+        """
+        Applies the inverse of the transform to a puzzle, e.g. to map the solution of a
+        canonical puzzle back to the original puzzle.
+
+        :param puzzle: The transformed puzzle in the 81-character line format.
+        :return: The original puzzle in the 81-character line format.
+        """
+        grid = ['.'] * 81
+        for row_index, row in enumerate(self._row_order):
+            for col_index, col in enumerate(self._col_order):
+                grid[row * 9 + col] = self._inverse_relabel.get(puzzle[row_index * 9 + col_index], '.')
+        grid = ''.join(grid)
+        return transpose(grid) if self._transposed else grid
+
+
+def random_transform(rng: random.Random) -> Transform:
+    """
+    Picks a random Sudoku symmetry, e.g. to make puzzles that are equivalent to a known
+    one.
+
+    :param rng: The random number generator to use.
+    :return: The Transform.
+    """
+    orders = []
+    for _ in range(2):
+        bands = rng.sample(range(3), 3)
+        orders.append(tuple(band * 3 + row for band in bands for row in rng.sample(range(3), 3)))
+    relabel = dict(zip('123456789', rng.sample('123456789', 9)))
+    return Transform(rng.random() < 0.5, orders[0], orders[1], relabel)
+
+
+def transpose(puzzle: str) -> str:
+    """
+    Swaps the rows and columns of a puzzle.
+
+    :param puzzle: The puzzle in the 81-character line format.
+    :return: The transposed puzzle in the 81-character line format.
+    """
+    return ''.join(puzzle[col * 9 + row] for row in range(9) for col in range(9))
+
+
+def canonicalize(puzzle: str) -> tuple:
+    """
+    Finds a canonical form of a puzzle: the same string for puzzles that are equal up to
+    transposition, row and column swaps within bands and stacks, band and stack swaps and
+    relabeling of the numbers. Rows, columns, bands and stacks are first ordered by clue
+    count invariants; lines that cannot be told apart are tried in every order (up to
+    MAX_TIED_ORDERS) and the lexicographically smallest relabeled result is kept. Puzzles
+    with many indistinguishable lines may therefore have more than one canonical form,
+    but the canonical form is always a transform of the puzzle.
+
+    :param puzzle: The puzzle in the 81-character line format ('.' for blanks).
+    :return: A tuple containing the canonical form and the Transform that maps the puzzle
+        onto it.
+    """
+    best_key, best_orders = None, None
+    for transposed in (False, True):
+        grid = transpose(puzzle) if transposed else puzzle
+        row_orders = _line_orders(grid)
+        col_orders = _line_orders(transpose(grid))
+        for row_order, col_order in itertools.product(row_orders, col_orders):
+            key = _relabeled(grid, row_order, col_order)
+            if best_key is None or key < best_key:
+                best_key, best_orders = key, (transposed, row_order, col_order)
+
+    transposed, row_order, col_order = best_orders
+    grid = transpose(puzzle) if transposed else puzzle
+    relabel = {}
+    for row in row_order:
+        for col in col_order:
+            number = grid[row * 9 + col]
+            if number != '.' and number not in relabel:
+                relabel[number] = str(len(relabel) + 1)
+    # numbers missing from the puzzle are interchangeable, so they are given the remaining
+    #   labels in order
+    for number in '123456789':
+        if number not in relabel:
+            relabel[number] = str(len(relabel) + 1)
+    return best_key, Transform(transposed, row_order, col_order, relabel)
+
+
+def _line_orders(grid: str) -> list:
+    """
+    Orders the rows of a puzzle by invariants that do not change under the other
+    symmetries: the clue count of each row, the clue counts of the columns its clues are
+    in and its clue count in each stack. Bands are ordered by the invariants of their
+    rows. Every order of rows or bands with equal invariants is returned.
+
+    :param grid: The puzzle in the 81-character line format.
+    :return: A list of row orders, each a tuple of 9 source row indices.
+    """
+    filled = [[number != '.' for number in grid[row * 9:(row + 1) * 9]] for row in range(9)]
+    col_counts = [sum(filled[row][col] for row in range(9)) for col in range(9)]
+    row_keys = [(sum(filled[row]),
+                 tuple(sorted(col_counts[col] for col in range(9) if filled[row][col])),
+                 tuple(sorted(sum(filled[row][stack * 3:(stack + 1) * 3]) for stack in range(3))))
+                for row in range(9)]
+    band_keys = [tuple(sorted(row_keys[band * 3:(band + 1) * 3])) for band in range(3)]
+
+    orders = []
+    for band_order in _tied_permutations(range(3), band_keys):
+        band_rows = [_tied_permutations(range(band * 3, (band + 1) * 3), row_keys) for band in band_order]
+        for rows in itertools.product(*band_rows):
+            orders.append(rows[0] + rows[1] + rows[2])
+            if len(orders) >= MAX_TIED_ORDERS:
+                return orders
+    return orders
+
+
+def _tied_permutations(items, keys: list) -> list:
+    """
+    Sorts `items` by their keys and returns every order that keeps the keys sorted, i.e.
+    every permutation of the items within each group of equal keys.
+
+    :param items: The items (indices into `keys`) to order.
+    :param keys: The sort key of each item.
+    :return: A list of tuples, each an order of the items.
+    """
+    groups = [list(group) for _, group in itertools.groupby(sorted(items, key=lambda item: keys[item]),
+                                                            key=lambda item: keys[item])]
+    return [sum(choice, ()) for choice in itertools.product(*(itertools.permutations(group) for group in groups))]
+
+
+def _relabeled(grid: str, row_order: tuple, col_order: tuple) -> str:
+    """
+    Reorders a puzzle and relabels its numbers in order of first appearance.
+
+    :param grid: The puzzle in the 81-character line format.
+    :param row_order: The source row of each row of the result.
+    :param col_order: The source column of each column of the result.
+    :return: The reordered and relabeled puzzle in the 81-character line format.
+    """
+    relabel = {'.': '.'}
+    output = []
+    for row in row_order:
+        offset = row * 9
+        for col in col_order:
+            number = grid[offset + col]
+            label = relabel.get(number)
+            if label is None:
+                label = relabel[number] = str(len(relabel))
+            output.append(label)
+    return ''.join(output)
+
+
+class SolutionCache(object):
+    """
+    A bounded cache of solutions keyed on the canonical form of each puzzle. Puzzles that
+    are the same up to a Sudoku symmetry share one entry, and the least recently used
+    entry is evicted when the cache is full.
+
+    Canonicalization costs about as much as solving an easy puzzle, so it is skipped where
+    it cannot pay off: a puzzle seen before in exactly the same form is answered from a
+    second LRU map keyed on the puzzle itself, and a puzzle that constraint propagation
+    settles without a guess (solved, or found to be unsolvable) is answered directly.
+    """
+    def __init__(self, max_size: int = 100000, engine=DancingLinksSolveSudoku):
+        """
+        Creates a SolutionCache object.
+
+        :param max_size: The largest number of solutions to keep.
+        :param engine: The solver class used on a cache miss.
+        """
+        self._max_size = max_size
+        self._engine = engine
+        self._solutions = OrderedDict()
+        # the (canonical form, solution) of the puzzles most recently seen, keyed as given
+        self._exact = OrderedDict()
+        self._hit_count = 0
+        self._miss_count = 0
+        self._propagated_count = 0
+
+    def solve(self, puzzle: str):
+        """
+        Solves a puzzle, using the cached solution of an equivalent puzzle if there is one.
+
+        :param puzzle: The puzzle in the 81-character line format ('.' or '0' for blanks).
+        :return: The solution in the 81-character line format, or None if the puzzle has
+            no solution.
+        """
+        return self.solve_with_status(puzzle)[0]
+
+    def solve_with_status(self, puzzle: str, budget: Budget = None) -> tuple:
+        """
+        Solves a puzzle like `solve`, within the limits of a budget on a cache miss. A
+        puzzle whose solve runs out of budget is not cached, so it is tried again the next
+        time it is seen.
+
+        :param puzzle: The puzzle in the 81-character line format ('.' or '0' for blanks).
+        :param budget: The limits of a solve on a cache miss, or None for no limits.
+        :return: A tuple containing the solution in the 81-character line format (or None)
+            and the status of the solve (SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED).
+        """
+        puzzle = puzzle.replace('0', '.')
+        if puzzle in self._exact:
+            self._hit_count += 1
+            self._exact.move_to_end(puzzle)
+            key, solution = self._exact[puzzle]
+            if key in self._solutions:
+                self._solutions.move_to_end(key)  # keep the canonical entry as recent as its puzzle
+            return solution, SOLVED if solution is not None else UNSOLVABLE
+
+        board = BitmaskPuzzle(puzzle)
+        solvable = board.is_valid() and propagate(board, [])
+        if not solvable or board.get_empty_count() == 0:
+            self._propagated_count += 1
+            solution = board.to_string() if solvable else None
+            self._remember(self._exact, puzzle, (None, solution))
+            return solution, SOLVED if solution is not None else UNSOLVABLE
+
+        key, transform = canonicalize(puzzle)
+        if key in self._solutions:
+            self._hit_count += 1
+            self._solutions.move_to_end(key)
+            solution = self._solutions[key]
+        else:
+            self._miss_count += 1
+            solver = self._engine(key)
+            result = solver.solve(budget)
+            if result.get_status() == BUDGET_EXHAUSTED:
+                return None, BUDGET_EXHAUSTED
+            solution = solver.get_puzzle().to_string() if result else None
+            self._remember(self._solutions, key, solution)
+        if solution is not None:
+            solution = transform.invert(solution)
+        self._remember(self._exact, puzzle, (key, solution))
+        return solution, SOLVED if solution is not None else UNSOLVABLE
+
+    def _remember(self, entries: OrderedDict, key: str, value) -> None:
+        """
+        Adds an entry to one of the LRU maps, evicting the least recently used entry when
+        the map is full.
+
+        :param entries: The map to add to.
+        :param key: The puzzle or canonical form.
+        :param value: The entry.
+        """
+        entries[key] = value
+        if len(entries) > self._max_size:
+            entries.popitem(last=False)
+
+    def get_hit_count(self) -> int:
+        """
+        Returns the number of puzzles answered from the cache.
+
+        :return: The number of cache hits.
+        """
+        return self._hit_count
+
+    def get_miss_count(self) -> int:
+        """
+        Returns the number of puzzles that had to be solved.
+
+        :return: The number of cache misses.
+        """
+        return self._miss_count
+
+    def get_propagated_count(self) -> int:
+        """
+        Returns the number of puzzles settled by constraint propagation without a lookup.
+
+        :return: The number of puzzles answered by propagation.
+        """
+        return self._propagated_count
+
+    def __len__(self) -> int:
+        """Returns the number of cached solutions."""
+        return len(self._solutions)
+
+
+def benchmark_cache(puzzles: list, variants: int = 20, engine=DancingLinksSolveSudoku, seed: int = 0) -> dict:
+    """
+    Solves a stream of random equivalent variants of each puzzle (the first unchanged,
+    so every puzzle is seen once as given) with and without a cache, e.g. to find where
+    the cache pays off.
+
+    :param puzzles: The puzzles in the 81-character line format.
+    :param variants: The number of variants of each puzzle in the stream.
+    :param engine: The solver class.
+    :param seed: The seed of the random transforms.
+    :return: A dictionary with the seconds taken with and without the cache and the
+        cache counters.
+    """
+    rng = random.Random(seed)
+    stream = [puzzle if variant == 0 else random_transform(rng).apply(puzzle)
+              for variant in range(variants) for puzzle in puzzles]
+
+    start_time = time.perf_counter()
+    for puzzle in stream:
+        engine(puzzle).solve()
+    solver_seconds = time.perf_counter() - start_time
+
+    cache = SolutionCache(engine=engine)
+    start_time = time.perf_counter()
+    for puzzle in stream:
+        cache.solve(puzzle)
+    cache_seconds = time.perf_counter() - start_time
+    return {'puzzles': len(stream), 'solver_seconds': solver_seconds, 'cache_seconds': cache_seconds,
+            'hits': cache.get_hit_count(), 'misses': cache.get_miss_count(),
+            'propagated': cache.get_propagated_count()}
+
+
+if __name__ == "__main__":
+    cache = SolutionCache()
+    puzzle = PUZZLES['medium']  # propagation alone solves the easier puzzles, with no lookup
+    # relabel the numbers, swap the first two bands and transpose to get an equivalent puzzle
+    relabeled = puzzle.translate(str.maketrans('123456789', '987654321'))
+    equivalent = transpose(relabeled[27:54] + relabeled[:27] + relabeled[54:])
+    print(cache.solve(puzzle))
+    print(cache.solve(equivalent))
+    print("hits: {}, misses: {}".format(cache.get_hit_count(), cache.get_miss_count()))
+
+    for name, puzzle in PUZZLES.items():
+        report = benchmark_cache([puzzle])
+        print("{:<18} {} variants: solver {:.1f}ms, cache {:.1f}ms ({} hits, {} misses, {} propagated)".format(
+            name, report['puzzles'], report['solver_seconds'] * 1000, report['cache_seconds'] * 1000,
+            report['hits'], report['misses'], report['propagated']))
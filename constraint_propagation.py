@@ -0,0 +1,371 @@
+# Author: Colin Francis
+# Description: Constraint propagation (naked and hidden singles) used to solve Sudoku puzzles
+import time
+from back_propagation_algorithm import DOT
+from bitmask_algorithm import BitmaskPuzzle, ALL_NUMBERS, bitmask_puzzle
+from geometry import Geometry, get_diagonal_geometry, get_jigsaw_geometry
+from puzzle_corpus import PUZZLES, GIANT_PUZZLES, VARIANT_PUZZLES, JIGSAW_REGIONS
+from solve_result import SolveResult, Budget, make_result, stats_wanted, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+
+# search orderings: visit the empty squares in row-major order, or always branch on the
+#   empty square with the fewest candidates (minimum remaining values)
+ROW_MAJOR, MINIMUM_REMAINING_VALUES = 'row-major', 'mrv'
+
+# number of set bits for every candidate bitmask of a 9x9 board
+POPCOUNT = tuple(bin(mask).count('1') for mask in range(ALL_NUMBERS + 1))
+
+
+def popcount(mask: int) -> int:
+    """
+    Returns the number of set bits of a candidate bitmask of any size of board.
+
+    :param mask: The bitmask.
+    :return: The number of candidates in the bitmask.
+    """
+    return bin(mask).count('1')
+
+
+def propagate(puzzle: BitmaskPuzzle, trail: list, candidates=None) -> bool:
+    """
+    Repeatedly places naked singles (a square with a single candidate) and hidden singles
+    (a number with a single possible square in a row, column, square region or extra
+    unit) until no more squares can be filled by deduction. Squares are visited by index
+    through the unit tables of the puzzle's Geometry.
+
+    :param puzzle: The puzzle to fill.
+    :param trail: A list that the index of each filled square is appended to, so that the
+        placements can be reverted with `undo`.
+    :param candidates: The function used to get the candidate bitmask of a square index,
+        e.g. one that counts the calls. Defaults to the puzzle's `candidates_at` method.
+    :return: False if a contradiction was found. Otherwise, True.
+    """
+    values = puzzle.get_values()
+    candidates = candidates or puzzle.candidates_at
+    set_at = puzzle.set_at
+    geometry = puzzle.get_geometry()
+    number_of, symbol_of, all_numbers = geometry.number_of, geometry.symbol_of, geometry.all_numbers
+    changed = True
+    while changed:
+        changed = False
+
+        # naked singles
+        for index in range(geometry.cell_count):
+            if values[index] != DOT:
+                continue
+            free = candidates(index)
+            if not free:
+                return False
+            if not free & (free - 1):
+                set_at(index, symbol_of[free.bit_length() - 1])
+                trail.append(index)
+                changed = True
+
+        # hidden singles
+        for unit in geometry.units:
+            placed = once = twice = 0
+            for index in unit:
+                value = values[index]
+                if value != DOT:
+                    placed |= 1 << number_of[value]
+                else:
+                    free = candidates(index)
+                    twice |= once & free
+                    once |= free
+            if (placed | once) != all_numbers:
+                return False  # a number has nowhere left to go in this unit
+
+            singles = once & ~twice & ~placed
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                for index in unit:
+                    if values[index] == DOT and candidates(index) & bit:
+                        set_at(index, symbol_of[bit.bit_length() - 1])
+                        trail.append(index)
+                        changed = True
+                        break
+                else:
+                    return False  # the only square for this number was taken by another single
+    return True
+
+
+def undo(puzzle: BitmaskPuzzle, trail: list, length: int) -> None:
+    """
+    Clears the squares filled since the trail had the specified length.
+
+    :param puzzle: The puzzle to revert.
+    :param trail: The list of filled square indices.
+    :param length: The length to shrink the trail back to.
+    :return: None.
+    """
+    while len(trail) > length:
+        puzzle.set_at(trail.pop(), '.')
+
+
+class PropagationSolveSudoku(object):
+    """
+    A class used to solve Sudoku puzzles. Constraint propagation is run before the search
+    and again after every guess, so most puzzles are solved with few or no guesses. The
+    search branches on the empty square with the fewest candidates unless the row-major
+    ordering is requested.
+    """
+    def __init__(self, puzzle, box_size: int = None, geometry: Geometry = None,
+                 ordering: str = MINIMUM_REMAINING_VALUES):
+        """Creates a PropagationSolveSudoku object with puzzle and ordering attributes."""
+        if ordering not in (ROW_MAJOR, MINIMUM_REMAINING_VALUES):
+            raise ValueError("Unknown search ordering: {}".format(ordering))
+        self._puzzle = bitmask_puzzle(puzzle, box_size, geometry)
+        # the table lookup is faster, but only fits the candidates of a 9x9 board
+        self._popcount = POPCOUNT.__getitem__ if self._puzzle.get_size() == 9 else popcount
+        self._ordering = ordering
+        self._trail = []
+        self._propagated_count = 0
+        self._node_count = 0
+        self._stop_reason = None
+        self._check_count = 0
+        self._backtrack_count = 0
+        self._max_depth = 0
+        self._candidates = self._puzzle.candidates_at
+
+    def solve(self, budget: Budget = None, collect_stats: bool = False) -> SolveResult:
+        """
+        Used to solve Sudoku puzzles.
+
+        :param budget: The limits of the solve, or None for no limits. Each guess counts
+            as a search node.
+        :param collect_stats: If True, the result carries a SolveStats. Stats are also
+            collected while a stats hook is registered.
+        :return: A SolveResult that is truthy if a solution has been found.
+        """
+        budget = budget or Budget()
+        collect_stats = stats_wanted(collect_stats)
+        status = UNSOLVABLE
+        for _ in self._search(budget, collect_stats):
+            status = SOLVED  # the puzzle is left holding the first solution
+            break
+        else:
+            if self._stop_reason is not None:
+                status = BUDGET_EXHAUSTED
+        return make_result(type(self).__name__, status, self._node_count, budget.get_elapsed(), self._stop_reason,
+                           collect_stats, self._check_count, self._backtrack_count, self._max_depth,
+                           self._propagated_count)
+
+    def count_solutions(self, limit: int = 2, budget: Budget = None) -> int:
+        """
+        Counts the solutions of the puzzle, stopping as soon as `limit` solutions have been
+        found. A limit of 2 is enough to tell whether the solution is unique. The search
+        works on the same puzzle and trail as `solve`, and the puzzle is restored to its
+        original state afterwards.
+
+        :param limit: The number of solutions to stop at, at least 1.
+        :param budget: The limits of the search, or None for no limits. If the budget runs
+            out first, the solutions found so far are counted and get_stop_reason tells
+            why the search stopped.
+        :return: The number of solutions found, at most `limit`.
+        """
+        if limit < 1:
+            raise ValueError("The solution limit must be at least 1, not {}".format(limit))
+        count = 0
+        for _ in self._search(budget):
+            count += 1
+            if count >= limit:
+                break
+        undo(self._puzzle, self._trail, 0)
+        return count
+
+    def is_unique(self, budget: Budget = None) -> bool:
+        """
+        Determines whether the puzzle has exactly one solution.
+
+        :param budget: The limits of the search, or None for no limits.
+        :return: True if the puzzle has exactly one solution. Otherwise, False, which is
+            also the answer when the budget runs out before uniqueness is proven.
+        """
+        return self.count_solutions(2, budget) == 1 and self._stop_reason is None
+
+    def get_stop_reason(self) -> str:
+        """
+        Returns the reason the last search stopped early.
+
+        :return: TIME_LIMIT, NODE_LIMIT or CANCELLED if the budget ran out. Otherwise, None.
+        """
+        return self._stop_reason
+
+    def get_propagated_count(self) -> int:
+        """
+        Returns the number of squares that were filled by propagation instead of a guess.
+
+        :return: The number of squares filled by propagation.
+        """
+        return self._propagated_count
+
+    def get_node_count(self) -> int:
+        """
+        Returns the number of search nodes visited, i.e. the number of guesses made.
+
+        :return: The number of search nodes.
+        """
+        return self._node_count
+
+    def _search(self, budget: Budget = None, count_checks: bool = False):
+        """
+        Searches for solutions, running constraint propagation before the search and after
+        every guess. Each time the puzzle is full, the search pauses with the solution in
+        place; resuming it backtracks to look for the next solution. Every square filled by
+        the search is recorded on the trail so that it can be undone. If the budget runs
+        out, the puzzle is restored and the reason is kept in the stop reason attribute.
+
+        :param budget: The limits of the search, or None for no limits.
+        :param count_checks: If True, every candidate bitmask computed is counted in the
+            check count attribute. Otherwise, the puzzle's method is used directly.
+        :return: A generator that yields once for each solution.
+        """
+        budget = budget or Budget()
+        next_check = budget.start()
+        self._trail = trail = []
+        self._propagated_count = self._node_count = 0
+        self._check_count = self._backtrack_count = self._max_depth = 0
+        self._stop_reason = None
+        self._candidates = self._counted_candidates if count_checks else self._puzzle.candidates_at
+        if not self._puzzle.is_valid():
+            return
+        if not propagate(self._puzzle, trail, self._candidates):
+            undo(self._puzzle, trail, 0)
+            return
+        self._propagated_count = len(trail)
+
+        # each stack entry is [square index, numbers left to try, trail length]
+        stack = []
+        symbol_of = self._puzzle.get_geometry().symbol_of
+        while True:
+            index = self._next_empty_square()
+            if index is None:
+                yield
+            else:
+                stack.append([index, self._candidates(index), len(trail)])
+                if len(stack) > self._max_depth:
+                    self._max_depth = len(stack)
+
+            while stack:
+                index, free, length = stack[-1]
+                undo(self._puzzle, trail, length)
+                if not free:
+                    stack.pop()  # back propagate
+                    self._backtrack_count += 1
+                    continue
+
+                bit = free & -free
+                stack[-1][1] = free ^ bit
+                self._puzzle.set_at(index, symbol_of[bit.bit_length() - 1])
+                trail.append(index)
+                self._node_count += 1
+                if self._node_count >= next_check:
+                    self._stop_reason = budget.exceeded(self._node_count)
+                    if self._stop_reason is not None:
+                        undo(self._puzzle, trail, 0)
+                        return
+                    next_check = budget.next_check(self._node_count)
+                before = len(trail)
+                propagated = propagate(self._puzzle, trail, self._candidates)
+                self._propagated_count += len(trail) - before
+                if propagated:
+                    break
+            else:
+                undo(self._puzzle, trail, 0)
+                return
+
+    def _next_empty_square(self):
+        """
+        Finds the next empty square to branch on according to the search ordering.
+
+        :return: The index of the square, or None if the puzzle is full.
+        """
+        if self._ordering == MINIMUM_REMAINING_VALUES:
+            return self._fewest_candidates_square()
+
+        index = self._puzzle.get_values().find(DOT)
+        return index if index >= 0 else None
+
+    def _fewest_candidates_square(self):
+        """
+        Finds the empty square with the fewest candidates. Propagation has already filled
+        every square with a single candidate, so the scan stops at the first square with
+        two candidates.
+
+        :return: The index of the square, or None if the puzzle is full.
+        """
+        best_square, best_count = None, self._puzzle.get_size() + 1
+        for index, value in enumerate(self._puzzle.get_values()):
+            if value != DOT:
+                continue
+            count = self._popcount(self._candidates(index))
+            if count < best_count:
+                best_square, best_count = index, count
+                if count <= 2:
+                    return best_square
+        return best_square
+
+    def _counted_candidates(self, index: int) -> int:
+        """
+        Returns the candidate bitmask of a square and counts the check.
+
+        :param index: The index of the square.
+        :return: A bitmask with bit `n` set if the number `n` may be placed.
+        """
+        self._check_count += 1
+        return self._puzzle.candidates_at(index)
+
+    def get_puzzle(self) -> BitmaskPuzzle:
+        """
+        Returns the puzzle being solved, which holds the solution once `solve` succeeds.
+
+        :return: The Puzzle object.
+        """
+        return self._puzzle
+
+    def __str__(self):
+        """Prints the current state of the puzzle in human-readable form."""
+        return self._puzzle.__str__()
+
+
+def compare_orderings(puzzle: str) -> dict:
+    """
+    Solves the puzzle with each search ordering and reports the number of search nodes
+    that were visited.
+
+    :param puzzle: The puzzle in the 81-character line format.
+    :return: A dictionary mapping each ordering to its number of search nodes.
+    """
+    node_counts = {}
+    for ordering in (ROW_MAJOR, MINIMUM_REMAINING_VALUES):
+        solve = PropagationSolveSudoku(puzzle, ordering=ordering)
+        solve.solve()
+        node_counts[ordering] = solve.get_node_count()
+    return node_counts
+
+
+if __name__ == "__main__":
+    for name in PUZZLES:
+        solve = PropagationSolveSudoku(PUZZLES[name])
+        start_time = time.perf_counter()
+        solve.solve()
+        end_time = time.perf_counter()
+        print("{}: {:.4f}s, {} squares propagated, {} search nodes".format(
+            name, end_time - start_time, solve.get_propagated_count(), solve.get_node_count()))
+        print(solve)
+        print("Search nodes by ordering:", compare_orderings(PUZZLES[name]))
+        print("Unique solution:", PropagationSolveSudoku(PUZZLES[name]).is_unique())
+    for name in GIANT_PUZZLES:
+        solve = PropagationSolveSudoku(GIANT_PUZZLES[name])
+        start_time = time.perf_counter()
+        solve.solve()
+        end_time = time.perf_counter()
+        print("{}: {:.4f}s, {} squares propagated, {} search nodes".format(
+            name, end_time - start_time, solve.get_propagated_count(), solve.get_node_count()))
+        print(solve)
+    for name, geometry in (('diagonal', get_diagonal_geometry()), ('jigsaw', get_jigsaw_geometry(JIGSAW_REGIONS))):
+        solve = PropagationSolveSudoku(VARIANT_PUZZLES[name], geometry=geometry)
+        solve.solve()
+        print("{}: {} search nodes, unique solution: {}".format(
+            name, solve.get_node_count(), PropagationSolveSudoku(VARIANT_PUZZLES[name], geometry=geometry).is_unique()))
+        print(solve)
@@ -0,0 +1,312 @@
+# Author: Colin Francis
+# Description: Dancing Links (Algorithm X) exact cover solver for Sudoku puzzles
+import time
+from back_propagation_algorithm import Puzzle
+from geometry import Geometry
+from puzzle_corpus import PUZZLES
+from solve_result import SolveResult, Budget, make_result, stats_wanted, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED
+
+# the exact cover matrix of a 9x9 puzzle has one column for each constraint:
+#   0 - 80: a number is placed in square (row, col)
+#   81 - 161: the number `n` is placed in row `row`
+#   162 - 242: the number `n` is placed in column `col`
+#   243 - 323: the number `n` is placed in square region `box`
+#   (a larger board has four groups of size * size columns in the same order, and a
+#   variant board has a further group of `size` columns for each extra unit)
+
+# the column headers of every matrix row, by Geometry (see matrix_row_columns)
+_row_columns = {}
+
+
+def matrix_row_columns(geometry: Geometry) -> tuple:
+    """
+    Returns the column headers of the matrix row of every number in every square, built
+    once for each Geometry: the square's column and the column of the number in each unit
+    of the square. Header 0 is the root, so constraint `c` has header `c + 1`.
+
+    :param geometry: The layout of the board.
+    :return: A tuple indexed by square, then by number - 1, of tuples of column headers.
+    """
+    if geometry not in _row_columns:
+        cell_count, size = geometry.cell_count, geometry.size
+        _row_columns[geometry] = tuple(
+            tuple((index + 1,) + columns for columns in zip(*[range(cell_count + unit * size + 1,
+                                                                    cell_count + (unit + 1) * size + 1)
+                                                              for unit in geometry.units_of[index]]))
+            for index in range(cell_count))
+    return _row_columns[geometry]
+
+
+class DancingLinksSolveSudoku(object):
+    """
+    A class used to solve Sudoku puzzles. The puzzle is converted into the exact cover
+    matrix (324 columns for 9x9) and solved with Knuth's Dancing Links, always branching
+    on the column with the fewest remaining rows. The columns of a square are taken from
+    the unit table of the Geometry, so jigsaw and diagonal puzzles are solved the same way.
+    """
+    def __init__(self, puzzle, box_size: int = None, geometry: Geometry = None):
+        """Creates a DancingLinksSolveSudoku object with a puzzle attribute."""
+        self._puzzle = Puzzle(puzzle, box_size, geometry)
+        geometry = self._puzzle.get_geometry()
+        # a column for each square, then one for each number of each unit
+        self._column_count = geometry.cell_count + len(geometry.units) * geometry.size
+        # the links are kept in flat lists, node 0 is the root, nodes 1 - 324 (for 9x9) are
+        #   the column headers and every following group of four nodes (one per column of
+        #   the square, so more on a variant board) is a matrix row
+        self._left, self._right, self._up, self._down = [], [], [], []
+        self._column = []
+        self._size = [0] * (self._column_count + 1)
+        self._row_of_node = []
+        self._candidates = []
+        self._budget = None
+        self._node_count = 0
+        self._next_check = 0
+        self._stop_reason = None
+        self._check_count = 0
+        self._backtrack_count = 0
+        self._max_depth = 0
+
+    def solve(self, budget: Budget = None, collect_stats: bool = False) -> SolveResult:
+        """
+        Used to solve Sudoku puzzles.
+
+        :param budget: The limits of the solve, or None for no limits. Each matrix row
+            tried counts as a search node.
+        :param collect_stats: If True, the result carries a SolveStats. Stats are also
+            collected while a stats hook is registered.
+        :return: A SolveResult that is truthy if a solution has been found.
+        """
+        self._budget = budget or Budget()
+        self._next_check = self._budget.start()
+        self._node_count = self._check_count = self._backtrack_count = self._max_depth = 0
+        self._stop_reason = None
+        # a repeated number or a character that is not a symbol can never be solved, and
+        #   has no row in the matrix
+        if not self._puzzle.is_valid() or not self._build_matrix():
+            status = UNSOLVABLE
+        else:
+            solution = []
+            if self._search(solution):
+                status = SOLVED
+                symbol_of = self._puzzle.get_geometry().symbol_of
+                for candidate in solution:
+                    row_index, col_index, number = self._candidates[candidate]
+                    self._puzzle.set(row_index, col_index, symbol_of[number])
+            else:
+                status = BUDGET_EXHAUSTED if self._stop_reason is not None else UNSOLVABLE
+        return make_result(type(self).__name__, status, self._node_count, self._budget.get_elapsed(),
+                           self._stop_reason, stats_wanted(collect_stats), self._check_count, self._backtrack_count,
+                           self._max_depth)
+
+    def _build_matrix(self) -> bool:
+        """
+        Builds the exact cover matrix for the variable squares of the puzzle. The columns
+        satisfied by preset values are covered before the search starts.
+
+        :return: True if the preset values do not conflict. Otherwise, False.
+        """
+        # root and column headers are linked into a circular list
+        column_count = self._column_count
+        header_count = column_count + 1
+        self._left = [index - 1 for index in range(header_count)]
+        self._left[0] = column_count
+        self._right = [index + 1 for index in range(header_count)]
+        self._right[column_count] = 0
+        self._up = list(range(header_count))
+        self._down = list(range(header_count))
+        self._column = list(range(header_count))
+        self._row_of_node = [-1] * header_count
+
+        presets = []
+        geometry, values, presets_mask = self._puzzle.get_geometry(), self._puzzle.get_values(), \
+            self._puzzle.get_presets()
+        row_columns = matrix_row_columns(geometry)
+        for index in range(geometry.cell_count):
+            row_index, col_index = geometry.row_of[index], geometry.col_of[index]
+            if presets_mask >> index & 1:
+                number = geometry.number_of[values[index]]
+                if number == 0:
+                    return False  # not a symbol of the board
+                presets.append(self._add_row(row_index, col_index, number, row_columns[index][number - 1]))
+            else:
+                for number, columns in enumerate(row_columns[index], 1):
+                    self._add_row(row_index, col_index, number, columns)
+
+        # cover the columns of each preset value; a column that is already covered means
+        #   two presets conflict
+        covered = set()
+        for nodes in presets:
+            for node in nodes:
+                if self._column[node] in covered:
+                    return False
+                covered.add(self._column[node])
+                self._cover(self._column[node])
+        return True
+
+    def _add_row(self, row_index: int, col_index: int, number: int, columns: tuple) -> range:
+        """
+        Appends the matrix row for placing `number` in the square at the specified row
+        index and column index.
+
+        :param row_index: The row index of the square.
+        :param col_index: The column index of the square.
+        :param number: The number being placed.
+        :param columns: A tuple of the column headers of the row: the square's column and
+            the column of the number in each unit of the square.
+        :return: The nodes of the new row.
+        """
+        left, right, up, down, sizes = self._left, self._right, self._up, self._down, self._size
+        first_node = len(left)
+        length = len(columns)
+        candidate = len(self._candidates)
+        self._candidates.append((row_index, col_index, number))
+        for offset, column in enumerate(columns):
+            node = first_node + offset
+            # link the node into its row, which is circular over the row's nodes
+            left.append(first_node + (offset - 1) % length)
+            right.append(first_node + (offset + 1) % length)
+            # link the node into the bottom of its column
+            up.append(up[column])
+            down.append(column)
+            down[up[column]] = node
+            up[column] = node
+            sizes[column] += 1
+        self._column.extend(columns)
+        self._row_of_node.extend([candidate] * length)
+        return range(first_node, first_node + length)
+
+    def _search(self, solution: list) -> bool:
+        """
+        Searches for an exact cover, choosing the column with the fewest rows at each
+        level. The levels are kept in lists rather than on the call stack, so a 25x25
+        board (up to 625 levels) needs no more than the default recursion limit. The search
+        stops without restoring the matrix once the budget runs out.
+
+        :param solution: A list of the candidate rows chosen so far.
+        :return: True if an exact cover has been found. Otherwise, False.
+        """
+        left, right, down, column_of, sizes = self._left, self._right, self._down, self._column, self._size
+        columns, rows = [], []  # the column chosen at each level and the row being tried in it
+        advance = True  # True to go a level deeper, False to move on to the next row of a level
+        while True:
+            if advance:
+                if right[0] == 0:
+                    return True  # every column is covered
+
+                # choose the column with the fewest remaining rows
+                column, smallest, compared = 0, self._column_count + 1, 0
+                current = right[0]
+                while current != 0:
+                    compared += 1
+                    if sizes[current] < smallest:
+                        column, smallest = current, sizes[current]
+                        if smallest <= 1:
+                            break
+                    current = right[current]
+                self._check_count += compared
+                if smallest == 0:
+                    advance = False
+                    continue
+                if len(solution) >= self._max_depth:
+                    self._max_depth = len(solution) + 1
+                self._cover(column)
+                columns.append(column)
+                rows.append(down[column])
+            else:
+                if not columns:
+                    return False
+                # take back the row tried at the deepest level and move on to the next one
+                row_node = rows[-1]
+                solution.pop()
+                self._backtrack_count += 1
+                node = left[row_node]
+                while node != row_node:
+                    self._uncover(column_of[node])
+                    node = left[node]
+                rows[-1] = down[row_node]
+
+            column, row_node = columns[-1], rows[-1]
+            if row_node == column:
+                # every row of the column has been tried, so go back a level
+                self._uncover(column)
+                columns.pop()
+                rows.pop()
+                advance = False
+                continue
+
+            self._node_count += 1
+            if self._node_count >= self._next_check:
+                self._stop_reason = self._budget.exceeded(self._node_count)
+                if self._stop_reason is not None:
+                    return False
+                self._next_check = self._budget.next_check(self._node_count)
+
+            solution.append(self._row_of_node[row_node])
+            node = right[row_node]
+            while node != row_node:
+                self._cover(column_of[node])
+                node = right[node]
+            advance = True
+
+    def _cover(self, column: int) -> None:
+        """
+        Removes `column` from the header list and every row that intersects it from the
+        other columns.
+
+        :param column: The column header to cover.
+        :return: None.
+        """
+        left, right, up, down = self._left, self._right, self._up, self._down
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        row_node = down[column]
+        while row_node != column:
+            node = right[row_node]
+            while node != row_node:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                self._size[self._column[node]] -= 1
+                node = right[node]
+            row_node = down[row_node]
+
+    def _uncover(self, column: int) -> None:
+        """
+        Reverses `_cover`, restoring `column` and the rows that intersect it.
+
+        :param column: The column header to uncover.
+        :return: None.
+        """
+        left, right, up, down = self._left, self._right, self._up, self._down
+        row_node = up[column]
+        while row_node != column:
+            node = left[row_node]
+            while node != row_node:
+                self._size[self._column[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row_node = up[row_node]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def get_puzzle(self) -> Puzzle:
+        """
+        Returns the puzzle being solved, which holds the solution once `solve` succeeds.
+
+        :return: The Puzzle object.
+        """
+        return self._puzzle
+
+    def __str__(self):
+        """Prints the current state of the puzzle in human-readable form."""
+        return self._puzzle.__str__()
+
+
+if __name__ == "__main__":
+    for name in PUZZLES:
+        solve = DancingLinksSolveSudoku(PUZZLES[name])
+        start_time = time.perf_counter()
+        solve.solve()
+        end_time = time.perf_counter()
+        print("{}: {:.4f}s".format(name, end_time - start_time))
+        print(solve)
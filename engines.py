@@ -0,0 +1,83 @@
+# Author: Colin Francis
+# Description: The registry of Sudoku solver engines shared by the GUIs and the command line tools
+from back_propagation_algorithm import SolveSudoku
+from bitmask_algorithm import BitmaskSolveSudoku
+from constraint_propagation import PropagationSolveSudoku
+from dancing_links_algorithm import DancingLinksSolveSudoku
+from geometry import Geometry
+from solve_result import Budget
+
+# An engine is a class that is created as engine(puzzle, box_size=None, geometry=None) from
+#   a puzzle (a matrix of one-character strings, an 81-character string or the 81 stored
+#   values of a Puzzle), the box size of a larger board and the layout of a variant such as
+#   jigsaw or diagonal Sudoku, and has:
+#     solve(budget=None, collect_stats=False) -> SolveResult
+#     get_puzzle() -> Puzzle, which holds the solution once `solve` succeeds
+#   and optionally steps(), a generator of (kind, row, col, number) tuples that solves the
+#   puzzle one step at a time (see SolveSudoku.steps).
+ENGINES = {}
+
+# the engine used when none is named; Dancing Links has the best worst case in benchmark.py
+DEFAULT_ENGINE = 'dancing-links'
+
+
+def register_engine(name: str, engine) -> None:
+    """
+    Adds an engine to the registry, so that it can be chosen by name in the GUIs,
+    batch_solve.py and benchmark.py.
+
+    :param name: The name of the engine, e.g. 'dancing-links'.
+    :param engine: The engine class.
+    :return: None.
+    """
+    if name in ENGINES:
+        raise ValueError("An engine named {!r} is already registered".format(name))
+    ENGINES[name] = engine
+
+
+def get_engine(name: str):
+    """
+    Returns the engine class registered under `name`.
+
+    :param name: The name of the engine.
+    :return: The engine class.
+    """
+    if name not in ENGINES:
+        raise ValueError("Unknown engine: {!r} (choose from {})".format(name, ', '.join(sorted(ENGINES))))
+    return ENGINES[name]
+
+
+def has_steps(name: str) -> bool:
+    """
+    Determines whether an engine can solve a puzzle one step at a time, as the GUIs need
+    to animate the search.
+
+    :param name: The name of the engine.
+    :return: True if the engine has a `steps` method. Otherwise, False.
+    """
+    return hasattr(get_engine(name), 'steps')
+
+
+def solve(puzzle, name: str = DEFAULT_ENGINE, budget: Budget = None, collect_stats: bool = False,
+          geometry: Geometry = None) -> tuple:
+    """
+    Solves a puzzle with the named engine.
+
+    :param puzzle: The puzzle, in any form the engines accept.
+    :param name: The name of the engine.
+    :param budget: The limits of the solve, or None for no limits.
+    :param collect_stats: If True, the result carries a SolveStats.
+    :param geometry: The layout of a variant puzzle, or None for a standard board.
+    :return: A tuple containing the solver, whose puzzle holds the solution if one was
+        found, and the SolveResult.
+    """
+    engine = get_engine(name)
+    solver = engine(puzzle) if geometry is None else engine(puzzle, geometry=geometry)
+    result = solver.solve(budget, collect_stats)
+    return solver, result
+
+
+register_engine('back-propagation', SolveSudoku)
+register_engine('bitmask', BitmaskSolveSudoku)
+register_engine('propagation', PropagationSolveSudoku)
+register_engine('dancing-links', DancingLinksSolveSudoku)
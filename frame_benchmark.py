@@ -0,0 +1,132 @@
+# Author: Colin Francis
+# Description: Measures the frame time of the Sudoku boards with and without the render cache
+import argparse
+import json
+import os
+import sys
+import time
+from benchmark import percentile, PERCENTILES
+from dancing_links_algorithm import DancingLinksSolveSudoku
+from puzzle_corpus import CORPORA
+
+# the boards that can be measured, by the module that defines them
+BOARDS = ('sudoku_solver', 'sudoku_board')
+
+
+def time_frames(board_module: str, frames: int, cached: bool) -> list:
+    """
+    Draws a full board `frames` times, moving the selected square every frame as the solve
+    animation does, and times each frame.
+
+    :param board_module: The module that defines the Board (see BOARDS).
+    :param frames: The number of frames to draw.
+    :param cached: True to draw with the render cache. Otherwise, fonts are looked up and
+        text is rendered on every frame.
+    :return: A list of frame times in seconds.
+    """
+    import pygame
+    import render_cache
+    module = __import__(board_module)
+    render_cache.clear()
+    render_cache.set_enabled(cached)
+    try:
+        board = module.Board()
+        solve = DancingLinksSolveSudoku(CORPORA['easy'][0])
+        solve.solve()
+        board.get_puzzle().get_values()[:] = solve.get_puzzle().get_values()
+        select = getattr(board, 'set_selected_square_coords', None) or board.set_selected_coords
+        update = getattr(board, 'update', None) or board.update_board
+
+        latencies = []
+        for frame in range(frames):
+            row_index, col_index = divmod(frame % 81, 9)
+            start_time = time.perf_counter()
+            select(module.BOARD_LEFT + (module.SQUARE_WIDTH * col_index),
+                   module.BOARD_TOP + (module.SQUARE_HEIGHT * row_index))
+            update((0, 0))
+            pygame.display.update()
+            latencies.append(time.perf_counter() - start_time)
+        return latencies
+    finally:
+        render_cache.set_enabled(True)
+
+
+def summarize(latencies: list) -> dict:
+    """
+    Summarizes a list of frame times.
+
+    :param latencies: The frame times in seconds.
+    :return: A dictionary with the frames per second and the frame time percentiles.
+    """
+    total_seconds = sum(latencies)
+    return {
+        'frames': len(latencies),
+        'fps': len(latencies) / total_seconds if total_seconds else 0.0,
+        'frame_ms': {label: percentile(latencies, fraction) * 1000 for label, fraction in PERCENTILES},
+    }
+
+
+def run_frame_benchmarks(boards: list, frames: int = 300, progress=None) -> dict:
+    """
+    Measures every board without the render cache (as before it existed) and with it.
+
+    :param boards: The modules of the boards to measure.
+    :param frames: The number of frames drawn for each measurement.
+    :param progress: A writable text stream for a summary line per run, or None.
+    :return: A dictionary with a list of results.
+    """
+    report = {'frames': frames, 'results': []}
+    for board_module in boards:
+        for cached in (False, True):
+            result = summarize(time_frames(board_module, frames, cached))
+            result.update({'board': board_module, 'cached': cached})
+            report['results'].append(result)
+            if progress is not None:
+                print("{:<14} {:<9} {:>8.1f} fps  p50 {:>7.2f}ms  p99 {:>7.2f}ms".format(
+                    board_module, 'cached' if cached else 'uncached', result['fps'], result['frame_ms']['p50'],
+                    result['frame_ms']['p99']), file=progress)
+    return report
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    :param argv: The arguments to parse. Defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the frame time of the Sudoku boards with and without "
+                                                 "the render cache and write the results as JSON.")
+    parser.add_argument('-b', '--board', action='append', choices=BOARDS,
+                        help="board to measure, may be repeated (default: all)")
+    parser.add_argument('-f', '--frames', type=int, default=300, help="frames drawn per run (default: 300)")
+    parser.add_argument('--headless', action='store_true', help="draw to SDL's dummy video driver instead of a window")
+    parser.add_argument('-o', '--output', default='-', help="file to write the JSON report to, '-' for stdout "
+                                                            "(default)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the frame benchmarks from the command line, printing a summary line per run to
+    stderr.
+
+    :param argv: The command line arguments. Defaults to sys.argv.
+    :return: The exit status.
+    """
+    args = parse_args(argv)
+    if args.headless:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    report = run_frame_benchmarks(args.board or list(BOARDS), args.frames, progress=sys.stderr)
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        json.dump(report, destination, indent=2)
+        destination.write('\n')
+    finally:
+        if destination is not sys.stdout:
+            destination.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
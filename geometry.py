@@ -0,0 +1,171 @@
+# Author: Colin Francis
+# Description: Index tables for Sudoku boards of any box size (9x9, 16x16, 25x25, ...) and variant layouts
+
+# the symbols used for the numbers 1, 2, 3, ... of a board; a 9x9 board uses '1' - '9' and
+#   larger boards carry on with letters, e.g. '1' - '9' and 'A' - 'G' for 16x16
+SYMBOLS = '123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# the largest box size whose numbers all have a symbol
+MAX_BOX_SIZE = 5
+
+
+class Geometry(object):
+    """
+    The index tables of a board with `size` = `box_size` ** 2 numbers, rows, columns and
+    regions. Squares are indexed row by row from 0 to `cell_count` - 1, and number `n`
+    (1 - `size`) is shown as `symbol_of[n]`. The regions are the `box_size` x `box_size`
+    boxes unless other regions are given (jigsaw Sudoku), and variants may add extra
+    units that must also hold each number once, e.g. the two diagonals.
+
+    Units are numbered rows first (0 - size - 1), then columns, then regions, then the
+    extra units, and every table is a flat tuple indexed by square, so the solvers look
+    squares up rather than computing them. Use `get_geometry`, `get_diagonal_geometry`
+    or `get_jigsaw_geometry` rather than creating these directly, so that the tables of
+    each layout are only built once.
+    """
+    def __init__(self, box_size: int, regions=None, extra_units=(), name: str = None):
+        """
+        Creates a Geometry object and builds its tables.
+
+        :param box_size: The number of squares along the side of a box, e.g. 3 for 9x9.
+        :param regions: The region (0 - size - 1) of each square, or None for boxes.
+        :param extra_units: Further units, each a sequence of `size` square indices.
+        :param name: The name of the layout, e.g. 'diagonal', or None for standard boxes.
+        """
+        if not 1 <= box_size <= MAX_BOX_SIZE:
+            raise ValueError("Box size must be 1 - {}, got {}".format(MAX_BOX_SIZE, box_size))
+        size = box_size * box_size
+        cell_count = size * size
+        self.box_size = box_size
+        self.size = size
+        self.cell_count = cell_count
+        self.name = name
+        # the bits of the numbers 1 - size, as used by the candidate bitmasks
+        self.all_numbers = (1 << (size + 1)) - 2
+        self.symbols = SYMBOLS[:size]
+        # '.' for 0 (an empty square) followed by the symbol of each number
+        self.symbol_of = '.' + self.symbols
+        # the number of each stored character, 0 for '.' and anything that isn't a symbol
+        self.number_of = [0] * 256
+        for number, symbol in enumerate(self.symbols, 1):
+            self.number_of[ord(symbol)] = number
+
+        # the row, column and region (box) of each square; regions are numbered left to
+        #   right and top to bottom for boxes
+        self.row_of = tuple(index // size for index in range(cell_count))
+        self.col_of = tuple(index % size for index in range(cell_count))
+        if regions is None:
+            self.box_of = tuple((index // size // box_size) * box_size + (index % size) // box_size
+                                for index in range(cell_count))
+        else:
+            self.box_of = tuple(regions)
+            if len(self.box_of) != cell_count or \
+                    any(self.box_of.count(region) != size for region in range(size)):
+                raise ValueError("Regions must give each of the {} squares one of {} regions of {} squares".format(
+                    cell_count, size, size))
+        self.rows = tuple(tuple(range(row_index * size, (row_index + 1) * size)) for row_index in range(size))
+        self.cols = tuple(tuple(range(col_index, cell_count, size)) for col_index in range(size))
+        self.boxes = tuple(tuple(index for index in range(cell_count) if self.box_of[index] == box)
+                           for box in range(size))
+        self.extra_units = tuple(tuple(unit) for unit in extra_units)
+        for unit in self.extra_units:
+            if len(set(unit)) != size or not all(0 <= index < cell_count for index in unit):
+                raise ValueError("An extra unit must have {} different squares, got {}".format(size, unit))
+        # every row, then every column, then every region, then the extra units
+        self.units = self.rows + self.cols + self.boxes + self.extra_units
+        # the same units as (row, col) squares
+        self.unit_squares = tuple(tuple(divmod(index, size) for index in unit) for unit in self.units)
+
+        # the units of each square: its row, column and region unit, followed by any
+        #   extra units it belongs to
+        first_extra = 3 * size
+        self.extra_units_of = tuple(tuple(first_extra + unit_index for unit_index, unit in enumerate(self.extra_units)
+                                          if index in unit) for index in range(cell_count))
+        self.units_of = tuple((self.row_of[index], size + self.col_of[index], 2 * size + self.box_of[index]) +
+                              self.extra_units_of[index] for index in range(cell_count))
+        # the squares that share a unit with each square (20 on a standard 9x9 board)
+        self.peers = tuple(tuple(sorted(set().union(*(self.units[unit] for unit in self.units_of[index])) - {index}))
+                           for index in range(cell_count))
+
+    def is_standard(self) -> bool:
+        """
+        Determines whether the board has boxes and no extra units.
+
+        :return: True for a standard board. Otherwise, False.
+        """
+        return self.name is None
+
+    def __repr__(self) -> str:
+        """Returns the geometry in a readable form."""
+        if self.name is None:
+            return "Geometry({0}x{0})".format(self.size)
+        return "Geometry({0}x{0}, {1})".format(self.size, self.name)
+
+
+# geometries built so far, keyed on box size or on (name, box size, ...)
+_geometries = {}
+
+
+def get_geometry(box_size: int = 3) -> Geometry:
+    """
+    Returns the shared Geometry of a box size, building it on first use.
+
+    :param box_size: The number of squares along the side of a box.
+    :return: The Geometry object.
+    """
+    if box_size not in _geometries:
+        _geometries[box_size] = Geometry(box_size)
+    return _geometries[box_size]
+
+
+def get_diagonal_geometry(box_size: int = 3) -> Geometry:
+    """
+    Returns the shared Geometry of diagonal Sudoku (Sudoku X), where both main diagonals
+    must also hold each number once.
+
+    :param box_size: The number of squares along the side of a box.
+    :return: The Geometry object.
+    """
+    key = ('diagonal', box_size)
+    if key not in _geometries:
+        size = box_size * box_size
+        diagonals = ([index * (size + 1) for index in range(size)], [(index + 1) * (size - 1) for index in range(size)])
+        _geometries[key] = Geometry(box_size, extra_units=diagonals, name='diagonal')
+    return _geometries[key]
+
+
+def get_jigsaw_geometry(regions: str) -> Geometry:
+    """
+    Returns the shared Geometry of a jigsaw Sudoku, whose regions are irregular shapes
+    instead of boxes.
+
+    :param regions: A string with one character per square, row by row, that names the
+        region of the square, e.g. '111222333...'. Any characters may be used as names.
+    :return: The Geometry object.
+    """
+    key = ('jigsaw', regions)
+    if key not in _geometries:
+        names = sorted(set(regions), key=regions.index)
+        _geometries[key] = Geometry(box_size_for(len(regions)), [names.index(name) for name in regions],
+                                    name='jigsaw')
+    return _geometries[key]
+
+
+def box_size_for(cell_count: int) -> int:
+    """
+    Finds the box size of a board from its number of squares.
+
+    :param cell_count: The number of squares, e.g. 81 or 256.
+    :return: The box size, e.g. 3 for 81 squares.
+    """
+    for box_size in range(1, MAX_BOX_SIZE + 1):
+        if box_size ** 4 == cell_count:
+            return box_size
+    raise ValueError("A Sudoku puzzle has 81, 256 or 625 squares (box size ** 4), got {}".format(cell_count))
+
+
+# the tables of the standard 9x9 board, built once when the module is imported: for each
+#   of the 81 squares its row, column and box, its three unit IDs and its 20 peers
+STANDARD = get_geometry(3)
+ROW_OF, COL_OF, BOX_OF = STANDARD.row_of, STANDARD.col_of, STANDARD.box_of
+UNITS_OF, PEERS = STANDARD.units_of, STANDARD.peers
@@ -0,0 +1,119 @@
+# Author: Colin Francis
+# Description: Measures how long the headless solver modules take to import and checks that they load no GUI
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# the modules a batch worker or service may import, which must not load pygame
+CORE_MODULES = ('geometry', 'solve_result', 'puzzle_corpus', 'back_propagation_algorithm', 'bitmask_algorithm',
+                'constraint_propagation', 'dancing_links_algorithm', 'engines', 'canonical_cache')
+
+# modules that are too heavy for the core: pygame (and SDL) are only for the GUIs, and
+#   numpy is only for the vectorized solver
+HEAVY_MODULES = ('pygame', 'numpy')
+
+# run in a fresh interpreter for each measurement, so nothing is imported already
+_PROBE = """
+import json, sys, time
+start_time = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start_time
+print(json.dumps({{'seconds': seconds, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def time_import(module: str, runs: int = 5) -> dict:
+    """
+    Imports a module in `runs` fresh interpreters and keeps the fastest import, which is
+    the least disturbed by other work on the machine.
+
+    :param module: The name of the module to import.
+    :param runs: The number of interpreters to start.
+    :return: A dictionary with the fastest import time in milliseconds and the heavy
+        modules that the import loaded.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    timings, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                cwd=directory, capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output.splitlines()[-1])
+        timings.append(probe['seconds'])
+        heavy.update(probe['heavy'])
+    return {'module': module, 'import_ms': min(timings) * 1000, 'heavy': sorted(heavy)}
+
+
+def run_import_benchmarks(modules: list, runs: int = 5, progress=None) -> dict:
+    """
+    Measures the import of every module.
+
+    :param modules: The names of the modules to import.
+    :param runs: The number of fresh interpreters per module.
+    :param progress: A writable text stream for a summary line per module, or None.
+    :return: A dictionary with a list of results.
+    """
+    report = {'python': sys.version.split()[0], 'runs': runs, 'results': []}
+    for module in modules:
+        result = time_import(module, runs)
+        report['results'].append(result)
+        if progress is not None:
+            print("{:<28} {:>7.2f}ms  {}".format(module, result['import_ms'], ', '.join(result['heavy']) or '-'),
+                  file=progress)
+    return report
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    :param argv: The arguments to parse. Defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Measure the import time of the headless solver modules and "
+                                                 "check that they do not load pygame.")
+    parser.add_argument('-m', '--module', action='append',
+                        help="module to measure, may be repeated (default: the solver core)")
+    parser.add_argument('-r', '--runs', type=int, default=5,
+                        help="fresh interpreters per module, the fastest is kept (default: 5)")
+    parser.add_argument('--limit-ms', type=float, default=None,
+                        help="exit with status 1 if any module takes longer than this to import")
+    parser.add_argument('-o', '--output', default='-', help="file to write the JSON report to, '-' for stdout "
+                                                            "(default)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the import benchmarks from the command line, printing a summary line per module
+    to stderr.
+
+    :param argv: The command line arguments. Defaults to sys.argv.
+    :return: The exit status: 1 if a module loaded a heavy module or went over the limit.
+        Otherwise, 0.
+    """
+    args = parse_args(argv)
+    report = run_import_benchmarks(args.module or list(CORE_MODULES), args.runs, progress=sys.stderr)
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        json.dump(report, destination, indent=2)
+        destination.write('\n')
+    finally:
+        if destination is not sys.stdout:
+            destination.close()
+
+    status = 0
+    for result in report['results']:
+        if result['heavy']:
+            print("{} loads {}".format(result['module'], ', '.join(result['heavy'])), file=sys.stderr)
+            status = 1
+        if args.limit_ms is not None and result['import_ms'] > args.limit_ms:
+            print("{} takes {:.2f}ms to import, over the {:g}ms limit".format(
+                result['module'], result['import_ms'], args.limit_ms), file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
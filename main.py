@@ -1,7 +1,7 @@
 # Author: Colin Francis
 # Description: Main file used to launch the sudoku solver
 
-from sudoku_solver import *
+from sudoku_solver import SudokuSolver
 
 if __name__ == "__main__":
     solve = SudokuSolver()
@@ -0,0 +1,189 @@
+# Author: Colin Francis
+# Description: A shared corpus of Sudoku puzzles used to check and compare the solvers
+
+# Puzzles are stored in the common 81-character line format, read row by row, where
+#   '.' marks a blank square.
+PUZZLES = {
+    'classic': '53..7....6..195....98....6.8...6...34..8.3..17...2...6.6....28....419..5....8..79',
+    'easy': '..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..',
+    'medium': '4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......',
+    'inkala': '8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..',
+    'golden_nugget': '.......39.....1..5..3.5.8....8.9...6.7...2...1..4.......9.8..5..2....6..4..7.....',
+    'anti_backtracking': '..............3.85..1.2.......5.7.....4...1...9.......5......73..2.1........4...9',
+}
+
+
+# Puzzles on larger boards, one string per row in the source, in the same line format with
+#   the letters after '9' used for the numbers 10 and up. Each has a unique solution, found
+#   by PropagationSolveSudoku and DancingLinksSolveSudoku in well under a second.
+GIANT_PUZZLES = {
+    '16x16': ('.GC5..4.B..DF..9'
+              '4.71.6......C..G'
+              '.3.69...A....1..'
+              '.9F......1....B.'
+              '7..B.8D9F..GE4..'
+              '.1..6..3D..9G...'
+              '.....AFG.4....76'
+              '.5.A.....B.398.2'
+              '.7.E..6....A4.5.'
+              '6...F....GC4.E17'
+              '2...CG54...B.3..'
+              '5C.....B....A.2.'
+              '9A5...G..7....3.'
+              '.8.DA.9....16..B'
+              '..67...29...1C.4'
+              '.....7..3D82....'),
+    '25x25': ('DC.8....M25...O6.4.IP.HJF'
+              'FH.G..OBA5.7.D.N3.M.14..I'
+              'LO.5.I61E4...9N..GJ..8CK.'
+              '...2....J..1E....8.DB....'
+              'I.E..D..K8.P..H..5A.3.NM9'
+              '..3..GE..H6I.4M.D....O.B5'
+              '4M16.8.D.C..P...LOB.9.A..'
+              '.J.CD.A9...LB5..I...F.E.G'
+              '.EP.F..LBOC..8J.9........'
+              '.K.OL...1.....A.FHPG..J.8'
+              '...9.....FIEH..8KDO.AL.NB'
+              '.8..K3.M69...B5...H....CP'
+              '14H......DF..P.5AL.BM92..'
+              'P..F.B..N.D.O7.2...3.I4..'
+              '....A......M.32G...PKD8..'
+              'J.8P.A.N.B...K....4MH...E'
+              'K..7.M9.4.B.2..IH.GEC.F8.'
+              'EI.1..DO5.PC8JFL...A...4.'
+              '.L..N.IHG13.4....P8......'
+              '.9..6JFC8.1.G..DO7...B.2.'
+              'O7LK.63..MA29.B.GE...J.D.'
+              '.3IM4CP8DJEGF.1.5.LO..B9.'
+              '.B.A2H1.....I63......K7.O'
+              'H.FE.O75...8..PB2A.N...I6'
+              '..D.8.B29AK5.O..4.I6G....'),
+}
+
+
+# Puzzles of Sudoku variants, each with a unique solution under its own rules but not as a
+#   standard puzzle (see the layouts in geometry.py). A diagonal puzzle also needs each
+#   number once on both main diagonals. A jigsaw puzzle has irregular regions in place of
+#   the boxes, given by JIGSAW_REGIONS with one character per square naming its region.
+JIGSAW_REGIONS = ('111122333'
+                  '111222333'
+                  '112222333'
+                  '444555566'
+                  '444555666'
+                  '744556666'
+                  '747788999'
+                  '777888999'
+                  '778888999')
+VARIANT_PUZZLES = {
+    'diagonal': '....1..72..2..49..9........54.3...................87.645........8...1.....17.....',
+    'jigsaw': '..4.1.87...2..49...5.......9..2....1.......9.........33.........4...6......5...3.',
+}
+
+# Graded corpora used by the benchmark. Every puzzle has a unique solution. Easy puzzles
+#   have 36 clues and medium puzzles are minimal (no clue can be removed), and both are
+#   solved by naked and hidden singles alone. Hard puzzles are minimal puzzles that need
+#   the most guesses from PropagationSolveSudoku among 400 generated ones. Pathological
+#   puzzles are the hardest puzzles above, along with hard puzzles rebuilt against
+#   row-major backtracking: the sparse rows are moved to the top and the numbers
+#   relabeled so that the first row of the solution is 987654321, which makes
+#   BitmaskSolveSudoku visit one to two million nodes.
+CORPORA = {
+    'easy': (
+        '8.73.659......71..59..8..2..2...5.8.3.9..8.5......1743...862.1..84.1367..65.....2',
+        '1..4.53...8......7..287.1.66...8..1.2.814..3..5.....2.5249.786...36....2.962.4..1',
+        '.67483..58.97.1...2........6..2.849..9.3.75.83...6.71..43.7.......839.54...1.5..7',
+        '243.75....8..3.4.5.5......3.3..2.9.81.5.48.62...69....3...59..1518...3..96.4.38..',
+        '...634.255.....69..4.5.9.7.2.4.95718..51...6....2.7..37........63...2489458.1....',
+        '81.5.2...426.38.....7...8....24...6...4391..2..82.64.3..162.5.46..8.5.19.9.....7.',
+        '9...2.5....3.4.12..5.891.7.5.7..39..1....9...869..5.32.4..1.76.....543.17.563....',
+        '.2961..3.5..24...9.1.839.5..9.18.....4..5.8..3...7254..5472....9...6.4.2.6...81..',
+        '.7126..95...3.162.2.9..5.8.6....275.....5.81.4.89..23.1...8.3....4.....85..7.694.',
+        '53...26.8..2.49...769.......78.9.5...46.51.73.1..8.4..4571.3......87...28....534.',
+        '.84..67...5.83..64.9...4.....84.3.2.47.56...1..62..4.5..3.81542.....29..12.3..8..',
+        '9..1..8....6.8.5.......6.7...254..1...4.....85.986.7...716.29..2.5.7..6.86.951427',
+        '2..76....9....4..55...8..37..5..3...73...6..269.5.7.43817...56.4.965....3...7142.',
+        '.19..24.843.71.52..2...9..72...5.1...5..7.6926...8..5..7.4.1......3..9.53648....1',
+        '..2.389..38.5196...9.27..83.......35.2..5.7..7...9.824......51.4.7..526.9..621...',
+        '.194...38.8..315..57.6.9......12.48....9.4.1.1428.7.958.7....5.4.....2.....712..3',
+        '..639....7..2.6.9..4..8531.....2.6...35.6.1282..1.4.7.5..61.4.9....3....3...78562',
+        '....9.671...361..4.1..84..5.3.9..74..965...1.8.7..65925..6....7.7..53..836....1..',
+        '9.1.7.4.645....2....6.8.5...6...87...4..96128.8.25.9...1.96.3..6...41.5...48..6.7',
+        '.4...15.9...93.1..9715.8...8....9....27..5.3.5.612348..54..26....9.....4..249.8.5',
+    ),
+    'medium': (
+        '7.4....5...9..72..5..23.1..1.84.3....3.68.9..............96.........56...4.1....7',
+        '..782......8.....3.2.5.9.1....7.....5..1...4......26.1.759.....3.....4.9...2.1..7',
+        '.6..1..9....7...81......5.....1.9....364...7..98.721..4...3.......9..25...9.8.7..',
+        '.261..4..59....17...3..9.....236....68...........9..5.8.5..4......8...9.....5..16',
+        '.3.24.5....51..3.7........8..2...73.467..81.......6...9.6.5....8.........43......',
+        '...2.........7.29..4......1..9.1..4...8....65.264...1..97..8........6.....1..4.7.',
+        '3.4.5............9..27.....76.....9........12..1.....7...6.....28.....419.5.32.78',
+        '6.....9.3.2.1...7..3.4...6.7.5..461.......3.........9.3..7.....9.4.615..5........',
+        '...7.....7...9.48.9.3....2....4..8..18..3.....6.8.9.7...7....43.3..1..........5.1',
+        '2.4..6.......1..6....5....7...1.....1.7....3.....897.26.....4...15.4..8...82....6',
+        '.....9....8.1.........875.2.698..7...4.5..2.8..7...4..4...6......8.2.9.......3..1',
+        '.351..7....43......6.....8...9....58....3.2.78.3.75......862.4..12..4............',
+        '1...6........1.2.8..63981.7..8.....93.....5.1.94.5.......6......4.2...5.........2',
+        '4...5..9......7.5...9.2.......68......5..1.84.815...2...7...9....4...6.1....64..2',
+        '5..17....9.4..2.5628......4.....3.......4..1.4.5...7..7..6......9..8.......31...2',
+        '1....5....2.....874.9..........3.......2.69..8.359......1...6...6..8.34.3......25',
+        '....236......8..79.....7..8.82.....46........3....5..2.7..42...1.....89...5....47',
+        '.596...3..62........3.19...5.....87..9..47.5.7.4...........6..5.3...5.1..8....39.',
+        '...4..6.7..5.........1.823..92.....6.....6.4.4...2.15......9.7...8...4..17.8.....',
+        '........1.9...24.6.34.19...2.....85.3....7..2.6......3....5........8429....3...6.',
+    ),
+    'hard': (
+        '.9....5..3.4..7...6......7...94...17...9.24..5.........1.5....6..8.63..9....89...',
+        '3...75.......2.1..1..3.82...7..3.9.....9....65..26..8.284....39..1.........7.....',
+        '2.4.......5...8.3..3.6..45.....9..1...1.369..6....5.4.3..5.9..1...7.2.........86.',
+        '5....2..8..4.....6..8....1..7..28....1..3..9...9.....3...4....5..1....3.4..1.58..',
+        '.1......765..4........5..6..695....34.........7.1....8.9.8..1.5.....58.6....9.7..',
+        '..4..6.....5...2...9....156....4...32...85.6.5..9..4......1..8......8...1.7.....4',
+        '.5...2....8...71.4..3...........1.53..1...9....965.7...7....2.6.9..1.4......8..7.',
+        '..3..4.8...5.....91.....7...27.....43.......28..2..1.3..2.69.3....1.....9..7.86..',
+        '..8...645........2..4.95....1..3.9.....42.3.1.....9.....2.6..3.6835......9......8',
+        '.4...2.....9.8..6....57..2.......78.45.7......1............16.3.61.5.4..3..9...18',
+        '6....2...4..5....97.2.....6..1.5..4...36.4.9.......5.13.62..1.....86...5.2...3...',
+        '...8..9...2.6...4...8..7...4..1..2.5..9......6.2..3..8.5.9......4....5......3..6.',
+        '4.....2978.3.....4.....4.....73....1.3.....2....6..5..91......8.4........2.7...56',
+        '8............1...6.65..97....78..2...3...4..5.2.1..6.46...8......92..4...4...3...',
+        '......2......4...62.95....7.1..6......29..4.548.....6......25..6......1.8..39....',
+        '.2...6.4..8.4...93.5..8......6.........947...2...189........5.17....42..5..1...7.',
+        '7......3.....29...5....469...7..84..1.5..........4......1.........23..8.8..9..56.',
+        '.2..6....4..1.....3....9.6......47...1..7.92..9..23..6....9.2..........5..2..5381',
+        '...3.4..8..4..2.....6..814.9........185....6.4.3..95..598.........4....9....6....',
+        '...61...483..5..1.......2..2..43...6..8..2.7.......9..5..1....2.........6.4.97...',
+    ),
+    'pathological': (
+        PUZZLES['inkala'],
+        PUZZLES['golden_nugget'],
+        PUZZLES['anti_backtracking'],
+        '..........2..39.....58.2.9..7....1.....1.7.8...6.9...41.....2....35...6...2.48..9',
+        '..7..4.....3.9....6......5.........98......3.326..5.......6.5.....5734...39.486..',
+        '.8.............97.21.9......2...6.....3.7..5....19..6......85.4.58.1.2..4..3...87',
+        '.......2....2.78...42.....5...5......1..4....72.1.35....1............7833..9.821.',
+        '.8..5....6..7.....2....1.5.........9....1.8....8..9237.....64...7..4.18..1..82..5',
+    ),
+}
+
+
+def layout_from_string(puzzle: str) -> list:
+    """
+    Converts a puzzle in the 81-character line format into the matrix (list-of-lists)
+    layout used by the solvers.
+
+    :param puzzle: The puzzle as an 81-character string, '.' or '0' for blanks.
+    :return: A matrix (list-of-lists) of one-character strings representing the puzzle.
+    """
+    puzzle = puzzle.replace('0', '.')
+    return [list(puzzle[row_index * 9:(row_index + 1) * 9]) for row_index in range(9)]
+
+
+def layout_to_string(layout: list) -> str:
+    """
+    Converts a matrix (list-of-lists) puzzle layout into the 81-character line format.
+
+    :param layout: A matrix (list-of-lists) of one-character strings.
+    :return: The puzzle as an 81-character string.
+    """
+    return ''.join(''.join(row) for row in layout)
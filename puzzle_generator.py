@@ -0,0 +1,242 @@
+# Author: Colin Francis
+# Description: Generates Sudoku puzzles that have a unique solution
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from back_propagation_algorithm import DOT
+from bitmask_algorithm import BitmaskPuzzle
+from constraint_propagation import PropagationSolveSudoku, propagate, undo
+from batch_solve import silence_stdout
+from solve_result import Budget
+
+# functions giving the squares (0 - 80, row * 9 + col) that must be removed together with
+#   `square` to keep the clue pattern symmetric
+SYMMETRIES = {
+    'none': lambda square: (square,),
+    'rotational': lambda square: (square, 80 - square),
+    'mirror': lambda square: (square, (square // 9) * 9 + 8 - square % 9),
+}
+
+# the most search nodes a uniqueness check may visit; a removal that cannot be proven to
+#   keep the solution unique within it is undone. Generated puzzles rarely need more than
+#   a few dozen, and a node limit (unlike a time limit) keeps seeded runs reproducible
+UNIQUENESS_MAX_NODES = 10000
+
+
+def generate_solution(rng: random.Random) -> str:
+    """
+    Builds a random, completely filled Sudoku grid. The three square regions on the
+    diagonal do not share any rows or columns, so they are filled with random
+    permutations first and the rest of the grid is completed by `fill_grid`.
+
+    :param rng: The random number generator to use.
+    :return: The grid in the 81-character line format.
+    """
+    while True:
+        grid = ['.'] * 81
+        for box in range(3):
+            numbers = [str(number) for number in rng.sample(range(1, 10), 9)]
+            for offset, number in enumerate(numbers):
+                grid[(box * 3 + offset // 3) * 9 + box * 3 + offset % 3] = number
+        puzzle = BitmaskPuzzle(''.join(grid))
+        if fill_grid(puzzle, rng):
+            return puzzle.to_string()
+
+
+def fill_grid(puzzle: BitmaskPuzzle, rng: random.Random) -> bool:
+    """
+    Completes a puzzle with a search that tries the candidates of each square in a random
+    order, so the completions of the same clues vary from seed to seed (the solvers always
+    try the smallest number first). Constraint propagation runs after every guess.
+
+    :param puzzle: The puzzle to fill in place.
+    :param rng: The random number generator to use.
+    :return: True if the puzzle was completed. Otherwise, False, and the puzzle is left as
+        it was.
+    """
+    trail = []
+    if not propagate(puzzle, trail):
+        undo(puzzle, trail, 0)
+        return False
+
+    # each stack entry is [square index, numbers left to try, trail length]
+    stack = []
+    symbol_of = puzzle.get_geometry().symbol_of
+    while True:
+        index = puzzle.get_values().find(DOT)
+        if index < 0:
+            return True
+        free = puzzle.candidates_at(index)
+        numbers = [symbol_of[number] for number in range(free.bit_length()) if free >> number & 1]
+        rng.shuffle(numbers)
+        stack.append([index, numbers, len(trail)])
+
+        while stack:
+            index, numbers, length = stack[-1]
+            undo(puzzle, trail, length)
+            if not numbers:
+                stack.pop()
+                continue
+            puzzle.set_at(index, numbers.pop())
+            trail.append(index)
+            if propagate(puzzle, trail):
+                break
+        else:
+            undo(puzzle, trail, 0)
+            return False
+
+
+def make_puzzle(solution: str, rng: random.Random, target_clues: int = 0, symmetry: str = 'none',
+                max_nodes: int = UNIQUENESS_MAX_NODES) -> str:
+    """
+    Removes clues from a solved grid in a random order, keeping each removal only if the
+    puzzle still has a unique solution.
+
+    :param solution: A completely filled grid in the 81-character line format.
+    :param rng: The random number generator to use.
+    :param target_clues: Stop once the puzzle has this many clues or fewer. With 0, clues
+        are removed until no more can be removed.
+    :param symmetry: The name of the clue pattern symmetry (see SYMMETRIES).
+    :param max_nodes: The most search nodes each uniqueness check may visit, or None for
+        no limit.
+    :return: The puzzle in the 81-character line format.
+    """
+    partners = SYMMETRIES[symmetry]
+    budget = Budget(max_nodes=max_nodes)
+    grid = list(solution)
+    clue_count = 81
+    squares = list(range(81))
+    rng.shuffle(squares)
+    for square in squares:
+        if clue_count <= target_clues:
+            break
+        removed = [partner for partner in set(partners(square)) if grid[partner] != '.']
+        if not removed:
+            continue
+        saved = [grid[partner] for partner in removed]
+        for partner in removed:
+            grid[partner] = '.'
+        if PropagationSolveSudoku(''.join(grid)).is_unique(budget):
+            clue_count -= len(removed)
+        else:
+            for partner, number in zip(removed, saved):
+                grid[partner] = number
+    return ''.join(grid)
+
+
+def generate_puzzle(seed, target_clues: int = 0, symmetry: str = 'none',
+                    max_nodes: int = UNIQUENESS_MAX_NODES) -> str:
+    """
+    Generates a single puzzle with a unique solution.
+
+    :param seed: The seed for the random number generator. The same seed always gives the
+        same puzzle.
+    :param target_clues: Stop removing clues once the puzzle has this many clues or fewer.
+    :param symmetry: The name of the clue pattern symmetry (see SYMMETRIES).
+    :param max_nodes: The most search nodes each uniqueness check may visit, or None for
+        no limit.
+    :return: The puzzle in the 81-character line format.
+    """
+    rng = random.Random(seed)
+    return make_puzzle(generate_solution(rng), rng, target_clues, symmetry, max_nodes)
+
+
+def generate(count: int, target_clues: int = 0, symmetry: str = 'none', seed: int = None, workers: int = 1,
+             chunksize: int = 16, max_nodes: int = UNIQUENESS_MAX_NODES):
+    """
+    Generates puzzles across a pool of worker processes. Puzzle `n` is generated from the
+    seed `seed + n`, so a seeded run gives the same puzzles with any number of workers.
+
+    :param count: The number of puzzles to generate.
+    :param target_clues: Stop removing clues once a puzzle has this many clues or fewer.
+    :param symmetry: The name of the clue pattern symmetry (see SYMMETRIES).
+    :param seed: The base seed. Defaults to a random seed.
+    :param workers: The number of worker processes. With 1, puzzles are generated in this
+        process.
+    :param chunksize: The number of puzzles handed to a worker process at a time.
+    :param max_nodes: The most search nodes each uniqueness check may visit, or None for
+        no limit.
+    :return: A generator of puzzles in the 81-character line format, in seed order.
+    """
+    if symmetry not in SYMMETRIES:
+        raise ValueError("Unknown symmetry: {}".format(symmetry))
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    tasks = ((seed + index, target_clues, symmetry, max_nodes) for index in range(count))
+    if workers == 1:
+        yield from map(_generate_task, tasks)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(_generate_task, tasks, chunksize)
+
+
+def _generate_task(task: tuple) -> str:
+    """
+    Generates a single puzzle. Used directly and by the worker processes.
+
+    :param task: A tuple containing the seed, the target clue count, the symmetry and the
+        node limit of the uniqueness checks.
+    :return: The puzzle in the 81-character line format.
+    """
+    return generate_puzzle(*task)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    :param argv: The arguments to parse. Defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Generate Sudoku puzzles with a unique solution, written one "
+                                                 "per line in the 81-character format.")
+    parser.add_argument('-n', '--count', type=int, default=1, help="number of puzzles to generate (default: 1)")
+    parser.add_argument('-t', '--clues', type=int, default=0,
+                        help="stop removing clues at this many clues, 0 for as few as possible (default: 0)")
+    parser.add_argument('-s', '--symmetry', choices=sorted(SYMMETRIES), default='none',
+                        help="symmetry of the clue pattern (default: none)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for reproducible puzzles")
+    parser.add_argument('--max-nodes', type=int, default=UNIQUENESS_MAX_NODES,
+                        help="most search nodes per uniqueness check, 0 for no limit; a clue is kept if its "
+                             "removal cannot be checked within it (default: {})".format(UNIQUENESS_MAX_NODES))
+    parser.add_argument('-o', '--output', default='-', help="file to write puzzles to, '-' for stdout (default)")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="number of worker processes, 0 for one per CPU (default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the puzzle generator from the command line and prints the throughput to stderr.
+
+    :param argv: The command line arguments. Defaults to sys.argv.
+    :return: The exit status.
+    """
+    args = parse_args(argv)
+    destination = sys.stdout if args.output == '-' else open(args.output, 'w')
+    start_time = time.perf_counter()
+    try:
+        for puzzle in generate(args.count, args.clues, args.symmetry, args.seed, args.workers or os.cpu_count(),
+                               max_nodes=args.max_nodes or None):
+            destination.write(puzzle + '\n')
+        destination.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. `| head`): stop quietly, as other command line tools do
+        silence_stdout()
+        return 1
+    finally:
+        if destination is not sys.stdout:
+            destination.close()
+
+    seconds = time.perf_counter() - start_time
+    print("{} puzzles in {:.2f}s: {:.1f} puzzles/min".format(
+        args.count, seconds, args.count * 60 / seconds if seconds else 0.0), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# Author: Colin Francis
+# Description: Caches the fonts and rendered text surfaces used to draw the Sudoku boards
+import pygame
+
+# fonts loaded by (name, size), and rendered surfaces by (text, size, color, name)
+_fonts = {}
+_surfaces = {}
+
+# when False, every call looks up the font and renders the text again, as the boards did
+#   before the cache existed (used by frame_benchmark.py to measure the difference)
+_enabled = True
+
+
+def set_enabled(enabled: bool) -> None:
+    """
+    Turns the cache on or off. While it is off, fonts are looked up and text is rendered
+    on every call, and nothing is stored.
+
+    :param enabled: True to use the cache. Otherwise, False.
+    :return: None.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def clear() -> None:
+    """
+    Drops every cached font and surface, e.g. after the display has been re-created.
+
+    :return: None.
+    """
+    _fonts.clear()
+    _surfaces.clear()
+
+
+def get_font(name: str, size: int) -> pygame.font.Font:
+    """
+    Returns the system font with the specified name and size. `SysFont` searches the
+    installed fonts, so each font is only loaded the first time it is asked for.
+
+    :param name: The name of the font, e.g. 'Arial'.
+    :param size: The size of the font.
+    :return: The pygame Font object.
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    if not _enabled:
+        return pygame.font.SysFont(name, size)
+    font = _fonts.get((name, size))
+    if font is None:
+        font = _fonts[(name, size)] = pygame.font.SysFont(name, size)
+    return font
+
+
+def render_text(text: str, size: int, color: tuple, name: str = 'Arial') -> pygame.Surface:
+    """
+    Returns an anti-aliased surface showing `text`. Each distinct text, size, color and
+    font is rendered once; the board only ever shows the digits 1 - 9 and the button
+    labels, so the cache stays small.
+
+    :param text: The text to render.
+    :param size: The size of the font.
+    :param color: The color of the text.
+    :param name: The name of the font.
+    :return: The rendered pygame Surface. It is shared, so it must not be drawn on.
+    """
+    key = (text, size, color, name)
+    surface = _surfaces.get(key) if _enabled else None
+    if surface is None:
+        surface = get_font(name, size).render(text, True, color)
+        if _enabled:
+            _surfaces[key] = surface
+    return surface
+
+
+def preload(texts, size: int, color: tuple, name: str = 'Arial') -> None:
+    """
+    Renders several texts ahead of time so that the first frames do not pay for them.
+
+    :param texts: The texts to render, e.g. the digits '1' - '9'.
+    :param size: The size of the font.
+    :param color: The color of the text.
+    :param name: The name of the font.
+    :return: None.
+    """
+    for text in texts:
+        render_text(text, size, color, name)
@@ -0,0 +1,369 @@
+# Author: Colin Francis
+# Description: Results, statistics, budgets and cancellation shared by the Sudoku solvers
+import time
+
+# the outcomes of a solve
+SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED = 'solved', 'unsolvable', 'budget exhausted'
+
+# the reasons a solve ran out of budget
+TIME_LIMIT, NODE_LIMIT, CANCELLED = 'time limit', 'node limit', 'cancelled'
+
+# the number of search nodes between checks of the clock and the cancel token
+CHECK_INTERVAL = 256
+
+# callbacks that are given the SolveStats of every solve
+_stats_hooks = []
+
+
+def add_stats_hook(hook) -> None:
+    """
+    Registers a callback that is called with the SolveStats of every solve, e.g. to send
+    them to a metrics system. While any hook is registered, every solve collects stats.
+
+    :param hook: A callable taking a SolveStats object.
+    :return: None.
+    """
+    _stats_hooks.append(hook)
+
+
+def remove_stats_hook(hook) -> None:
+    """
+    Unregisters a callback added with `add_stats_hook`.
+
+    :param hook: The callable to remove.
+    :return: None.
+    """
+    _stats_hooks.remove(hook)
+
+
+def stats_wanted(collect_stats: bool = False) -> bool:
+    """
+    Determines whether a solve should collect stats.
+
+    :param collect_stats: True if the caller asked for stats.
+    :return: True if the caller asked for stats or a stats hook is registered.
+    """
+    return collect_stats or bool(_stats_hooks)
+
+
+def make_result(engine: str, status: str, node_count: int, seconds: float, reason: str = None,
+                collect_stats: bool = False, check_count: int = 0, backtrack_count: int = 0, max_depth: int = 0,
+                propagated_count: int = 0) -> 'SolveResult':
+    """
+    Builds the result of a solve. When stats are collected, they are attached to the
+    result and passed to every registered stats hook.
+
+    :param engine: The name of the solver class.
+    :param status: SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED.
+    :param node_count: The number of search nodes visited.
+    :param seconds: The time taken by the solve.
+    :param reason: TIME_LIMIT, NODE_LIMIT or CANCELLED for an exhausted budget.
+    :param collect_stats: True if the counters below were collected.
+    :param check_count: The number of candidate checks.
+    :param backtrack_count: The number of times the search backed up.
+    :param max_depth: The deepest level of the search.
+    :param propagated_count: The number of squares filled by propagation.
+    :return: The SolveResult.
+    """
+    stats = None
+    if collect_stats:
+        stats = SolveStats(engine, status, node_count, check_count, backtrack_count, max_depth, propagated_count,
+                           seconds)
+        for hook in list(_stats_hooks):
+            hook(stats)
+    return SolveResult(status, node_count, seconds, reason, stats)
+
+
+class SolveResult(object):
+    """
+    The outcome of a solve: SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED, along with the number
+    of search nodes visited and the time taken. A result is truthy only when the puzzle
+    was solved, so it can be tested like the bool the solvers used to return.
+    """
+    __slots__ = ('_status', '_node_count', '_seconds', '_reason', '_stats')
+
+    def __init__(self, status: str, node_count: int = 0, seconds: float = 0.0, reason: str = None,
+                 stats: 'SolveStats' = None):
+        """
+        Creates a SolveResult object.
+
+        :param status: SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED.
+        :param node_count: The number of search nodes visited.
+        :param seconds: The time taken by the solve.
+        :param reason: TIME_LIMIT, NODE_LIMIT or CANCELLED for an exhausted budget.
+        :param stats: The SolveStats of the solve, if they were collected.
+        """
+        self._status = status
+        self._node_count = node_count
+        self._seconds = seconds
+        self._reason = reason
+        self._stats = stats
+
+    def get_status(self) -> str:
+        """
+        Returns the outcome of the solve.
+
+        :return: SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED.
+        """
+        return self._status
+
+    def is_solved(self) -> bool:
+        """
+        Determines whether a solution was found.
+
+        :return: True if the puzzle was solved. Otherwise, False.
+        """
+        return self._status == SOLVED
+
+    def get_node_count(self) -> int:
+        """
+        Returns the number of search nodes visited before the solve stopped.
+
+        :return: The number of search nodes.
+        """
+        return self._node_count
+
+    def get_seconds(self) -> float:
+        """
+        Returns the time taken by the solve.
+
+        :return: The elapsed time in seconds.
+        """
+        return self._seconds
+
+    def get_reason(self) -> str:
+        """
+        Returns the limit that stopped the solve.
+
+        :return: TIME_LIMIT, NODE_LIMIT or CANCELLED, or None if the budget was not
+            exhausted.
+        """
+        return self._reason
+
+    def get_stats(self) -> 'SolveStats':
+        """
+        Returns the search statistics of the solve.
+
+        :return: The SolveStats, or None if stats were not collected.
+        """
+        return self._stats
+
+    def __bool__(self) -> bool:
+        """Returns True if the puzzle was solved."""
+        return self._status == SOLVED
+
+    def __repr__(self) -> str:
+        """Returns the result in a readable form, e.g. for logging."""
+        reason = ", {}".format(self._reason) if self._reason is not None else ''
+        return "SolveResult({}{}, {} nodes, {:.4f}s)".format(self._status, reason, self._node_count, self._seconds)
+
+
+class SolveStats(object):
+    """
+    The counters collected during a single solve. Each engine counts its own kind of
+    search node and candidate check: a number placed and a legality test for the cell by
+    cell solvers, a matrix row tried and a column header compared for Dancing Links, and a
+    guess and a candidate bitmask computed for constraint propagation.
+    """
+    __slots__ = ('_engine', '_status', '_node_count', '_check_count', '_backtrack_count', '_max_depth',
+                 '_propagated_count', '_seconds')
+
+    def __init__(self, engine: str, status: str, node_count: int = 0, check_count: int = 0, backtrack_count: int = 0,
+                 max_depth: int = 0, propagated_count: int = 0, seconds: float = 0.0):
+        """
+        Creates a SolveStats object.
+
+        :param engine: The name of the solver class.
+        :param status: SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED.
+        :param node_count: The number of search nodes expanded.
+        :param check_count: The number of candidate checks.
+        :param backtrack_count: The number of times the search backed up.
+        :param max_depth: The deepest level of the search.
+        :param propagated_count: The number of squares filled by propagation.
+        :param seconds: The wall time of the solve.
+        """
+        self._engine = engine
+        self._status = status
+        self._node_count = node_count
+        self._check_count = check_count
+        self._backtrack_count = backtrack_count
+        self._max_depth = max_depth
+        self._propagated_count = propagated_count
+        self._seconds = seconds
+
+    def get_engine(self) -> str:
+        """
+        Returns the name of the solver class that collected the stats.
+
+        :return: The engine name.
+        """
+        return self._engine
+
+    def get_status(self) -> str:
+        """
+        Returns the outcome of the solve.
+
+        :return: SOLVED, UNSOLVABLE or BUDGET_EXHAUSTED.
+        """
+        return self._status
+
+    def get_node_count(self) -> int:
+        """
+        Returns the number of search nodes expanded.
+
+        :return: The number of search nodes.
+        """
+        return self._node_count
+
+    def get_check_count(self) -> int:
+        """
+        Returns the number of candidate checks made by the search.
+
+        :return: The number of candidate checks.
+        """
+        return self._check_count
+
+    def get_backtrack_count(self) -> int:
+        """
+        Returns the number of times the search backed up to an earlier choice.
+
+        :return: The number of backtracks.
+        """
+        return self._backtrack_count
+
+    def get_max_depth(self) -> int:
+        """
+        Returns the deepest level of the search, i.e. the most choices that were in
+        place at once.
+
+        :return: The maximum search depth.
+        """
+        return self._max_depth
+
+    def get_propagated_count(self) -> int:
+        """
+        Returns the number of squares filled by propagation instead of a choice.
+
+        :return: The number of squares filled by propagation.
+        """
+        return self._propagated_count
+
+    def get_seconds(self) -> float:
+        """
+        Returns the wall time of the solve.
+
+        :return: The elapsed time in seconds.
+        """
+        return self._seconds
+
+    def as_dict(self) -> dict:
+        """
+        Returns the stats as a dictionary, e.g. for logging or JSON.
+
+        :return: A dictionary mapping each counter name to its value.
+        """
+        return {'engine': self._engine, 'status': self._status, 'nodes': self._node_count,
+                'candidate_checks': self._check_count, 'backtracks': self._backtrack_count,
+                'max_depth': self._max_depth, 'propagated': self._propagated_count, 'seconds': self._seconds}
+
+    def __repr__(self) -> str:
+        """Returns the stats in a readable form, e.g. for logging."""
+        return "SolveStats({})".format(', '.join("{}={}".format(key, value) for key, value in self.as_dict().items()))
+
+
+class CancelToken(object):
+    """
+    A flag used to stop a running solve from another thread. The solvers check the token
+    every CHECK_INTERVAL search nodes.
+    """
+    def __init__(self):
+        """Creates a CancelToken object."""
+        # a plain flag is enough: setting and reading an attribute is atomic, and the
+        #   solvers poll the token rather than wait on it
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Asks every solve using this token to stop.
+
+        :return: None.
+        """
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        """
+        Determines whether the token has been cancelled.
+
+        :return: True if `cancel` has been called. Otherwise, False.
+        """
+        return self._cancelled
+
+
+class Budget(object):
+    """
+    The limits of a single solve: a time limit, a search node limit and a cancel token,
+    any of which may be left out. The node count is compared against a precomputed
+    threshold in the search loop, so the clock and the token are only looked at every
+    CHECK_INTERVAL nodes and an unlimited budget costs next to nothing.
+    """
+    def __init__(self, time_limit: float = None, max_nodes: int = None, cancel_token: CancelToken = None,
+                 check_interval: int = CHECK_INTERVAL):
+        """
+        Creates a Budget object.
+
+        :param time_limit: The most seconds a solve may take, or None for no limit.
+        :param max_nodes: The most search nodes a solve may visit, or None for no limit.
+        :param cancel_token: A token that stops the solve when cancelled, or None.
+        :param check_interval: The number of search nodes between checks of the clock and
+            the cancel token.
+        """
+        self._time_limit = time_limit
+        self._max_nodes = max_nodes
+        self._cancel_token = cancel_token
+        self._check_interval = check_interval
+        self._start_time = 0.0
+        self._deadline = None
+
+    def start(self) -> int:
+        """
+        Starts the clock for a new solve.
+
+        :return: The node count at which the budget should first be checked.
+        """
+        self._start_time = time.perf_counter()
+        self._deadline = self._start_time + self._time_limit if self._time_limit is not None else None
+        return self.next_check(0)
+
+    def next_check(self, node_count: int) -> int:
+        """
+        Returns the node count at which the budget should next be checked.
+
+        :param node_count: The number of search nodes visited so far.
+        :return: The node count of the next check.
+        """
+        next_count = node_count + self._check_interval
+        return next_count if self._max_nodes is None else min(next_count, self._max_nodes)
+
+    def exceeded(self, node_count: int) -> str:
+        """
+        Checks the limits of the budget.
+
+        :param node_count: The number of search nodes visited so far.
+        :return: TIME_LIMIT, NODE_LIMIT or CANCELLED if the solve must stop. Otherwise,
+            None.
+        """
+        if self._max_nodes is not None and node_count >= self._max_nodes:
+            return NODE_LIMIT
+        if self._cancel_token is not None and self._cancel_token.is_cancelled():
+            return CANCELLED
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return TIME_LIMIT
+        return None
+
+    def get_elapsed(self) -> float:
+        """
+        Returns the time since `start` was called.
+
+        :return: The elapsed time in seconds.
+        """
+        return time.perf_counter() - self._start_time
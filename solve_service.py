@@ -0,0 +1,496 @@
+# Author: Colin Francis
+# Description: Long-lived service that solves Sudoku puzzles sent as JSON lines over a local TCP or Unix socket
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from batch_solve import _solve_task, DEFAULT_TIME_LIMIT
+from benchmark import percentile, PERCENTILES
+from engines import ENGINES, DEFAULT_ENGINE
+from solve_result import SOLVED, BUDGET_EXHAUSTED
+
+# the most recent request latencies kept for the latency percentiles
+LATENCY_WINDOW = 10000
+
+# the requests that may be waiting on or running in the worker processes at once, per
+#   worker process, unless a limit is given
+IN_FLIGHT_PER_WORKER = 4
+
+
+class SolveService(object):
+    """
+    Solves puzzles sent over local connections on a pool of worker processes, which are
+    started once and kept, so a request costs a solve and not a new Python process.
+
+    Each connection sends one JSON object per line, e.g. {"id": 7, "puzzle": "..."} with an
+    optional "engine", "time_limit" (seconds) and "max_nodes", and gets one JSON line back
+    per puzzle as soon as it is solved, e.g. {"id": 7, "solution": "...", "solved": true,
+    "status": "solved", "error": null, "latency_ms": 1.9}, so the answers may come back in a
+    different order. Every solve runs within the time and node limits of the service; a
+    request may ask for tighter limits but not looser ones, and a puzzle that runs out of
+    budget is answered with the status "budget exhausted" and the puzzle unchanged.
+    {"command": "stats"} is answered with the statistics of the service (see get_stats).
+
+    No more than `max_in_flight` puzzles are in flight across all connections, and no
+    connection has more than `max_in_flight` puzzles whose answers are not yet written
+    out to the client. Once either limit is reached, the service stops reading from the
+    connection, so clients that send faster than the workers solve, or that do not read
+    their answers, are held back by the socket buffers rather than queued without limit.
+    A client that does not read only holds back its own connection, since the worker
+    slot of a puzzle is freed as soon as it is solved.
+    """
+    def __init__(self, engine: str = DEFAULT_ENGINE, workers: int = None, max_in_flight: int = None,
+                 cache_size: int = 0, time_limit: float = None, max_nodes: int = None):
+        """
+        Creates a SolveService object. The worker processes are started by `start`.
+
+        :param engine: The name of the solver engine used when a request names none.
+        :param workers: The number of worker processes. Defaults to the number of CPUs.
+        :param max_in_flight: The most puzzles in flight at once. Defaults to
+            IN_FLIGHT_PER_WORKER per worker process.
+        :param cache_size: If not 0, each worker process keeps a canonical form solution
+            cache of this size.
+        :param time_limit: The most seconds each puzzle may take, or None for no limit.
+        :param max_nodes: The most search nodes each puzzle may take, or None for no limit.
+        """
+        if engine not in ENGINES:
+            raise ValueError("Unknown engine: {!r} (choose from {})".format(engine, ', '.join(sorted(ENGINES))))
+        self._engine = engine
+        self._workers = workers or os.cpu_count()
+        self._max_in_flight = max_in_flight or self._workers * IN_FLIGHT_PER_WORKER
+        if self._max_in_flight < 1:
+            raise ValueError("The in-flight limit must be at least 1, got {}".format(self._max_in_flight))
+        self._cache_size = cache_size
+        self._time_limit = time_limit
+        self._max_nodes = max_nodes
+        self._pool = None
+        self._server = None
+        self._slots = None
+
+        self._in_flight = 0  # puzzles sent to the workers and not yet answered
+        self._unsent = 0  # answers waiting for their clients to read the ones before them
+        self._waiting = 0  # connections held back until a puzzle is answered
+        self._peak_in_flight = 0
+        self._connections = 0
+        self._requests, self._solved, self._exhausted, self._invalid = 0, 0, 0, 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._start_time = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, path: str = None) -> None:
+        """
+        Starts the worker processes and listens for connections.
+
+        :param host: The address to listen on for TCP connections.
+        :param port: The TCP port, 0 for any free port (see get_address).
+        :param path: The path of a Unix socket to listen on instead of TCP, or None.
+        :return: None.
+        """
+        loop = asyncio.get_running_loop()
+        # the workers leave Ctrl+C to this process, which shuts them down in `close`
+        self._pool = ProcessPoolExecutor(self._workers, initializer=_ignore_interrupts)
+        # start every worker now, so that the first requests do not wait for processes to
+        #   start and import the solvers
+        await asyncio.gather(*(loop.run_in_executor(self._pool, os.getpid) for _ in range(self._workers)))
+        self._slots = asyncio.Semaphore(self._max_in_flight)
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._start_time = time.perf_counter()
+
+    async def close(self) -> None:
+        """
+        Stops listening, then shuts the worker processes down once their puzzles are solved.
+
+        :return: None.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+            self._pool = None
+
+    def get_address(self):
+        """
+        Returns the address the service listens on.
+
+        :return: A (host, port) tuple for TCP, or the path of the Unix socket.
+        """
+        return self._server.sockets[0].getsockname()
+
+    def get_stats(self) -> dict:
+        """
+        Returns the statistics of the service.
+
+        :return: A dictionary with the number of requests, solved puzzles, puzzles that ran
+            out of budget and invalid requests, the queue depth (puzzles in flight,
+            answers not yet taken by their clients and connections waiting for a free
+            slot), the in-flight limit and the highest number of puzzles in flight so far,
+            the open connections, the uptime in seconds and the latency percentiles, from
+            reading a request to writing its answer, of the last LATENCY_WINDOW requests in
+            milliseconds.
+        """
+        return {
+            'requests': self._requests,
+            'solved': self._solved,
+            'budget_exhausted': self._exhausted,
+            'invalid': self._invalid,
+            'in_flight': self._in_flight,
+            'unsent': self._unsent,
+            'waiting': self._waiting,
+            'max_in_flight': self._max_in_flight,
+            'peak_in_flight': self._peak_in_flight,
+            'connections': self._connections,
+            'workers': self._workers,
+            'seconds': time.perf_counter() - self._start_time if self._start_time is not None else 0.0,
+            'latency_ms': {label: percentile(self._latencies, fraction) * 1000 if self._latencies else 0.0
+                           for label, fraction in PERCENTILES},
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Reads the requests of a connection, one per line, until the client closes it.
+
+        :param reader: The stream the requests are read from.
+        :param writer: The stream the answers are written to.
+        :return: None.
+        """
+        self._connections += 1
+        pending = set()
+        # the answers of this connection that may be solved or solving but not yet written out
+        unanswered = asyncio.Semaphore(self._max_in_flight)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than the stream limit, so the rest of the line is lost
+                    self._write(writer, {'id': None, 'error': "Request line too long"})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                received = time.perf_counter()
+                request, error = self._parse_request(line)
+                if error is not None:
+                    self._requests += 1
+                    self._invalid += 1
+                    self._write(writer, {'id': request.get('id'), 'error': error})
+                    await writer.drain()
+                    continue
+                if request.get('command') == 'stats':
+                    self._write(writer, {'id': request.get('id'), 'stats': self.get_stats()})
+                    await writer.drain()
+                    continue
+
+                # wait for a free slot before reading on, which holds the client back
+                self._waiting += 1
+                try:
+                    await unanswered.acquire()
+                    await self._slots.acquire()
+                finally:
+                    self._waiting -= 1
+                task = asyncio.ensure_future(self._solve_request(request, received, writer, unanswered))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except ConnectionError:
+            pass
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            self._connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def _parse_request(self, line: bytes) -> tuple:
+        """
+        Parses and checks a request line.
+
+        :param line: The JSON line.
+        :return: A tuple containing the request dictionary and None, or the request (an
+            empty dictionary if it is not an object) and the error message.
+        """
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return {}, "Not a JSON line: {}".format(error)
+        if not isinstance(request, dict):
+            return {}, "A request must be a JSON object"
+        if request.get('command') is not None:
+            if request['command'] != 'stats':
+                return request, "Unknown command: {!r}".format(request['command'])
+            return request, None
+        if not isinstance(request.get('puzzle'), str):
+            return request, "A request needs a puzzle string"
+        engine = request.get('engine', self._engine)
+        if engine not in ENGINES:
+            return request, "Unknown engine: {!r} (choose from {})".format(engine, ', '.join(sorted(ENGINES)))
+        for limit in ('time_limit', 'max_nodes'):
+            value = request.get(limit)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                return request, "{} must be a positive number, got {!r}".format(limit, value)
+        return request, None
+
+    def _limits(self, request: dict) -> tuple:
+        """
+        Returns the limits of a request's solve: those of the request, but no looser than
+        those of the service.
+
+        :param request: The checked request.
+        :return: A tuple containing the time limit and the node limit (either may be None).
+        """
+        limits = []
+        for own, asked in ((self._time_limit, request.get('time_limit')), (self._max_nodes, request.get('max_nodes'))):
+            limits.append(asked if own is None else own if asked is None else min(own, asked))
+        return tuple(limits)
+
+    async def _solve_request(self, request: dict, received: float, writer: asyncio.StreamWriter,
+                             unanswered: asyncio.Semaphore) -> None:
+        """
+        Solves the puzzle of a request on a worker process and writes the answer. The
+        worker slot taken for the request is freed once the worker is done with it, and
+        the connection's slot once the answer has been written out to the client.
+
+        :param request: The checked request.
+        :param received: The time the request was read, from time.perf_counter.
+        :param writer: The stream the answer is written to.
+        :param unanswered: The semaphore of the connection's unanswered requests.
+        :return: None.
+        """
+        try:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                task = (0, request['puzzle'], request.get('engine', self._engine), self._cache_size) + \
+                    self._limits(request)
+                _, solution, status, error = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, _solve_task, task)
+            finally:
+                self._in_flight -= 1
+                self._slots.release()
+
+            self._requests += 1
+            if error is not None:
+                self._invalid += 1
+            solved = status == SOLVED
+            self._solved += solved
+            self._exhausted += status == BUDGET_EXHAUSTED
+            latency = time.perf_counter() - received
+            self._latencies.append(latency)
+            self._write(writer, {'id': request.get('id'), 'solution': solution, 'solved': solved, 'status': status,
+                                 'error': error, 'latency_ms': latency * 1000})
+            # the answer stays counted until the client has taken enough of the connection's
+            #   output for the write buffer to drain
+            self._unsent += 1
+            try:
+                await writer.drain()
+            finally:
+                self._unsent -= 1
+        finally:
+            unanswered.release()
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, message: dict) -> None:
+        """
+        Writes a message to a connection as a JSON line.
+
+        :param writer: The stream to write to.
+        :param message: The message.
+        :return: None.
+        """
+        if not writer.is_closing():
+            writer.write(json.dumps(message).encode() + b'\n')
+
+
+def _ignore_interrupts() -> None:
+    """
+    Makes a worker process ignore Ctrl+C (SIGINT), which the terminal also sends to the
+    workers; the service stops them itself once it has been interrupted.
+
+    :return: None.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+async def send_puzzles(lines, host: str = '127.0.0.1', port: int = 0, path: str = None, engine: str = None):
+    """
+    Sends puzzles to a running service and yields the answers as they arrive. The puzzles
+    are sent while the answers are read, so a service that holds the client back never
+    waits on answers the client is not reading. Blank lines and lines starting with '#'
+    are skipped.
+
+    :param lines: An iterable of puzzle lines, e.g. an open file.
+    :param host: The address of a TCP service.
+    :param port: The port of a TCP service.
+    :param path: The path of the Unix socket of the service instead of TCP, or None.
+    :param engine: The name of the solver engine to ask for, or None for the service's.
+    :return: An asynchronous generator of answer dictionaries, with the line number of
+        each puzzle as its id.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    async def send():
+        for line_number, line in enumerate(lines, 1):
+            if line.strip() and not line.startswith('#'):
+                request = {'id': line_number, 'puzzle': line.strip()}
+                if engine is not None:
+                    request['engine'] = engine
+                writer.write(json.dumps(request).encode() + b'\n')
+                await writer.drain()
+        writer.write_eof()
+
+    sender = asyncio.ensure_future(send())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            yield json.loads(line)
+        await sender
+    finally:
+        sender.cancel()
+        writer.close()
+
+
+async def request_stats(host: str = '127.0.0.1', port: int = 0, path: str = None) -> dict:
+    """
+    Asks a running service for its statistics.
+
+    :param host: The address of a TCP service.
+    :param port: The port of a TCP service.
+    :param path: The path of the Unix socket of the service instead of TCP, or None.
+    :return: The statistics dictionary (see SolveService.get_stats).
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(json.dumps({'command': 'stats'}).encode() + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())['stats']
+    finally:
+        writer.close()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """
+    Runs the service until it is interrupted, then prints its statistics to stderr.
+
+    :param args: The parsed command line arguments.
+    :return: None.
+    """
+    service = SolveService(args.engine, args.workers or None, args.max_in_flight, args.cache, args.time_limit or None,
+                           args.max_nodes)
+    await service.start(args.host, args.port, args.unix)
+    address = service.get_address()
+    print("listening on {}".format(address if args.unix else "{}:{}".format(*address[:2])), file=sys.stderr,
+          flush=True)
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, stopped.set)
+        except (NotImplementedError, AttributeError):  # no signal handlers on Windows event loops
+            pass
+    try:
+        await stopped.wait()
+    finally:
+        await service.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+        print(json.dumps(service.get_stats()), file=sys.stderr)
+
+
+async def send(args: argparse.Namespace) -> int:
+    """
+    Sends the puzzles of a file to a running service, writes the solutions as they arrive
+    and prints the statistics of the service to stderr.
+
+    :param args: The parsed command line arguments.
+    :return: The exit status: 1 if any puzzle was invalid. Otherwise, 0.
+    """
+    source = sys.stdin if args.send == '-' else open(args.send)
+    invalid = 0
+    try:
+        async for answer in send_puzzles(source, args.host, args.port, args.unix, args.request_engine):
+            if answer.get('error') is not None:
+                invalid += 1
+                print("line {}: {}".format(answer.get('id'), answer['error']), file=sys.stderr)
+                continue
+            if answer['status'] == BUDGET_EXHAUSTED:
+                print("line {}: not solved within the service's limits".format(answer['id']), file=sys.stderr)
+            sys.stdout.write(answer['solution'] + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(json.dumps(await request_stats(args.host, args.port, args.unix)), file=sys.stderr)
+    return 0 if invalid == 0 else 1
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses the command line arguments.
+
+    :param argv: The arguments to parse. Defaults to sys.argv.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Serve Sudoku solving over a local TCP or Unix socket as JSON "
+                                                 "lines, or send puzzles to a running service with --send.")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="address to listen on or connect to (default: 127.0.0.1)")
+    parser.add_argument('-p', '--port', type=int, default=8765,
+                        help="TCP port, 0 for any free port when serving (default: 8765)")
+    parser.add_argument('--unix', metavar='PATH', help="use a Unix socket at this path instead of TCP")
+    parser.add_argument('-e', '--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                        help="solver engine used when a request names none (default: {})".format(DEFAULT_ENGINE))
+    parser.add_argument('-w', '--workers', type=int, default=0,
+                        help="number of worker processes, 0 for one per CPU (default: 0)")
+    parser.add_argument('-q', '--max-in-flight', type=int, default=None,
+                        help="puzzles in flight at once before clients are held back (default: {} per "
+                             "worker)".format(IN_FLIGHT_PER_WORKER))
+    parser.add_argument('--cache', type=int, default=0, metavar='SIZE',
+                        help="answer repeated puzzles (up to Sudoku symmetry) from a solution cache of this size")
+    parser.add_argument('-t', '--time-limit', type=float, default=DEFAULT_TIME_LIMIT, metavar='SECONDS',
+                        help="give up on a puzzle after this many seconds, 0 for no limit (default: {:g})".format(
+                            DEFAULT_TIME_LIMIT))
+    parser.add_argument('--max-nodes', type=int, default=None,
+                        help="give up on a puzzle after this many search nodes (default: no limit)")
+    parser.add_argument('-s', '--send', metavar='FILE',
+                        help="send the puzzles of FILE ('-' for stdin) to a running service and write the "
+                             "solutions as they arrive, instead of serving")
+    parser.add_argument('--request-engine', choices=sorted(ENGINES), default=None,
+                        help="with --send, the engine to ask the service for (default: the service's)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Runs the service, or sends puzzles to one, from the command line.
+
+    :param argv: The command line arguments. Defaults to sys.argv.
+    :return: The exit status.
+    """
+    args = parse_args(argv)
+    if args.send is not None:
+        return asyncio.run(send(args))
+    asyncio.run(serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
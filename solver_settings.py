@@ -1,8 +1,6 @@
 # Author: Colin Francis
 # Description: Contains settings for sudoku solver
 
-import pygame
-
 # Screen Constants:
 WINDOW_WIDTH, WINDOW_HEIGHT = 500, 550
 
@@ -12,6 +10,8 @@ BOARD_WIDTH, BOARD_HEIGHT = 450, 450
 SQUARE_HEIGHT, SQUARE_WIDTH = 50, 50
 SOLVE_BUTTON_LEFT, SOLVE_BUTTON_TOP = BOARD_LEFT, 40
 CLEAR_BUTTON_LEFT, CLEAR_BUTTON_TOP = BOARD_LEFT, 0
+SPEED_BUTTON_LEFT, SPEED_BUTTON_TOP = BOARD_LEFT + 150, 0
+CANCEL_BUTTON_LEFT, CANCEL_BUTTON_TOP = BOARD_LEFT + 150, 40
 BUTTON_WIDTH, BUTTON_HEIGHT = 125, 30
 
 # Colors:
@@ -21,18 +21,47 @@ SQUARE_BLUE = (72, 199, 253)
 LIGHT_GREY = (224, 224, 224)
 DARK_GREY = (160, 160, 160)
 
+# Frames drawn per second:
+FPS = 60
+
+# Solve Speeds, as (button text, engine name, steps between board updates sent by the
+#   solver, steps shown per second); None sends only the solution, or shows updates as
+#   they arrive. The animated speeds need an engine with steps (see engines.py)
+SOLVE_SPEEDS = (('Animate', 'bitmask', 1, 240), ('Every 100th', 'bitmask', 100, None),
+                ('Instant', 'dancing-links', None, None))
+SOLVE_QUEUE_SIZE = 256
+
+# Square Highlights:
+PLAIN, TINTED, SELECTED = 0, 1, 2
+
+# Fonts:
+FONT_NAME = 'Arial'
+NUMBER_FONT_SIZE, BUTTON_FONT_SIZE = 30, 20
+
+# Keys: the number entered by each key, by pygame key name (pygame.key.name); the number
+#   row ('1' - '9') and the keypad ('[1]' - '[9]') both work
+KEY_NUMBERS = {name: number for number in range(1, 10) for name in (str(number), '[{}]'.format(number))}
+KEY_NUMBERS['backspace'] = '.'  # clear the selected square
+
 
 # Utilities:
 # Mouse Position Function
-def mouse_pos() -> tuple:
+def mouse_pos(position: tuple = None) -> tuple:
     """
+    Finds the board square under the mouse. A point on the line between two squares
+    belongs to the square above it or to the left of it.
 
-    :return:
+    :param position: The (x, y) position to look up. Defaults to the current position of
+        the mouse.
+    :return: A tuple containing the x-coordinate and y-coordinate of the top left corner of
+        the square, or (None, None) if the position is not over the board.
     """
-    for row in range(9):
-        for col in range(9):
-            if (BOARD_LEFT + (SQUARE_WIDTH * row) < pygame.mouse.get_pos()[0] <=
-                BOARD_LEFT + (SQUARE_WIDTH * (row + 1))) and (BOARD_TOP + (SQUARE_HEIGHT * col)) < \
-                    pygame.mouse.get_pos()[1] <= BOARD_TOP + (SQUARE_HEIGHT * (col + 1)):
-                return BOARD_LEFT + (SQUARE_WIDTH * row), BOARD_TOP + (SQUARE_HEIGHT * col)
+    if position is None:
+        import pygame  # only the GUIs ask for the mouse, so the settings do not load pygame
+        position = pygame.mouse.get_pos()
+    x_coord, y_coord = position
+    col = (x_coord - BOARD_LEFT - 1) // SQUARE_WIDTH
+    row = (y_coord - BOARD_TOP - 1) // SQUARE_HEIGHT
+    if 0 <= row < 9 and 0 <= col < 9:
+        return BOARD_LEFT + (SQUARE_WIDTH * col), BOARD_TOP + (SQUARE_HEIGHT * row)
     return None, None
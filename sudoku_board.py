@@ -3,6 +3,9 @@
 
 import pygame
 import time
+from back_propagation_algorithm import Puzzle, DOT
+from engines import get_engine
+from render_cache import render_text, preload
 from settings import *
 
 
@@ -13,48 +16,22 @@ class SudokuSolver(object):
         self._board = Board()
         self._running = True
         pygame.font.init()
+        self._event_handlers = {pygame.QUIT: self._quit,
+                                pygame.MOUSEBUTTONDOWN: self._mouse_down,
+                                pygame.KEYDOWN: self._key_down}
 
     def run(self) -> None:
         """
-        Load a blank puzzle board, input the puzzle, and run the solver.
+        Load a blank puzzle board, input the puzzle, and run the solver. The loop sleeps
+        until the next event arrives and only redraws the board after input.
 
         :return: None.
         """
         while self._running:
-            for event in pygame.event.get():
-                # check if the user is trying to exit
-                if event.type == pygame.QUIT:
-                    self._running = False
-
-                # check for a grid square being selected
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if (BOARD_LEFT <= pygame.mouse.get_pos()[0] <= BOARD_LEFT + BOARD_WIDTH) and \
-                            (BOARD_TOP <= pygame.mouse.get_pos()[1] <= BOARD_TOP + BOARD_HEIGHT):
-                        self._board.set_selected_coords(mouse_pos()[0], mouse_pos()[1])
-                    elif (BUTTON_LEFT <= pygame.mouse.get_pos()[0] <= BUTTON_LEFT + BUTTON_WIDTH) and \
-                            (BUTTON_TOP <= pygame.mouse.get_pos()[1] <= BUTTON_TOP + BUTTON_HEIGHT):
-                        self._board.click()
-
-                # check for a number being entered
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_1 or event.key == pygame.K_KP1:
-                        self._board.set_number_by_selected(1)
-                    elif event.key == pygame.K_2 or event.key == pygame.K_KP2:
-                        self._board.set_number_by_selected(2)
-                    elif event.key == pygame.K_3 or event.key == pygame.K_KP3:
-                        self._board.set_number_by_selected(3)
-                    elif event.key == pygame.K_4 or event.key == pygame.K_KP4:
-                        self._board.set_number_by_selected(4)
-                    elif event.key == pygame.K_5 or event.key == pygame.K_KP5:
-                        self._board.set_number_by_selected(5)
-                    elif event.key == pygame.K_6 or event.key == pygame.K_KP6:
-                        self._board.set_number_by_selected(6)
-                    elif event.key == pygame.K_7 or event.key == pygame.K_KP7:
-                        self._board.set_number_by_selected(7)
-                    elif event.key == pygame.K_8 or event.key == pygame.K_KP8:
-                        self._board.set_number_by_selected(8)
-                    elif event.key == pygame.K_9 or event.key == pygame.K_KP9:
-                        self._board.set_number_by_selected(9)
+            for event in [pygame.event.wait()] + pygame.event.get():
+                handler = self._event_handlers.get(event.type)
+                if handler is not None:
+                    handler(event)
 
                 if self._board.solve():
                     self._solve()
@@ -62,79 +39,62 @@ class SudokuSolver(object):
             self._board.update_board(pygame.mouse.get_pos())  # update the game board
             pygame.display.update()  # update the display
 
+    def _quit(self, event: pygame.event.Event) -> None:
+        """
+        Stops the loop when the user closes the window.
+
+        :param event: The QUIT event.
+        :return: None.
+        """
+        self._running = False
+
+    def _mouse_down(self, event: pygame.event.Event) -> None:
+        """
+        Selects the grid square or clicks the button under the mouse.
+
+        :param event: The MOUSEBUTTONDOWN event.
+        :return: None.
+        """
+        x_coord, y_coord = event.pos
+        if (BOARD_LEFT <= x_coord <= BOARD_LEFT + BOARD_WIDTH) and (BOARD_TOP <= y_coord <= BOARD_TOP + BOARD_HEIGHT):
+            self._board.set_selected_coords(*mouse_pos(event.pos))
+        elif (BUTTON_LEFT <= x_coord <= BUTTON_LEFT + BUTTON_WIDTH) and \
+                (BUTTON_TOP <= y_coord <= BUTTON_TOP + BUTTON_HEIGHT):
+            self._board.click()
+
+    def _key_down(self, event: pygame.event.Event) -> None:
+        """
+        Enters the number of the key that was pressed into the selected square.
+
+        :param event: The KEYDOWN event.
+        :return: None.
+        """
+        number = KEY_NUMBERS.get(pygame.key.name(event.key))
+        if number is not None:
+            self._board.set_number_by_selected(number)
+
     def _solve(self):
         """
-        Used to solve Sudoku puzzles.
+        Used to solve Sudoku puzzles. The solver works on a copy of the board's puzzle, so
+        the squares are copied back onto the board after each step it yields.
 
         :return:
         """
         self._board.lock_presets()
+        values = self._board.get_puzzle().get_values()
+        solve = get_engine(SOLVE_ENGINE)(values)
 
-        row_index, col_index = 0, 0
         start_time = time.perf_counter()
-        while not self._board.solved():
-            if col_index > 8:
-                col_index = 0
-                row_index += 1
-
-            self._board.set_selected_coords(BOARD_LEFT + (SQUARE_HEIGHT * col_index),
-                                            BOARD_TOP + (SQUARE_WIDTH * row_index)
-                                            )
-            if self._board.get_number(row_index, col_index) == '.' and not \
-                    self._board.is_preset(row_index, col_index):
-                for number in range(1, 10):
-                    if not self._board.in_row(row_index, str(number)) and not \
-                            self._board.in_col(col_index, str(number)) and not \
-                            self._board.in_square(row_index, col_index, str(number)):
-                        self._board.set_number_by_index(row_index, col_index, str(number))
-                        col_index += 1
-                        break
-                else:
-                    row_index, col_index = self._back_prop(row_index, col_index - 1)
-            elif not self._board.is_preset(row_index, col_index):
-                start_number = int(self._board.get_number(row_index, col_index)) + 1
-                for number in range(start_number, 10):
-                    if not self._board.in_row(row_index, str(number)) and not \
-                            self._board.in_col(col_index, str(number)) and not \
-                            self._board.in_square(row_index, col_index, str(number)):
-                        self._board.set_number_by_index(row_index, col_index, str(number))
-                        col_index += 1
-                        break
-                else:
-                    self._board.set_number_by_index(row_index, col_index, '.')
-                    row_index, col_index = self._back_prop(row_index, col_index - 1)
-            else:
-                col_index += 1
+        for _, row_index, col_index, _ in solve.steps():
+            values[:] = solve.get_puzzle().get_values()
+            self._board.set_selected_coords(BOARD_LEFT + (SQUARE_WIDTH * col_index),
+                                            BOARD_TOP + (SQUARE_HEIGHT * row_index))
             self._board.update_board(pygame.mouse.get_pos())  # update the game board
             pygame.display.update()  # update the display
         end_time = time.perf_counter()
         print("Solution Speed: {:.2f}s".format(end_time - start_time))
         # self.print_board()
 
-    def _back_prop(self, row_index: int, col_index: int) -> tuple:
-        """
-        Recursively moves backwards through the Sudoku puzzle until a non-preset
-        value less than 9 is found.
-
-        :param row_index: The current row index in the puzzle.
-        :param col_index: The current column index in the puzzle
-        :return: A tuple containing the row index and column index where the
-            non-preset value was found.
-        """
-        if col_index < 0:
-            col_index = 8
-            row_index -= 1
-
-        # base case
-        if self._board.get_number(row_index, col_index) != '9' and not self._board.is_preset(row_index, col_index):
-            return row_index, col_index
-
-        if self._board.get_number(row_index, col_index) == '9' and not self._board.is_preset(row_index, col_index):
-            self._board.set_number_by_index(row_index, col_index, '.')
-            return self._back_prop(row_index, col_index - 1)
-        elif self._board.is_preset(row_index, col_index):
-            return self._back_prop(row_index, col_index - 1)
-
 
 class Board(object):
     """Represents a Sudoku Board."""
@@ -146,17 +106,8 @@ class Board(object):
         self._surface.fill(WHITE)
         self._button = Button(self._screen)
         self._selected_square = [None] * 2
-        self._puzzle = [[".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        ]
-        self._puzzle_presets = None
+        self._puzzle = Puzzle('.' * 81)
+        preload('123456789', NUMBER_FONT_SIZE, BLACK, FONT_NAME)
         pygame.display.set_caption('Sudoku Solver')
 
     def update_board(self, mouse_position):
@@ -180,6 +131,14 @@ class Board(object):
     def click(self):
         self._button.click()
 
+    def get_puzzle(self) -> Puzzle:
+        """
+        Returns the puzzle shown on the board.
+
+        :return: The Puzzle object.
+        """
+        return self._puzzle
+
     def get_number(self, row_index: int, col_index: int) -> str:
         """
         Returns the number in the Sudoku puzzle found in the position specified by
@@ -190,10 +149,10 @@ class Board(object):
         :return: The number corresponding to the specified row index and column
             index.
         """
-        return self._puzzle[row_index][col_index]
+        return self._puzzle.get_number(row_index, col_index)
 
     def lock_presets(self):
-        self._puzzle_presets = self._find_presets()
+        self._puzzle.lock_presets()
 
     def set_selected_coords(self, x_coord: int, y_coord: int) -> None:
         """
@@ -219,7 +178,7 @@ class Board(object):
         row = (self._selected_square[1] - BOARD_TOP) // SQUARE_HEIGHT
         col = (self._selected_square[0] - BOARD_LEFT) // SQUARE_WIDTH
 
-        self._puzzle[row][col] = str(number)
+        self._puzzle.set(row, col, str(number))
 
     def set_number_by_index(self, row_index: int, col_index: int, number: str) -> None:
         """
@@ -231,110 +190,15 @@ class Board(object):
         :param number: The number to place in the puzzle.
         :return: None.
         """
-        self._puzzle[row_index][col_index] = number
+        self._puzzle.set(row_index, col_index, number)
 
     def solved(self) -> bool:
         """
-        Searches each row in the Sudoku puzzle to determine if a solution has been
-        found.
+        Determines if a solution has been found by checking for empty squares.
 
         :return: True if a solution has been found. Otherwise, False.
         """
-        if '.' in self._puzzle[0] or '.' in self._puzzle[1] or '.' in self._puzzle[2] or \
-                '.' in self._puzzle[3] or '.' in self._puzzle[4] or '.' in self._puzzle[5] or \
-                '.' in self._puzzle[5] or '.' in self._puzzle[7] or '.' in self._puzzle[8]:
-            return False
-        return True
-
-    def in_row(self, row_index: int, number: str) -> bool:
-        """
-        Searches the Sudoku puzzle to see if `number` exists in the specified row index.
-
-        :param row_index: The row index in the Sudoku puzzle to search in.
-        :param number: The number to search for.
-        :return: True if the number is found in the row. Otherwise, False.
-        """
-        if number in self._puzzle[row_index]:
-            return True
-        return False
-
-    def in_col(self, col_index: int, number: str) -> bool:
-        """
-        Searches the Sudoku puzzle to see if 'number' exists in the specified column
-        index.
-
-        :param col_index: The column index in the Sudoku puzzle to search in.
-        :param number: The number to search for.
-        :return: True if the number is found in the column. Otherwise, False.
-        """
-        for row in self._puzzle:
-            if row[col_index] == number:
-                return True
-        return False
-
-    def in_square(self, row_index: int, col_index: int, number: str) -> bool:
-        """
-        Searches the Sudoku puzzle to see if the `number` exists in the square
-        region of the Sudoku board as indicated by the specified row index and
-        column index.
-
-        :param row_index: The row index of the Sudoku puzzle to search in.
-        :param col_index: The column index of the Sudoku puzzle to search
-            in.
-        :param number: The number to search for.
-        :return: True if the number is found in the square region. Otherwise,
-            False.
-        """
-        squares = {1: self._puzzle[0][:3] + self._puzzle[1][:3] + self._puzzle[2][:3],
-                   2: self._puzzle[0][3:6] + self._puzzle[1][3:6] + self._puzzle[2][3:6],
-                   3: self._puzzle[0][6:] + self._puzzle[1][6:] + self._puzzle[2][6:],
-                   4: self._puzzle[3][:3] + self._puzzle[4][:3] + self._puzzle[5][:3],
-                   5: self._puzzle[3][3:6] + self._puzzle[4][3:6] + self._puzzle[5][3:6],
-                   6: self._puzzle[3][6:] + self._puzzle[4][6:] + self._puzzle[5][6:],
-                   7: self._puzzle[6][:3] + self._puzzle[7][:3] + self._puzzle[8][:3],
-                   8: self._puzzle[6][3:6] + self._puzzle[7][3:6] + self._puzzle[8][3:6],
-                   9: self._puzzle[6][6:] + self._puzzle[7][6:] + self._puzzle[8][6:]
-                   }
-
-        if row_index == 0 or row_index == 1 or row_index == 2:
-            if 0 <= col_index < 3:
-                if number in squares[1]:
-                    return True
-                return False
-            elif 3 <= col_index < 6:
-                if number in squares[2]:
-                    return True
-                return False
-            else:
-                if number in squares[3]:
-                    return True
-                return False
-        elif row_index == 3 or row_index == 4 or row_index == 5:
-            if 0 <= col_index < 3:
-                if number in squares[4]:
-                    return True
-                return False
-            elif 3 <= col_index < 6:
-                if number in squares[5]:
-                    return True
-                return False
-            else:
-                if number in squares[6]:
-                    return True
-                return False
-        else:
-            if 0 <= col_index < 3:
-                if number in squares[7]:
-                    return True
-                return False
-            elif 3 <= col_index < 6:
-                if number in squares[8]:
-                    return True
-                return False
-            else:
-                if number in squares[9]:
-                    return True
-                return False
+        return self._puzzle.get_empty_count() == 0
 
     def is_preset(self, row_index: int, col_index: int) -> bool:
         """
@@ -344,10 +208,7 @@ class Board(object):
         :param col_index: The column corresponding to the value in the puzzle to check.
         :return: True if the value is preset. Otherwise, False.
         """
-        if self._puzzle_presets[row_index][col_index]:
-            return True
-        else:
-            return False
+        return self._puzzle.is_preset(row_index, col_index)
 
     def _place_numbers(self) -> None:
         """
@@ -356,16 +217,15 @@ class Board(object):
         :return: None.
         """
         # TODO: Find a better way to center the number
-        for row_index, row in enumerate(self._puzzle):
-            for col_index, number in enumerate(row):
-                if number != ".":
-                    font = pygame.font.SysFont('Arial', 30)
-                    number_surface = font.render(number, True, BLACK)
-                    self._screen.blit(number_surface,
-                                      (BOARD_LEFT + (SQUARE_WIDTH * col_index) + (SQUARE_WIDTH / 2) - 5,
-                                       BOARD_TOP + (SQUARE_HEIGHT * row_index) + (SQUARE_HEIGHT / 4) - 5
-                                       )
-                                      )
+        for index, value in enumerate(self._puzzle.get_values()):
+            if value != DOT:
+                row_index, col_index = divmod(index, 9)
+                number_surface = render_text(chr(value), NUMBER_FONT_SIZE, BLACK, FONT_NAME)
+                self._screen.blit(number_surface,
+                                  (BOARD_LEFT + (SQUARE_WIDTH * col_index) + (SQUARE_WIDTH / 2) - 5,
+                                   BOARD_TOP + (SQUARE_HEIGHT * row_index) + (SQUARE_HEIGHT / 4) - 5
+                                   )
+                                  )
 
     def _draw_grid(self) -> None:
         """
@@ -451,26 +311,6 @@ class Board(object):
         col_surface.fill(SQUARE_BLUE)
         self._screen.blit(col_surface, (self._selected_square[0], BOARD_TOP))
 
-    def _find_presets(self) -> list:
-        """
-        Iterates through the initial Sudoku puzzle and determines which values are preset and
-        which values are variable.
-
-        :return: A matrix (list-of-lists) containing boolean values - True for preset, False
-            for variable.
-        """
-        preset_values = []
-        for row_index, row in enumerate(self._puzzle):
-            preset_row = []
-            for col_index, col_value in enumerate(row):
-                if col_value == '.':
-                    preset_row.append(False)
-                else:
-                    preset_row.append(True)
-            preset_values.append(list(preset_row))
-            preset_row.clear()
-        return preset_values
-
 
 class Button(object):
     """"""
@@ -521,8 +361,7 @@ class Button(object):
 
         :return: None.
         """
-        font = pygame.font.SysFont('Arial', 20)
-        text_surface = font.render('Solve Puzzle', True, BLACK)
+        text_surface = render_text('Solve Puzzle', BUTTON_FONT_SIZE, BLACK, FONT_NAME)
         self._board.blit(text_surface, (BUTTON_LEFT + 15, BUTTON_TOP + 2))
 
 
@@ -2,188 +2,333 @@
 # Description: An implementation of a Sudoku solver using pygame.
 
 import pygame
+import queue
+import threading
 import time
-import math
+from back_propagation_algorithm import Puzzle, DOT, PLACE
+from engines import get_engine, has_steps
+from render_cache import render_text, preload
+from solve_result import SolveResult, Budget, CancelToken, SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED, CANCELLED
 from solver_settings import *
 
+# kinds of the messages sent by a SolveWorker to the main loop
+STEP, DONE = 'step', 'done'
+
 
 class SudokuSolver(object):
     """A class used to solve Sudoku puzzles."""
-    pygame.font.init()
-
     def __init__(self):
         """Creates a SudokuSolver object."""
+        pygame.font.init()
         self._board = Board()
         self._running = True
+        self._clock = pygame.time.Clock()
+        self._speed_index = 0
+        self._worker = None
+        self._unsolved_values = b''
+        self._steps_due = 0.0
+        # the handler of each event type
+        self._event_handlers = {pygame.QUIT: self._quit,
+                                pygame.VIDEOEXPOSE: self._expose,
+                                pygame.MOUSEBUTTONDOWN: self._mouse_down,
+                                pygame.KEYDOWN: self._key_down}
+        # the clickable areas as (left, top, width, height, works while solving, handler),
+        #   checked in order; each handler is given the mouse position
+        self._click_handlers = (
+            (SPEED_BUTTON_LEFT, SPEED_BUTTON_TOP, BUTTON_WIDTH, BUTTON_HEIGHT, True, lambda _: self._next_speed()),
+            (CANCEL_BUTTON_LEFT, CANCEL_BUTTON_TOP, BUTTON_WIDTH, BUTTON_HEIGHT, True, lambda _: self._cancel_solve()),
+            (BOARD_LEFT, BOARD_TOP, BOARD_WIDTH, BOARD_HEIGHT, False,
+             lambda position: self._board.set_selected_square_coords(*mouse_pos(position))),
+            (SOLVE_BUTTON_LEFT, SOLVE_BUTTON_TOP, BUTTON_WIDTH, BUTTON_HEIGHT, False,
+             lambda _: self._board.solve_button_click()),
+            (CLEAR_BUTTON_LEFT, CLEAR_BUTTON_TOP, BUTTON_WIDTH, BUTTON_HEIGHT, False,
+             lambda _: self._board.clear_board()),
+        )
 
     def run(self) -> None:
         """
-        Begins running the primary program loop.
+        Begins running the primary program loop. While the user is idle the loop sleeps
+        until the next event arrives, and the board is only redrawn where something
+        changed. While a solve runs on a SolveWorker thread, the loop renders at FPS frames
+        per second and shows the steps as they arrive.
 
         :return: None.
         """
         while self._running:  # main program loop
-            for event in pygame.event.get():
-                # check if the user wants to exit
-                if event.type == pygame.QUIT:
-                    self._running = False
-
-                # check if the user clicked their mouse
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    # if the user clicked their mouse within the grid boundaries then show the
-                    #   selected square
-                    if (BOARD_LEFT <= pygame.mouse.get_pos()[0] <= BOARD_LEFT + BOARD_WIDTH) and \
-                            (BOARD_TOP <= pygame.mouse.get_pos()[1] <= BOARD_TOP + BOARD_HEIGHT):
-                        self._board.set_selected_square_coords(mouse_pos()[0], mouse_pos()[1])
-                    # if user clicked their mouse within the solve button boundaries, then click the
-                    #   solve button
-                    elif (SOLVE_BUTTON_LEFT <= pygame.mouse.get_pos()[0] <= SOLVE_BUTTON_LEFT + BUTTON_WIDTH) and \
-                            (SOLVE_BUTTON_TOP <= pygame.mouse.get_pos()[1] <= SOLVE_BUTTON_TOP + BUTTON_HEIGHT):
-                        self._board.solve_button_click()
-                    # if the user clicked their mouse within the clear button boundaries, then clear the
-                    #   puzzle
-                    elif (CLEAR_BUTTON_LEFT <= pygame.mouse.get_pos()[0] <= CLEAR_BUTTON_LEFT + BUTTON_WIDTH) and \
-                            (CLEAR_BUTTON_TOP <= pygame.mouse.get_pos()[1] <= CLEAR_BUTTON_TOP + BUTTON_HEIGHT):
-                        self._board.clear_board()
-
-                # check for a number being entered
-                if event.type == pygame.KEYDOWN:
-                    # user entered 1
-                    if event.key == pygame.K_1 or event.key == pygame.K_KP1:
-                        self._board.set_number_by_selected(1)
-                    # user entered 2
-                    elif event.key == pygame.K_2 or event.key == pygame.K_KP2:
-                        self._board.set_number_by_selected(2)
-                    # user entered 3
-                    elif event.key == pygame.K_3 or event.key == pygame.K_KP3:
-                        self._board.set_number_by_selected(3)
-                    # user entered 4
-                    elif event.key == pygame.K_4 or event.key == pygame.K_KP4:
-                        self._board.set_number_by_selected(4)
-                    # user entered 5
-                    elif event.key == pygame.K_5 or event.key == pygame.K_KP5:
-                        self._board.set_number_by_selected(5)
-                    # user entered 6
-                    elif event.key == pygame.K_6 or event.key == pygame.K_KP6:
-                        self._board.set_number_by_selected(6)
-                    # user entered 7
-                    elif event.key == pygame.K_7 or event.key == pygame.K_KP7:
-                        self._board.set_number_by_selected(7)
-                    # user entered 8
-                    elif event.key == pygame.K_8 or event.key == pygame.K_KP8:
-                        self._board.set_number_by_selected(8)
-                    # user entered 9
-                    elif event.key == pygame.K_9 or event.key == pygame.K_KP9:
-                        self._board.set_number_by_selected(9)
-                    # clear selected square
-                    elif event.key == pygame.K_BACKSPACE:
-                        self._board.set_number_by_selected('.')
+            if self._worker is None:
+                events = [pygame.event.wait()] + pygame.event.get()  # sleep until there is input
+            else:
+                elapsed = self._clock.tick(FPS) / 1000  # wait for the next frame
+                events = pygame.event.get()
+                self._show_solve(elapsed)
+
+            for event in events:
+                handler = self._event_handlers.get(event.type)
+                if handler is not None:
+                    handler(event)
 
                 # check if the puzzle is ready to be solved
                 if self._board.solve_sudoku():
                     self._board.solve_button_unclick()  # un-click the solve button
                     self._solve()  # begin solving puzzle
 
-            self._board.update(pygame.mouse.get_pos())  # update the board
-            pygame.display.update()  # update the pygame display
+            # redraw the parts of the board that changed and update only those parts of the
+            #   display
+            pygame.display.update(self._board.update(pygame.mouse.get_pos()))
+        self._cancel_solve()
+
+    def _quit(self, event: pygame.event.Event) -> None:
+        """
+        Stops the primary program loop when the user closes the window.
 
-    def _solve(self):
+        :param event: The QUIT event.
+        :return: None.
         """
-        Used to solve Sudoku puzzles.
+        self._running = False
 
-        :return:
+    def _expose(self, event: pygame.event.Event) -> None:
         """
+        Redraws the whole window once it has been uncovered, since nothing on it can be
+        trusted.
+
+        :param event: The VIDEOEXPOSE event.
+        :return: None.
+        """
+        self._board.invalidate()
+
+    def _mouse_down(self, event: pygame.event.Event) -> None:
+        """
+        Runs the handler of the area that was clicked. Only the speed and cancel buttons
+        work while a solve is running, since the puzzle can't be changed then.
+
+        :param event: The MOUSEBUTTONDOWN event.
+        :return: None.
+        """
+        x_coord, y_coord = event.pos
+        for left, top, width, height, while_solving, handler in self._click_handlers:
+            if left <= x_coord <= left + width and top <= y_coord <= top + height:
+                if while_solving or self._worker is None:
+                    handler(event.pos)
+                return
+
+    def _key_down(self, event: pygame.event.Event) -> None:
+        """
+        Enters the number of the key that was pressed into the selected square, or clears
+        the square for backspace (see KEY_NUMBERS).
+
+        :param event: The KEYDOWN event.
+        :return: None.
+        """
+        number = KEY_NUMBERS.get(pygame.key.name(event.key))
+        if number is not None and self._worker is None:
+            self._board.set_number_by_selected(number)
+
+    def _solve(self) -> None:
+        """
+        Starts solving the puzzle on a SolveWorker thread, so that the window keeps
+        responding while the search runs.
+
+        :return: None.
+        """
+        if self._worker is not None:
+            return
         self._board.lock_presets()
+        self._unsolved_values = bytes(self._board.get_puzzle().get_values())
+        _, engine, stride, _ = SOLVE_SPEEDS[self._speed_index]
+        self._steps_due = 0.0
+        self._clock.tick()  # the loop was asleep, so start timing frames from now
+        self._worker = SolveWorker(self._unsolved_values, engine, stride)
+        self._worker.start()
 
-        row_index, col_index = 0, 0
-        start_time = time.perf_counter()
-        while not self._board.solved():
-            if col_index > 8:
-                col_index = 0
-                row_index += 1
-
-            self._board.set_selected_square_coords(
-                BOARD_LEFT + (SQUARE_HEIGHT * col_index),
-                BOARD_TOP + (SQUARE_WIDTH * row_index)
-            )
-            if self._board.get_number(row_index, col_index) == '.' and not \
-                    self._board.is_preset(row_index, col_index):
-                for number in range(1, 10):
-                    if not self._board.in_row(row_index, str(number)) and not \
-                            self._board.in_col(col_index, str(number)) and not \
-                            self._board.in_square(row_index, col_index, str(number)):
-                        self._board.set_number_by_index(row_index, col_index, str(number))
-                        col_index += 1
-                        break
-                else:
-                    row_index, col_index = self._back_prop(row_index, col_index - 1)
-            elif not self._board.is_preset(row_index, col_index):
-                start_number = int(self._board.get_number(row_index, col_index)) + 1
-                for number in range(start_number, 10):
-                    if not self._board.in_row(row_index, str(number)) and not \
-                            self._board.in_col(col_index, str(number)) and not \
-                            self._board.in_square(row_index, col_index, str(number)):
-                        self._board.set_number_by_index(row_index, col_index, str(number))
-                        col_index += 1
-                        break
-                else:
-                    self._board.set_number_by_index(row_index, col_index, '.')
-                    row_index, col_index = self._back_prop(row_index, col_index - 1)
-            else:
-                col_index += 1
-            self._board.update(pygame.mouse.get_pos())  # update the game board
-            pygame.display.update()  # update the display
-        end_time = time.perf_counter()
-        print(math.floor(end_time - start_time) / 60)
+    def _show_solve(self, elapsed: float) -> None:
+        """
+        Shows the latest state of the running solve. While animating, steps are taken from
+        the worker at the steps per second of the selected speed, however fast the frames
+        come; the other speeds show the most recent state the worker has sent.
+
+        :param elapsed: The seconds since the last frame.
+        :return: None.
+        """
+        _, _, _, steps_per_second = SOLVE_SPEEDS[self._speed_index]
+        if steps_per_second is None:
+            limit = None
+        else:
+            self._steps_due = min(self._steps_due + steps_per_second * elapsed, SOLVE_QUEUE_SIZE)
+            limit = int(self._steps_due)
+            self._steps_due -= limit
+
+        messages = self._worker.get_messages(limit)
+        if not messages:
+            return
+        message = messages[-1]
+        self._board.get_puzzle().get_values()[:] = message[1]
+        if message[0] == STEP:
+            _, _, row_index, col_index = message
+            self._board.set_selected_square_coords(BOARD_LEFT + (SQUARE_WIDTH * col_index),
+                                                   BOARD_TOP + (SQUARE_HEIGHT * row_index))
+        else:
+            self._worker = None
+            print("Solution Speed: {:.2f}s ({})".format(message[2].get_seconds(), message[2].get_status()))
+
+    def _next_speed(self) -> None:
+        """
+        Switches to the next solve speed. A running solve keeps the speed it was started
+        with, except that it is shown at the new pace.
+
+        :return: None.
+        """
+        self._speed_index = (self._speed_index + 1) % len(SOLVE_SPEEDS)
+        self._board.set_speed_text(SOLVE_SPEEDS[self._speed_index][0])
+
+    def _cancel_solve(self) -> None:
+        """
+        Stops the running solve, if any, and puts the unsolved puzzle back on the board.
+
+        :return: None.
+        """
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        self._worker = None
+        self._board.get_puzzle().get_values()[:] = self._unsolved_values
+
+
+class SolveWorker(object):
+    """
+    Solves a puzzle with one of the engines in engines.py on a background thread. The
+    state of the puzzle is sent to the main loop through a bounded queue every `stride`
+    steps, and once more when the solve ends, so the search runs ahead of the display by
+    at most SOLVE_QUEUE_SIZE messages.
+    """
+    def __init__(self, values: bytes, engine: str, stride: int = None):
+        """
+        Creates a SolveWorker object.
+
+        :param values: The 81 stored values of the puzzle, as from Puzzle.get_values.
+        :param engine: The name of the solver engine to use (see engines.py).
+        :param stride: The number of steps between messages, or None to only send the
+            solution. Sending steps needs an engine with a `steps` method.
+        """
+        if stride is not None and not has_steps(engine):
+            raise ValueError("The {!r} engine can't solve one step at a time".format(engine))
+        self._solve = get_engine(engine)(bytearray(values))
+        self._stride = stride
+        self._cancel_token = CancelToken()
+        self._queue = queue.Queue(maxsize=SOLVE_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name='SolveWorker', daemon=True)
+
+    def start(self) -> None:
+        """
+        Starts the solve.
+
+        :return: None.
+        """
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """
+        Asks the solve to stop. No more messages are sent once it is cancelled.
+
+        :return: None.
+        """
+        self._cancel_token.cancel()
 
-    def _back_prop(self, row_index: int, col_index: int) -> tuple:
+    def get_messages(self, limit: int = None) -> list:
         """
-        Recursively moves backwards through the Sudoku puzzle until a non-preset
-        value less than 9 is found.
+        Takes the messages that have arrived without waiting for more. A message is either
+        (STEP, values, row index, col index) for the square that was just changed, or
+        (DONE, values, SolveResult) when the solve has ended.
 
-        :param row_index: The current row index in the puzzle.
-        :param col_index: The current column index in the puzzle
-        :return: A tuple containing the row index and column index where the
-            non-preset value was found.
+        :param limit: The most messages to take, or None to take them all.
+        :return: A list of messages, oldest first.
         """
-        if col_index < 0:
-            col_index = 8
-            row_index -= 1
+        messages = []
+        while limit is None or len(messages) < limit:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
 
-        # base case
-        if self._board.get_number(row_index, col_index) != '9' and not self._board.is_preset(row_index, col_index):
-            return row_index, col_index
+    def _run(self) -> None:
+        """
+        Runs the search, sending the messages described in `get_messages`.
 
-        if self._board.get_number(row_index, col_index) == '9' and not self._board.is_preset(row_index, col_index):
-            self._board.set_number_by_index(row_index, col_index, '.')
-            return self._back_prop(row_index, col_index - 1)
-        elif self._board.is_preset(row_index, col_index):
-            return self._back_prop(row_index, col_index - 1)
+        :return: None.
+        """
+        puzzle = self._solve.get_puzzle()
+        values = puzzle.get_values()
+        if self._stride is None:
+            result = self._solve.solve(Budget(cancel_token=self._cancel_token))
+            self._send((DONE, bytes(values), result))
+            return
+
+        start_time = time.perf_counter()
+        step_count = node_count = 0
+        reason = None
+        if puzzle.is_valid():
+            for kind, row_index, col_index, _ in self._solve.steps():
+                if self._cancel_token.is_cancelled():
+                    reason = CANCELLED
+                    break
+                node_count += kind == PLACE
+                step_count += 1
+                if step_count % self._stride == 0:
+                    if not self._send((STEP, bytes(values), row_index, col_index)):
+                        return
+
+        if reason is not None:
+            status = BUDGET_EXHAUSTED
+        else:
+            status = SOLVED if puzzle.get_empty_count() == 0 else UNSOLVABLE
+        result = SolveResult(status, node_count, time.perf_counter() - start_time, reason)
+        self._send((DONE, bytes(values), result))
+
+    def _send(self, message: tuple) -> bool:
+        """
+        Puts a message on the queue, waiting while the queue is full.
+
+        :param message: The message to send.
+        :return: False if the solve was cancelled before the message could be sent.
+            Otherwise, True.
+        """
+        while not self._cancel_token.is_cancelled():
+            try:
+                self._queue.put(message, timeout=0.05)
+                return True
+            except queue.Full:
+                pass
+        return False
 
 
 class Board(object):
     """Represents the Sudoku board."""
-    pygame.display.set_caption("Sudoku Solver")
-
     def __init__(self):
         """Creates a Sudoku Board object."""
         self._window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        self._surface = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT))
-        self._window.fill(WHITE)
-        self._surface.fill(WHITE)
+        pygame.display.set_caption("Sudoku Solver")
+        # the parts of the board that never change are drawn once: a white background and,
+        #   separately, the grid lines, which are laid over each square after it is drawn
+        self._background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self._background.fill(WHITE)
+        self._grid = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self._grid.fill(WHITE)
+        self._grid.set_colorkey(WHITE)
+        self._draw_grid(self._grid)
+        self._tint = pygame.Surface((SQUARE_WIDTH, SQUARE_HEIGHT))
+        self._tint.set_alpha(100)
+        self._tint.fill(SQUARE_BLUE)
+        # what each square showed when it was last drawn, as (value, highlight), so that
+        #   only the squares that changed are drawn again
+        self._drawn_squares = [None] * 81
+        self._full_redraw = True
         self._solve_button = Button(self._window, 'Solve Puzzle', SOLVE_BUTTON_LEFT, SOLVE_BUTTON_TOP)
         self._clear_button = Button(self._window, 'Clear Puzzle', CLEAR_BUTTON_LEFT, CLEAR_BUTTON_TOP)
+        self._speed_button = Button(self._window, SOLVE_SPEEDS[0][0], SPEED_BUTTON_LEFT, SPEED_BUTTON_TOP)
+        self._cancel_button = Button(self._window, 'Cancel Solve', CANCEL_BUTTON_LEFT, CANCEL_BUTTON_TOP)
         self._selected_square_coords = []
-        self._puzzle = [[".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        ]
+        self._puzzle = Puzzle('.' * 81)
+        preload('123456789', NUMBER_FONT_SIZE, BLACK, FONT_NAME)
         # self._puzzle = [["5", "3", ".", ".", "7", ".", ".", ".", "."],
         #                 ["6", ".", ".", "1", "9", "5", ".", ".", "."],
         #                 [".", "9", "8", ".", ".", ".", ".", "6", "."],
@@ -193,26 +338,60 @@ class Board(object):
         #                 [".", "6", ".", ".", ".", ".", "2", "8", "."],
         #                 [".", ".", ".", "4", "1", "9", ".", ".", "5"],
         #                 [".", ".", ".", ".", "8", ".", ".", "7", "9"]]
-        self._puzzle_presets = []
 
-    def update(self, mouse_position):
+    def update(self, mouse_position) -> list:
         """
-        Collectively updates Board conditions (colors, numbers, etc.).
+        Collectively updates Board conditions (colors, numbers, etc.). Only the squares
+        whose number or highlight changed since the last update, and the buttons whose
+        color changed, are drawn again.
+
+        :param mouse_position: The current position of the user's mouse.
+        :return: A list of the pygame Rects that were drawn, for `pygame.display.update`.
+        """
+        dirty = []
+        if self._full_redraw:
+            self._window.blit(self._background, (0, 0))
+            self._window.blit(self._grid, (0, 0))  # the outer lines reach past the squares
+            self._drawn_squares = [None] * 81
+            dirty.append(self._window.get_rect())
+
+        selected_row, selected_col = self._get_selected_square()
+        values = self._puzzle.get_values()
+        for index in range(81):
+            row_index, col_index = divmod(index, 9)
+            if row_index == selected_row and col_index == selected_col:
+                highlight = SELECTED
+            elif row_index == selected_row or col_index == selected_col:
+                highlight = TINTED
+            else:
+                highlight = PLAIN
+            square = (values[index], highlight)
+            if square != self._drawn_squares[index]:
+                self._drawn_squares[index] = square
+                dirty.append(self._draw_square(row_index, col_index, square))
+
+        for button in (self._clear_button, self._solve_button, self._speed_button, self._cancel_button):
+            rect = button.update(mouse_position, self._full_redraw)
+            if rect is not None:
+                dirty.append(rect)
+        self._full_redraw = False
+        return dirty
+
+    def invalidate(self) -> None:
+        """
+        Makes the next update redraw the whole window, e.g. after it has been uncovered.
 
         :return: None.
         """
-        # refresh the board before updating conditions
-        self._window.blit(self._surface, (BOARD_LEFT, BOARD_TOP))
-        # if selected square coordinates list is not empty then color the square, row,
-        # and column
-        if self._selected_square_coords:
-            self._color_selected_square()
-            self._color_square_col()
-            self._color_square_row()
-        self._clear_button.update(mouse_position)
-        self._solve_button.update(mouse_position)
-        self._place_numbers()  # draw numbers on the Sudoku board
-        self._draw_grid()  # draw grid lines on the board
+        self._full_redraw = True
+
+    def get_puzzle(self) -> Puzzle:
+        """
+        Returns the puzzle shown on the board.
+
+        :return: The Puzzle object.
+        """
+        return self._puzzle
 
     def get_number(self, row_index: int, col_index: int) -> str:
         """
@@ -224,7 +403,7 @@ class Board(object):
         :return: The number corresponding to the specified row index and column
             index.
         """
-        return self._puzzle[row_index][col_index]
+        return self._puzzle.get_number(row_index, col_index)
 
     def set_number_by_index(self, row_index: int, col_index: int, number: str) -> None:
         """
@@ -236,7 +415,7 @@ class Board(object):
         :param number: The number to place in the puzzle.
         :return: None.
         """
-        self._puzzle[row_index][col_index] = number
+        self._puzzle.set(row_index, col_index, number)
 
     def set_number_by_selected(self, number: any) -> None:
         """
@@ -252,7 +431,7 @@ class Board(object):
 
         # update underlying puzzle data structure with `number` at calculated
         #   row and column indices
-        self._puzzle[row][col] = str(number)
+        self._puzzle.set(row, col, str(number))
 
     def set_selected_square_coords(self, x_coord: int, y_coord: int) -> None:
         """
@@ -286,17 +465,17 @@ class Board(object):
         """
         self._solve_button.unclick()
 
+    def set_speed_text(self, text: str) -> None:
+        """
+        Shows the selected solve speed on the speed button.
+
+        :param text: The name of the speed.
+        :return: None.
+        """
+        self._speed_button.set_text(text)
+
     def clear_board(self) -> None:
-        self._puzzle = [[".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        [".", ".", ".", ".", ".", ".", ".", ".", "."],
-                        ]
+        self._puzzle = Puzzle('.' * 81)
 
     def solve_sudoku(self) -> bool:
         """
@@ -309,16 +488,11 @@ class Board(object):
 
     def solved(self) -> bool:
         """
-        Searches each row in the Sudoku puzzle to determine if a solution has been
-        found.
+        Determines if a solution has been found by checking for empty squares.
 
         :return: True if a solution has been found. Otherwise, False.
         """
-        if '.' in self._puzzle[0] or '.' in self._puzzle[1] or '.' in self._puzzle[2] or \
-                '.' in self._puzzle[3] or '.' in self._puzzle[4] or '.' in self._puzzle[5] or \
-                '.' in self._puzzle[5] or '.' in self._puzzle[7] or '.' in self._puzzle[8]:
-            return False
-        return True
+        return self._puzzle.get_empty_count() == 0
 
     def is_preset(self, row_index: int, col_index: int) -> bool:
         """
@@ -328,233 +502,88 @@ class Board(object):
         :param col_index: The column corresponding to the value in the puzzle to check.
         :return: True if the value is preset. Otherwise, False.
         """
-        if self._puzzle_presets[row_index][col_index]:
-            return True
-        else:
-            return False
+        return self._puzzle.is_preset(row_index, col_index)
 
     def lock_presets(self) -> None:
         """
-        Locks preset puzzle values into place by setting the puzzle presets attribute
-        equal to a boolean matrix where True is a preset value and False is a variable
-        value.
+        Locks preset puzzle values into place, so that every number currently on the
+        board is treated as a preset value.
 
         :return: None.
         """
-        self._puzzle_presets = self._find_presets()
-
-    def in_row(self, row_index: int, number: str) -> bool:
-        """
-        Searches the Sudoku puzzle to see if `number` exists in the specified row index.
-
-        :param row_index: The row index in the Sudoku puzzle to search in.
-        :param number: The number to search for.
-        :return: True if the number is found in the row. Otherwise, False.
-        """
-        # return true if `number` is in the row corresponding to the row index
-        if number in self._puzzle[row_index]:
-            return True
-        return False  # number not found in row, return false
-
-    def in_col(self, col_index: int, number: str) -> bool:
-        """
-        Searches the Sudoku puzzle to see if 'number' exists in the specified column
-        index.
-
-        :param col_index: The column index in the Sudoku puzzle to search in.
-        :param number: The number to search for.
-        :return: True if the number is found in the column. Otherwise, False.
-        """
-        # iterate through each row in the puzzle
-        for row in self._puzzle:
-            # search for `number` in the current row at the column index
-            if row[col_index] == number:
-                return True  # number found, return True
-        return False  # number not in column, return false
-
-    def in_square(self, row_index: int, col_index: int, number: str) -> bool:
-        """
-        Searches the Sudoku puzzle to see if the `number` exists in the square
-        region of the Sudoku board as indicated by the specified row index and
-        column index.
-
-        :param row_index: The row index of the Sudoku puzzle to search in.
-        :param col_index: The column index of the Sudoku puzzle to search
-            in.
-        :param number: The number to search for.
-        :return: True if the number is found in the square region. Otherwise,
-            False.
-        """
-        # create a hash table for each Sudoku puzzle square and a list of corresponding
-        #   puzzle values
-        squares = {1: self._puzzle[0][:3] + self._puzzle[1][:3] + self._puzzle[2][:3],
-                   2: self._puzzle[0][3:6] + self._puzzle[1][3:6] + self._puzzle[2][3:6],
-                   3: self._puzzle[0][6:] + self._puzzle[1][6:] + self._puzzle[2][6:],
-                   4: self._puzzle[3][:3] + self._puzzle[4][:3] + self._puzzle[5][:3],
-                   5: self._puzzle[3][3:6] + self._puzzle[4][3:6] + self._puzzle[5][3:6],
-                   6: self._puzzle[3][6:] + self._puzzle[4][6:] + self._puzzle[5][6:],
-                   7: self._puzzle[6][:3] + self._puzzle[7][:3] + self._puzzle[8][:3],
-                   8: self._puzzle[6][3:6] + self._puzzle[7][3:6] + self._puzzle[8][3:6],
-                   9: self._puzzle[6][6:] + self._puzzle[7][6:] + self._puzzle[8][6:]
-                   }
-
-        # the row index of the number is 0, 1, or 2
-        if row_index == 0 or row_index == 1 or row_index == 2:
-            # column index of the number is 0, 1, or 2
-            if 0 <= col_index < 3:
-                if number in squares[1]:
-                    return True
-                return False
-            # column index of the number is 3, 4, or 5
-            elif 3 <= col_index < 6:
-                if number in squares[2]:
-                    return True
-                return False
-            # column index of the number is 6, 7, or 8
-            else:
-                if number in squares[3]:
-                    return True
-                return False
-        # the row index of the number is 3, 4, or 5
-        elif row_index == 3 or row_index == 4 or row_index == 5:
-            # column index of the numbers is 0, 1, or 2
-            if 0 <= col_index < 3:
-                if number in squares[4]:
-                    return True
-                return False
-            # column index of the numbers is 3, 4, or 5
-            elif 3 <= col_index < 6:
-                if number in squares[5]:
-                    return True
-                return False
-            # column index of the numbers is 6, 7, or 8
-            else:
-                if number in squares[6]:
-                    return True
-                return False
-        # the row index of the number is 6, 7 or 8
-        else:
-            # column index of the numbers is 0, 1, or 2
-            if 0 <= col_index < 3:
-                if number in squares[7]:
-                    return True
-                return False
-            # column index of the numbers is 3, 4, or 5
-            elif 3 <= col_index < 6:
-                if number in squares[8]:
-                    return True
-                return False
-            # column index of the numbers is 6, 7, or 8
-            else:
-                if number in squares[9]:
-                    return True
-                return False
-
-    def _find_presets(self) -> list:
-        """
-        Iterates through the initial Sudoku puzzle and determines which values are preset and
-        which values are variable.
-
-        :return: A matrix (list-of-lists) containing boolean values - True for preset, False
-            for variable.
-        """
-        preset_values = []
-        for row_index, row in enumerate(self._puzzle):
-            preset_row = []
-            for col_index, col_value in enumerate(row):
-                if col_value == '.':
-                    preset_row.append(False)
-                else:
-                    preset_row.append(True)
-            preset_values.append(list(preset_row))
-            preset_row.clear()
-        return preset_values
-
-    def _place_numbers(self) -> None:
-        """
-        Places the numbers set in the puzzle onto the Sudoku Board.
-
-        :return: None.
-        """
-        for row_index, row in enumerate(self._puzzle):
-            for col_index, number in enumerate(row):
-                if number != ".":
-                    font = pygame.font.SysFont('Arial', 30)
-                    number_surface = font.render(number, True, BLACK)
-                    self._window.blit(number_surface,
-                                      (BOARD_LEFT + (SQUARE_WIDTH * col_index) + (SQUARE_WIDTH / 2) - 5,
-                                       BOARD_TOP + (SQUARE_HEIGHT * row_index) + (SQUARE_HEIGHT / 4) - 5
-                                       )
-                                      )
-
-    def _color_selected_square(self) -> None:
-        """
-        Colors the selected square.
+        self._puzzle.lock_presets()
 
-        :return: None.
+    def _get_selected_square(self) -> tuple:
         """
-        # draw and color a pygame rectangle to show the selected square
-        pygame.draw.rect(self._window,
-                         SQUARE_BLUE,
-                         pygame.Rect(self._selected_square_coords[0],
-                                     self._selected_square_coords[1],
-                                     SQUARE_WIDTH,
-                                     SQUARE_HEIGHT)
-                         )
+        Returns the row index and column index of the selected square.
 
-    def _color_square_row(self) -> None:
+        :return: A tuple containing the row index and column index, or (None, None) if no
+            square is selected.
         """
-        Colors the row corresponding to the selected square.
+        if not self._selected_square_coords or None in self._selected_square_coords:
+            return None, None
+        return ((self._selected_square_coords[1] - BOARD_TOP) // SQUARE_HEIGHT,
+                (self._selected_square_coords[0] - BOARD_LEFT) // SQUARE_WIDTH)
 
-        :return: None.
+    def _draw_square(self, row_index: int, col_index: int, square: tuple) -> pygame.Rect:
         """
-        # create and blit a pygame Surface to show the row corresponding to the selected
-        #   square
-        row_surface = pygame.Surface((BOARD_WIDTH, SQUARE_HEIGHT))
-        row_surface.set_alpha(100)
-        row_surface.fill(SQUARE_BLUE)
-        self._window.blit(row_surface, (BOARD_LEFT, self._selected_square_coords[1]))
+        Draws one square of the Sudoku Board: the background, the highlight, the number
+        and the grid lines that cross it.
 
-    def _color_square_col(self) -> None:
-        """
-        Colors the column corresponding to the selected square.
-
-        :return: None.
+        :param row_index: The row index of the square.
+        :param col_index: The column index of the square.
+        :param square: A tuple containing the stored value and the highlight of the square.
+        :return: The pygame Rect that was drawn.
         """
-        # create and blit a pygame Surface to show the column corresponding to the selected
-        #   square
-        col_surface = pygame.Surface((SQUARE_WIDTH, BOARD_HEIGHT))
-        col_surface.set_alpha(100)
-        col_surface.fill(SQUARE_BLUE)
-        self._window.blit(col_surface, (self._selected_square_coords[0], BOARD_TOP))
+        value, highlight = square
+        rect = pygame.Rect(BOARD_LEFT + (SQUARE_WIDTH * col_index), BOARD_TOP + (SQUARE_HEIGHT * row_index),
+                           SQUARE_WIDTH, SQUARE_HEIGHT)
+        self._window.set_clip(rect)
+        self._window.blit(self._background, rect, rect)
+        if highlight == SELECTED:
+            self._window.fill(SQUARE_BLUE, rect)
+        elif highlight == TINTED:
+            self._window.blit(self._tint, rect)
+        if value != DOT:
+            number_surface = render_text(chr(value), NUMBER_FONT_SIZE, BLACK, FONT_NAME)
+            self._window.blit(number_surface,
+                              (rect.left + (SQUARE_WIDTH / 2) - 5,
+                               rect.top + (SQUARE_HEIGHT / 4) - 5
+                               )
+                              )
+        self._window.blit(self._grid, rect, rect)
+        self._window.set_clip(None)
+        return rect
 
-    def _draw_grid(self) -> None:
+    def _draw_grid(self, surface: pygame.Surface) -> None:
         """
-        Draws the grid used in Sudoku on the Board.
+        Draws the grid used in Sudoku.
 
+        :param surface: The surface to draw the grid on.
         :return: None.
         """
         # draw the outline of the grid
         pygame.draw.rect(
-            self._window,
+            surface,
             BLACK,
             pygame.Rect(
                 BOARD_LEFT, BOARD_TOP, BOARD_WIDTH, BOARD_HEIGHT),
             width=3
         )
-        self._draw_vertical_grid_lines()  # draw vertical grid lines
-        self._draw_horizontal_grid_lines()  # draw horizontal grid lines
+        self._draw_vertical_grid_lines(surface)  # draw vertical grid lines
+        self._draw_horizontal_grid_lines(surface)  # draw horizontal grid lines
 
-    def _draw_vertical_grid_lines(self) -> None:
+    def _draw_vertical_grid_lines(self, surface: pygame.Surface) -> None:
         """
-        Draws vertical grid lines on the Board.
+        Draws vertical grid lines.
 
+        :param surface: The surface to draw the lines on.
         :return: None.
         """
         line_count = 1
         for x_coord in range(BOARD_LEFT + SQUARE_WIDTH, BOARD_WIDTH + BOARD_LEFT + SQUARE_WIDTH, SQUARE_WIDTH):
             width = 1 if line_count % 3 != 0 else 3
-            pygame.draw.line(self._window,
+            pygame.draw.line(surface,
                              BLACK,
                              (x_coord, BOARD_TOP),
                              (x_coord, BOARD_HEIGHT + BOARD_TOP),
@@ -562,16 +591,17 @@ class Board(object):
                              )
             line_count += 1
 
-    def _draw_horizontal_grid_lines(self) -> None:
+    def _draw_horizontal_grid_lines(self, surface: pygame.Surface) -> None:
         """
-        Draws horizontal grid lines on the Board.
+        Draws horizontal grid lines.
 
+        :param surface: The surface to draw the lines on.
         :return: None.
         """
         line_count = 1
         for y_coord in range(BOARD_TOP + SQUARE_HEIGHT, BOARD_HEIGHT + BOARD_TOP + SQUARE_HEIGHT, SQUARE_HEIGHT):
             width = 1 if line_count % 3 != 0 else 3
-            pygame.draw.line(self._window,
+            pygame.draw.line(surface,
                              BLACK,
                              (BOARD_LEFT, y_coord),
                              (BOARD_LEFT + BOARD_WIDTH, y_coord),
@@ -585,14 +615,7 @@ class Board(object):
 
         :return: None.
         """
-        output = ''  # initialize the string to return
-        # iterate through each row in the puzzle
-        for row in self._puzzle:
-            # iterate through each value in the current row
-            for index, value in enumerate(row):
-                # append value to output string, if index is 8 then start a new line
-                output = (output + value + '\n') if index == 8 else (output + value + ' ')
-        return output
+        return self._puzzle.__str__()
 
 
 class Button(object):
@@ -604,21 +627,37 @@ class Button(object):
         self._text = text
         self._left = left
         self._top = top
+        self._drawn_color = None
 
-    def update(self, mouse_position: tuple) -> None:
+    def update(self, mouse_position: tuple, force: bool = False) -> pygame.Rect:
         """
-        Updates the states of the Button.
+        Updates the states of the Button, drawing it only if its color changed.
 
         :param mouse_position: The current position of the user's mouse.
-        :return: None.
+        :param force: If True, the Button is drawn even if its color did not change.
+        :return: The pygame Rect that was drawn, or None if the Button was not drawn.
         """
         if (self._left <= mouse_position[0] <= self._left + BUTTON_WIDTH) and \
                 (self._top <= mouse_position[1] <= self._top + BUTTON_HEIGHT):
             color = DARK_GREY
         else:
             color = LIGHT_GREY
+        if color == self._drawn_color and not force:
+            return None
+        self._drawn_color = color
         self._draw_button(color)
         self._button_text()
+        return pygame.Rect(self._left, self._top, BUTTON_WIDTH, BUTTON_HEIGHT)
+
+    def set_text(self, text: str) -> None:
+        """
+        Changes the text shown inside of the Button.
+
+        :param text: The new text.
+        :return: None.
+        """
+        self._text = text
+        self._drawn_color = None  # draw the new text on the next update
 
     def is_clicked(self) -> bool:
         """
@@ -665,8 +704,7 @@ class Button(object):
 
         :return: None.
         """
-        font = pygame.font.SysFont('Arial', 20)
-        text_surface = font.render(self._text, True, BLACK)
+        text_surface = render_text(self._text, BUTTON_FONT_SIZE, BLACK, FONT_NAME)
         self._board.blit(text_surface, (self._left + 15, self._top + 2))
 
 
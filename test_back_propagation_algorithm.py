@@ -0,0 +1,95 @@
+# Author: Colin Francis
+# Description: Checks the Puzzle storage and the SolveSudoku search
+import itertools
+import unittest
+from back_propagation_algorithm import Puzzle, SolveSudoku, CHECKPOINT_SIZE, checkpoint_layout
+from bitmask_algorithm import BitmaskSolveSudoku
+from puzzle_corpus import PUZZLES, GIANT_PUZZLES
+from solve_result import UNSOLVABLE
+
+
+class PuzzleTest(unittest.TestCase):
+    """Builds puzzles from the supported input types and validates them."""
+    def test_bytearray_is_copied(self):
+        """Normalising '0' blanks does not change the caller's buffer."""
+        line = bytearray(PUZZLES['classic'].replace('.', '0'), 'ascii')
+        puzzle = Puzzle(line)
+        self.assertEqual(puzzle.to_string(), PUZZLES['classic'])
+        self.assertEqual(line, bytearray(PUZZLES['classic'].replace('.', '0'), 'ascii'))
+        puzzle.get_values()[0] = ord('.')
+        self.assertNotEqual(line[0], ord('.'))
+
+    def test_invalid_symbols(self):
+        """A character that is not a symbol of the board makes the puzzle invalid."""
+        puzzle = PUZZLES['classic']
+        self.assertTrue(Puzzle(puzzle).is_valid())
+        for character in 'xG ':
+            self.assertFalse(Puzzle(character + puzzle[1:]).is_valid())
+        self.assertTrue(Puzzle('G' + '.' * 255).is_valid())
+
+    def test_repeated_number(self):
+        """A number repeated in a unit makes the puzzle invalid."""
+        self.assertFalse(Puzzle('11' + '.' * 79).is_valid())
+        self.assertFalse(Puzzle('1' + '.' * 8 + '1' + '.' * 71).is_valid())
+        self.assertFalse(Puzzle('1' + '.' * 9 + '1' + '.' * 70).is_valid())
+
+
+class SolveSudokuTest(unittest.TestCase):
+    """Follows the search with steps and solve."""
+    def test_invalid_puzzle_has_no_steps(self):
+        """An impossible board ends the search at once instead of searching it."""
+        for puzzle in ('11' + '.' * 79, 'x' + PUZZLES['classic'][1:]):
+            for engine in (SolveSudoku, BitmaskSolveSudoku):
+                solver = engine(puzzle)
+                self.assertEqual(list(solver.steps()), [])
+                self.assertEqual(solver.solve().get_status(), UNSOLVABLE)
+                self.assertEqual(engine(puzzle).solve().get_status(), UNSOLVABLE)
+
+
+class CheckpointTest(unittest.TestCase):
+    """Saves searches part way through and carries them on from the saved bytes."""
+    def test_round_trip_9x9(self):
+        """A restored 9x9 search has the same state and finds the same solution."""
+        solver = SolveSudoku(PUZZLES['classic'])
+        for _ in itertools.islice(solver.steps(), 200):
+            pass
+        checkpoint = solver.checkpoint()
+        self.assertEqual(len(checkpoint), CHECKPOINT_SIZE)
+        restored = SolveSudoku.restore(checkpoint)
+        self.assertEqual(restored.checkpoint(), checkpoint)
+        self.assertEqual(restored.get_puzzle().get_presets(), solver.get_puzzle().get_presets())
+        self.assertTrue(restored.solve())
+        self.assertTrue(solver.solve())
+        self.assertEqual(restored.get_puzzle().to_string(), solver.get_puzzle().to_string())
+
+    def test_round_trip_16x16(self):
+        """A 16x16 checkpoint has its own layout, and the restored search takes the same steps."""
+        solver = SolveSudoku(GIANT_PUZZLES['16x16'])
+        for _ in itertools.islice(solver.steps(), 300):
+            pass
+        checkpoint = solver.checkpoint()
+        self.assertEqual(len(checkpoint), checkpoint_layout(256)[2])
+        restored = SolveSudoku.restore(checkpoint)
+        self.assertEqual(restored.checkpoint(), checkpoint)
+        self.assertEqual(list(itertools.islice(restored.steps(), 500)), list(itertools.islice(solver.steps(), 500)))
+
+    def test_resume_after_steps(self):
+        """The steps of a restored search continue the steps of the saved one."""
+        steps = list(itertools.islice(SolveSudoku(PUZZLES['classic']).steps(), 400))
+        solver = SolveSudoku(PUZZLES['classic'])
+        first = list(itertools.islice(solver.steps(), 150))
+        second = list(itertools.islice(SolveSudoku.restore(solver.checkpoint()).steps(), 250))
+        self.assertEqual(first + second, steps)
+
+    def test_wrong_length(self):
+        """A checkpoint of a length no board has is rejected with the valid sizes."""
+        checkpoint = SolveSudoku(PUZZLES['classic']).checkpoint()
+        for data in (checkpoint[:-1], checkpoint + b'.', b''):
+            with self.assertRaises(ValueError) as context:
+                SolveSudoku.restore(data)
+            self.assertIn('93 (9x9)', str(context.exception))
+            self.assertIn('290 (16x16)', str(context.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
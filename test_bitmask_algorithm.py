@@ -0,0 +1,34 @@
+# Author: Colin Francis
+# Description: Checks BitmaskSolveSudoku against SolveSudoku on the puzzle corpus
+import itertools
+import unittest
+from back_propagation_algorithm import SolveSudoku
+from bitmask_algorithm import BitmaskSolveSudoku, verify_against_reference
+from puzzle_corpus import PUZZLES
+
+
+class VerifyAgainstReferenceTest(unittest.TestCase):
+    """Runs the bitmask solver and the reference solver side by side."""
+    def test_corpus_matches_reference(self):
+        """Both solvers reach the same outcome, node count and board on every corpus puzzle."""
+        self.assertEqual(verify_against_reference(), [])
+
+    def test_steps_match_reference(self):
+        """The bitmask solver's steps, which count checks, are those of the reference solver."""
+        reference, bitmask = SolveSudoku(PUZZLES['classic']), BitmaskSolveSudoku(PUZZLES['classic'])
+        self.assertEqual(list(itertools.islice(bitmask.steps(), 300)), list(itertools.islice(reference.steps(), 300)))
+
+    def test_restored_checkpoint(self):
+        """A bitmask search restored from a checkpoint carries on to the same solution."""
+        solver = BitmaskSolveSudoku(PUZZLES['classic'])
+        for _ in itertools.islice(solver.steps(), 100):
+            pass
+        restored = BitmaskSolveSudoku.restore(solver.checkpoint())
+        next(restored.steps())
+        self.assertTrue(restored.solve())
+        self.assertTrue(solver.solve())
+        self.assertEqual(restored.get_puzzle().to_string(), solver.get_puzzle().to_string())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+# Author: Colin Francis
+# Description: Checks the canonical forms, hits and evictions of SolutionCache
+import random
+import unittest
+from unittest import mock
+import canonical_cache
+from canonical_cache import SolutionCache, canonicalize, random_transform, _line_orders
+from puzzle_corpus import PUZZLES
+
+
+class SolutionCacheTest(unittest.TestCase):
+    """Solves puzzles and equivalent variants through small caches."""
+    def assertSolves(self, puzzle: str, solution: str):
+        """Asserts that a solution is full and keeps the clues of the puzzle."""
+        self.assertNotIn('.', solution)
+        for clue, number in zip(puzzle, solution):
+            self.assertIn(clue, ('.', number))
+
+    def test_hit_on_transformed_variant(self):
+        """A relabeled, reordered and transposed puzzle is answered from the cache."""
+        cache = SolutionCache()
+        puzzle = PUZZLES['medium']
+        cache.solve(puzzle)
+        variant = random_transform(random.Random(1)).apply(puzzle)
+        self.assertNotEqual(variant, puzzle)
+        self.assertSolves(variant, cache.solve(variant))
+        self.assertEqual((cache.get_hit_count(), cache.get_miss_count()), (1, 1))
+
+    def test_exact_repeat_and_propagation(self):
+        """A puzzle that propagation solves skips the lookup, and repeats are hits."""
+        cache = SolutionCache()
+        solution = cache.solve(PUZZLES['classic'])
+        self.assertSolves(PUZZLES['classic'], solution)
+        self.assertEqual(cache.get_propagated_count(), 1)
+        self.assertEqual(cache.solve(PUZZLES['classic'].replace('.', '0')), solution)
+        self.assertEqual((cache.get_hit_count(), cache.get_miss_count()), (1, 0))
+        self.assertEqual(cache.solve_with_status('11' + '.' * 79), (None, 'unsolvable'))
+
+    def test_lru_eviction(self):
+        """The least recently used solution is evicted when the cache is full."""
+        cache = SolutionCache(max_size=2)
+        first, second, third = PUZZLES['medium'], PUZZLES['inkala'], PUZZLES['golden_nugget']
+        for puzzle in (first, second, first, third):
+            cache.solve(puzzle)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.get_hit_count(), cache.get_miss_count()), (1, 3))
+        cache.solve(first)
+        self.assertEqual(cache.get_hit_count(), 2)
+        cache.solve(second)
+        self.assertEqual(cache.get_miss_count(), 4)
+
+    def test_tied_orders_are_truncated(self):
+        """Lines that cannot be told apart are tried in at most MAX_TIED_ORDERS orders."""
+        solution = SolutionCache().solve(PUZZLES['classic'])
+        self.assertEqual(len(_line_orders(solution)), canonical_cache.MAX_TIED_ORDERS)
+        with mock.patch.object(canonical_cache, 'MAX_TIED_ORDERS', 1):
+            self.assertEqual(len(_line_orders(solution)), 1)
+            key, transform = canonicalize(solution)
+        self.assertEqual(transform.apply(solution), key)
+        self.assertEqual(transform.invert(key), solution)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+# Author: Colin Francis
+# Description: Checks solution counting and uniqueness checks of PropagationSolveSudoku
+import unittest
+from constraint_propagation import PropagationSolveSudoku
+from puzzle_corpus import PUZZLES
+from solve_result import Budget, NODE_LIMIT
+
+
+class CountSolutionsTest(unittest.TestCase):
+    """Counts the solutions of puzzles with one and with many solutions."""
+    def test_unique_puzzle(self):
+        """The classic puzzle has one solution and is left as it was."""
+        solver = PropagationSolveSudoku(PUZZLES['classic'])
+        self.assertEqual(solver.count_solutions(limit=5), 1)
+        self.assertTrue(solver.is_unique())
+        self.assertTrue(solver.is_unique(Budget(max_nodes=1000)))
+        self.assertEqual(solver.get_puzzle().to_string(), PUZZLES['classic'])
+
+    def test_count_stops_at_limit(self):
+        """An empty board has many solutions, and counting stops at the limit."""
+        solver = PropagationSolveSudoku('.' * 81)
+        self.assertEqual(solver.count_solutions(limit=3), 3)
+        self.assertFalse(solver.is_unique())
+
+    def test_limit_below_one(self):
+        """A limit that cannot be reached is rejected instead of reporting a solution."""
+        solver = PropagationSolveSudoku(PUZZLES['classic'])
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                solver.count_solutions(limit)
+
+    def test_budget_stops_count(self):
+        """A node limit stops the count, and an unproven puzzle is not called unique."""
+        solver = PropagationSolveSudoku('.' * 80 + '1')
+        self.assertEqual(solver.count_solutions(limit=100, budget=Budget(max_nodes=10)), 0)
+        self.assertEqual(solver.get_stop_reason(), NODE_LIMIT)
+        self.assertFalse(solver.is_unique(Budget(max_nodes=10)))
+        self.assertEqual(solver.get_puzzle().to_string(), '.' * 80 + '1')
+
+
+if __name__ == "__main__":
+    unittest.main()
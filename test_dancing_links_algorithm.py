@@ -0,0 +1,35 @@
+# Author: Colin Francis
+# Description: Checks the input validation and search depth of DancingLinksSolveSudoku
+import sys
+import unittest
+from dancing_links_algorithm import DancingLinksSolveSudoku
+from puzzle_corpus import PUZZLES, GIANT_PUZZLES
+from solve_result import UNSOLVABLE
+
+
+class DancingLinksSolveSudokuTest(unittest.TestCase):
+    """Solves puzzles that the matrix must reject or that need a deep search."""
+    def test_invalid_symbol_is_rejected(self):
+        """A preset that is not a symbol of the board is not read as some other number."""
+        puzzle = PUZZLES['classic']
+        index = next(index for index, character in enumerate(puzzle) if character != '.')
+        solver = DancingLinksSolveSudoku(puzzle[:index] + 'x' + puzzle[index + 1:])
+        self.assertEqual(solver.solve().get_status(), UNSOLVABLE)
+        self.assertEqual(solver.get_puzzle().get_values()[index], ord('x'))
+
+    def test_repeated_preset_is_rejected(self):
+        """Two presets with the same number in a row cannot be solved."""
+        self.assertEqual(DancingLinksSolveSudoku('11' + '.' * 79).solve().get_status(), UNSOLVABLE)
+
+    def test_deep_search_needs_no_recursion(self):
+        """A 25x25 board, hundreds of levels deep, is solved under a small recursion limit."""
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(100)
+        try:
+            self.assertTrue(DancingLinksSolveSudoku(GIANT_PUZZLES['25x25']).solve())
+        finally:
+            sys.setrecursionlimit(limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
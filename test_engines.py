@@ -0,0 +1,41 @@
+# Author: Colin Francis
+# Description: Checks that every registered engine is created the same way
+import unittest
+from engines import ENGINES, solve
+from geometry import get_diagonal_geometry
+from puzzle_corpus import PUZZLES, GIANT_PUZZLES, VARIANT_PUZZLES
+
+
+class EngineRegistryTest(unittest.TestCase):
+    """Creates each registered engine with the shared constructor signature."""
+    def test_box_size_is_second(self):
+        """Every engine reads a positional second argument as the box size."""
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                self.assertEqual(engine(GIANT_PUZZLES['16x16'], 4).get_puzzle().get_size(), 16)
+                with self.assertRaises(ValueError):
+                    engine(PUZZLES['classic'], 4)
+
+    def test_geometry_is_third(self):
+        """Every engine reads a positional third argument as the geometry."""
+        geometry = get_diagonal_geometry()
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                self.assertIs(engine(VARIANT_PUZZLES['diagonal'], None, geometry).get_puzzle().get_geometry(),
+                              geometry)
+
+    def test_solve_by_name(self):
+        """Each engine finds the same solution of a variant puzzle."""
+        geometry = get_diagonal_geometry()
+        solutions = set()
+        for name in ENGINES:
+            if name == 'back-propagation':
+                continue  # the reference search takes seconds on this puzzle
+            solver, result = solve(VARIANT_PUZZLES['diagonal'], name, geometry=geometry)
+            self.assertTrue(result)
+            solutions.add(solver.get_puzzle().to_string())
+        self.assertEqual(len(solutions), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
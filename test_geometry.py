@@ -0,0 +1,122 @@
+# Author: Colin Francis
+# Description: Checks the index tables of boards of each box size and of the variant layouts
+import unittest
+from back_propagation_algorithm import Puzzle
+from engines import solve
+from geometry import Geometry, get_geometry, get_diagonal_geometry, get_jigsaw_geometry, box_size_for, MAX_BOX_SIZE
+from geometry import STANDARD, PEERS, UNITS_OF
+from puzzle_corpus import GIANT_PUZZLES, VARIANT_PUZZLES, JIGSAW_REGIONS
+
+
+class BoxSizeTest(unittest.TestCase):
+    """Builds the standard boards of every box size and solves the larger ones."""
+    def test_board_sizes(self):
+        """Each box size has its own symbols, and the number of squares gives the box size back."""
+        for box_size in range(1, MAX_BOX_SIZE + 1):
+            geometry = get_geometry(box_size)
+            size = box_size ** 2
+            self.assertEqual((geometry.size, geometry.cell_count), (size, size ** 2))
+            self.assertEqual(len(geometry.symbols), size)
+            self.assertEqual(box_size_for(geometry.cell_count), box_size)
+            for number, symbol in enumerate(geometry.symbols, 1):
+                self.assertEqual(geometry.number_of[ord(symbol)], number)
+                self.assertEqual(geometry.symbol_of[number], symbol)
+        self.assertEqual(get_geometry(4).symbols, '123456789ABCDEFG')
+        self.assertEqual(get_geometry(4).number_of[ord('H')], 0)
+        self.assertIs(get_geometry(4), get_geometry(4))
+
+    def test_unsupported_sizes(self):
+        """Box sizes without enough symbols and square counts of no board are rejected."""
+        for box_size in (0, MAX_BOX_SIZE + 1):
+            with self.assertRaises(ValueError):
+                Geometry(box_size)
+        for cell_count in (80, 82, 100):
+            with self.assertRaises(ValueError):
+                box_size_for(cell_count)
+
+    def test_boxes(self):
+        """The boxes of a 16x16 board are 4x4 blocks numbered left to right, top to bottom."""
+        geometry = get_geometry(4)
+        self.assertEqual(geometry.box_of[:16], (0,) * 4 + (1,) * 4 + (2,) * 4 + (3,) * 4)
+        self.assertEqual(geometry.box_of[4 * 16], 4)
+        self.assertEqual(geometry.box_of[255], 15)
+        for box in geometry.boxes:
+            rows = {geometry.row_of[index] for index in box}
+            cols = {geometry.col_of[index] for index in box}
+            self.assertEqual((len(rows), len(cols)), (4, 4))
+
+    def test_giant_puzzles(self):
+        """The 16x16 and 25x25 corpus puzzles are solved with symbols of their board."""
+        for name, line in GIANT_PUZZLES.items():
+            for engine in ('propagation', 'dancing-links'):
+                with self.subTest(puzzle=name, engine=engine):
+                    solver, result = solve(line, engine)
+                    self.assertTrue(result)
+                    solution = solver.get_puzzle()
+                    self.assertEqual(solution.get_size() ** 2, len(line))
+                    self.assertNotIn('.', solution.to_string())
+                    self.assertTrue(Puzzle(solution.to_string()).is_valid())
+                    for clue, number in zip(line, solution.to_string()):
+                        self.assertIn(clue, ('.', number))
+
+
+class IndexTablesTest(unittest.TestCase):
+    """Compares the build-once tables with the rows, columns and boxes they describe."""
+    def test_standard_tables(self):
+        """Every 9x9 square has three units and the 20 squares that share them as peers."""
+        self.assertIs(STANDARD, get_geometry(3))
+        self.assertEqual(len(STANDARD.units), 27)
+        for index in range(81):
+            row, col = divmod(index, 9)
+            box = (row // 3) * 3 + col // 3
+            self.assertEqual(UNITS_OF[index], (row, 9 + col, 18 + box))
+            peers = {other for other in range(81) if other != index and
+                     (other // 9 == row or other % 9 == col or (other // 27) * 3 + (other % 9) // 3 == box)}
+            self.assertEqual(PEERS[index], tuple(sorted(peers)))
+            for unit in UNITS_OF[index]:
+                self.assertIn(index, STANDARD.units[unit])
+
+    def test_unit_squares(self):
+        """The (row, col) form of each unit names the same squares as its indices."""
+        geometry = get_geometry(4)
+        self.assertEqual(len(geometry.peers[0]), 39)
+        for unit, squares in zip(geometry.units, geometry.unit_squares):
+            self.assertEqual(tuple(row * 16 + col for row, col in squares), unit)
+
+    def test_diagonal_tables(self):
+        """Squares on a diagonal have it as an extra unit, and the centre has both."""
+        geometry = get_diagonal_geometry()
+        self.assertIs(geometry, get_diagonal_geometry())
+        self.assertFalse(geometry.is_standard())
+        self.assertEqual(geometry.extra_units, (tuple(range(0, 81, 10)), tuple(range(8, 73, 8))))
+        self.assertEqual(geometry.units_of[0], (0, 9, 18, 27))
+        self.assertEqual(geometry.units_of[40], (4, 13, 22, 27, 28))
+        self.assertEqual(geometry.units_of[1], STANDARD.units_of[1])
+        self.assertIn(80, geometry.peers[0])
+        self.assertNotIn(80, STANDARD.peers[0])
+
+    def test_jigsaw_tables(self):
+        """The regions of a jigsaw board follow its region names instead of boxes."""
+        geometry = get_jigsaw_geometry(JIGSAW_REGIONS)
+        self.assertIs(geometry, get_jigsaw_geometry(JIGSAW_REGIONS))
+        for index, name in enumerate(JIGSAW_REGIONS):
+            self.assertEqual(geometry.box_of[index], int(name) - 1)
+        self.assertEqual(len(geometry.units), 27)
+        with self.assertRaises(ValueError):
+            get_jigsaw_geometry('1' * 81)
+
+    def test_variant_puzzles(self):
+        """The diagonal and jigsaw corpus puzzles are solved within their own units."""
+        geometries = {'diagonal': get_diagonal_geometry(), 'jigsaw': get_jigsaw_geometry(JIGSAW_REGIONS)}
+        for name, geometry in geometries.items():
+            for engine in ('propagation', 'dancing-links'):
+                with self.subTest(puzzle=name, engine=engine):
+                    solver, result = solve(VARIANT_PUZZLES[name], engine, geometry=geometry)
+                    self.assertTrue(result)
+                    solution = solver.get_puzzle().to_string()
+                    for unit in geometry.units:
+                        self.assertEqual(sorted(solution[index] for index in unit), list('123456789'))
+
+
+if __name__ == "__main__":
+    unittest.main()
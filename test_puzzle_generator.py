@@ -0,0 +1,51 @@
+# Author: Colin Francis
+# Description: Checks that generated puzzles have a unique solution and that seeded runs repeat
+import random
+import unittest
+from bitmask_algorithm import BitmaskPuzzle
+from constraint_propagation import PropagationSolveSudoku
+from puzzle_generator import generate, generate_puzzle, fill_grid
+
+
+class PuzzleGeneratorTest(unittest.TestCase):
+    """Generates small batches of puzzles from fixed seeds."""
+    def test_puzzles_are_unique(self):
+        """Every generated puzzle has exactly one solution."""
+        for puzzle in generate(5, seed=7):
+            self.assertEqual(len(puzzle), 81)
+            self.assertTrue(PropagationSolveSudoku(puzzle).is_unique())
+
+    def test_symmetric_clues(self):
+        """With rotational symmetry, a square is blank exactly when its partner is."""
+        puzzle = generate_puzzle(3, symmetry='rotational')
+        for square in range(81):
+            self.assertEqual(puzzle[square] == '.', puzzle[80 - square] == '.')
+
+    def test_seeded_runs_repeat(self):
+        """The same seed gives the same puzzles, with or without worker processes."""
+        puzzles = list(generate(3, seed=42))
+        self.assertEqual(list(generate(3, seed=42)), puzzles)
+        self.assertEqual(list(generate(3, seed=42, workers=2, chunksize=1)), puzzles)
+        self.assertNotEqual(list(generate(3, seed=43)), puzzles)
+
+    def test_fill_grid_varies(self):
+        """The same clues are completed differently by different random orders."""
+        grids = set()
+        for seed in range(5):
+            puzzle = BitmaskPuzzle('.' * 81)
+            self.assertTrue(fill_grid(puzzle, random.Random(seed)))
+            self.assertTrue(puzzle.is_valid())
+            self.assertNotIn('.', puzzle.to_string())
+            grids.add(puzzle.to_string())
+        self.assertEqual(len(grids), 5)
+
+    def test_fill_grid_unsolvable(self):
+        """A puzzle that cannot be completed is left as it was."""
+        line = '12345678.' + '........9' + '.' * 63
+        puzzle = BitmaskPuzzle(line)
+        self.assertFalse(fill_grid(puzzle, random.Random(0)))
+        self.assertEqual(puzzle.to_string(), line)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# Author: Colin Francis
+# Description: Checks solve budgets, cancellation and results across the solver engines
+import unittest
+from back_propagation_algorithm import SolveSudoku
+from engines import ENGINES
+from puzzle_corpus import PUZZLES
+from solve_result import Budget, CancelToken, SolveResult, add_stats_hook, remove_stats_hook
+from solve_result import SOLVED, UNSOLVABLE, BUDGET_EXHAUSTED, TIME_LIMIT, NODE_LIMIT, CANCELLED
+
+# a puzzle that every engine needs many search nodes for
+HARD_PUZZLE = PUZZLES['golden_nugget']
+
+
+class BudgetTest(unittest.TestCase):
+    """Checks the limits of a Budget on their own."""
+    def test_unlimited(self):
+        """A budget without limits never runs out and is checked every CHECK_INTERVAL nodes."""
+        budget = Budget(check_interval=100)
+        self.assertEqual(budget.start(), 100)
+        self.assertIsNone(budget.exceeded(10 ** 9))
+        self.assertEqual(budget.next_check(250), 350)
+
+    def test_node_limit(self):
+        """The check after the node limit is never later than the limit."""
+        budget = Budget(max_nodes=150, check_interval=100)
+        self.assertEqual(budget.start(), 100)
+        self.assertEqual(budget.next_check(100), 150)
+        self.assertIsNone(budget.exceeded(149))
+        self.assertEqual(budget.exceeded(150), NODE_LIMIT)
+
+    def test_time_limit_and_cancel(self):
+        """A spent time limit and a cancelled token each stop a solve."""
+        budget = Budget(time_limit=0.0)
+        budget.start()
+        self.assertEqual(budget.exceeded(1), TIME_LIMIT)
+        token = CancelToken()
+        budget = Budget(cancel_token=token)
+        budget.start()
+        self.assertIsNone(budget.exceeded(1))
+        token.cancel()
+        self.assertTrue(token.is_cancelled())
+        self.assertEqual(budget.exceeded(1), CANCELLED)
+
+    def test_result_truthiness(self):
+        """Only a solved result is truthy."""
+        self.assertTrue(SolveResult(SOLVED))
+        self.assertFalse(SolveResult(UNSOLVABLE))
+        self.assertFalse(SolveResult(BUDGET_EXHAUSTED, reason=NODE_LIMIT))
+
+
+class EngineBudgetTest(unittest.TestCase):
+    """Runs every registered engine under each kind of limit."""
+    def test_node_limit(self):
+        """Every engine stops at the node limit and reports why."""
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                result = engine(HARD_PUZZLE).solve(Budget(max_nodes=5))
+                self.assertEqual(result.get_status(), BUDGET_EXHAUSTED)
+                self.assertEqual(result.get_reason(), NODE_LIMIT)
+                self.assertEqual(result.get_node_count(), 5)
+
+    def test_time_limit(self):
+        """Every engine stops once its time limit has passed."""
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                result = engine(HARD_PUZZLE).solve(Budget(time_limit=0.0, check_interval=1))
+                self.assertEqual(result.get_status(), BUDGET_EXHAUSTED)
+                self.assertEqual(result.get_reason(), TIME_LIMIT)
+
+    def test_cancel(self):
+        """Every engine stops when its token has been cancelled."""
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                token = CancelToken()
+                token.cancel()
+                result = engine(HARD_PUZZLE).solve(Budget(cancel_token=token, check_interval=1))
+                self.assertEqual(result.get_status(), BUDGET_EXHAUSTED)
+                self.assertEqual(result.get_reason(), CANCELLED)
+
+    def test_budget_is_not_hit(self):
+        """A budget that is large enough does not change the result."""
+        for name, engine in ENGINES.items():
+            with self.subTest(engine=name):
+                result = engine(PUZZLES['classic']).solve(Budget(time_limit=60.0, max_nodes=10 ** 6))
+                self.assertEqual(result.get_status(), SOLVED)
+                self.assertIsNone(result.get_reason())
+
+    def test_resume_after_budget(self):
+        """SolveSudoku carries on the same search after its budget ran out."""
+        solver = SolveSudoku(PUZZLES['classic'])
+        self.assertEqual(solver.solve(Budget(max_nodes=50)).get_status(), BUDGET_EXHAUSTED)
+        self.assertTrue(solver.solve())
+        reference = SolveSudoku(PUZZLES['classic'])
+        reference.solve()
+        self.assertEqual(solver.get_puzzle().to_string(), reference.get_puzzle().to_string())
+
+    def test_stats_hook(self):
+        """A registered hook receives the stats of every solve."""
+        received = []
+        add_stats_hook(received.append)
+        try:
+            result = ENGINES['propagation'](PUZZLES['classic']).solve()
+        finally:
+            remove_stats_hook(received.append)
+        self.assertEqual(len(received), 1)
+        self.assertIs(result.get_stats(), received[0])
+        self.assertEqual(received[0].get_status(), SOLVED)
+
+
+if __name__ == "__main__":
+    unittest.main()
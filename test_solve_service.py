@@ -0,0 +1,105 @@
+# Author: Colin Francis
+# Description: Runs the solve service on localhost and checks its answers, budgets and statistics
+import asyncio
+import json
+import socket
+import unittest
+from dancing_links_algorithm import DancingLinksSolveSudoku
+from puzzle_corpus import PUZZLES, GIANT_PUZZLES
+from solve_result import SOLVED, BUDGET_EXHAUSTED
+from solve_service import SolveService, send_puzzles, request_stats
+
+
+class SolveServiceTest(unittest.IsolatedAsyncioTestCase):
+    """Starts a one-worker service on an ephemeral port for each test."""
+    async def asyncSetUp(self):
+        self.service = SolveService(workers=1, max_in_flight=2, time_limit=5.0)
+        await self.service.start(port=0)
+        self.host, self.port = self.service.get_address()[:2]
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def test_answers_and_stats(self):
+        """Every puzzle is answered with its solution, and the stats count the requests."""
+        names = ['classic', 'easy', 'inkala']
+        lines = [PUZZLES[name] + '\n' for name in names] + ['not a puzzle\n']
+        answers = {answer['id']: answer async for answer in send_puzzles(lines, self.host, self.port)}
+
+        self.assertEqual(sorted(answers), [1, 2, 3, 4])
+        for line_number, name in enumerate(names, 1):
+            solver = DancingLinksSolveSudoku(PUZZLES[name])
+            solver.solve()
+            self.assertEqual(answers[line_number]['status'], SOLVED)
+            self.assertEqual(answers[line_number]['solution'], solver.get_puzzle().to_string())
+        self.assertIsNotNone(answers[4]['error'])
+
+        stats = await request_stats(self.host, self.port)
+        self.assertEqual((stats['requests'], stats['solved'], stats['invalid']), (4, 3, 1))
+        self.assertEqual((stats['in_flight'], stats['waiting']), (0, 0))
+        self.assertLessEqual(stats['peak_in_flight'], 2)
+        self.assertGreater(stats['latency_ms']['p50'], 0.0)
+
+    async def test_budget_frees_the_worker(self):
+        """A puzzle that runs out of budget is answered, and the next puzzle is still solved."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            for request in ({'id': 1, 'puzzle': GIANT_PUZZLES['25x25'], 'engine': 'bitmask', 'time_limit': 0.2},
+                            {'id': 2, 'puzzle': PUZZLES['classic']}):
+                writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            answers = {}
+            for _ in range(2):
+                answer = json.loads(await asyncio.wait_for(reader.readline(), 10))
+                answers[answer['id']] = answer
+        finally:
+            writer.close()
+        self.assertEqual(answers[1]['status'], BUDGET_EXHAUSTED)
+        self.assertEqual(answers[1]['solution'], GIANT_PUZZLES['25x25'])
+        self.assertEqual(answers[2]['status'], SOLVED)
+
+    async def test_invalid_limit(self):
+        """A request with a limit that is not a positive number is rejected."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(json.dumps({'id': 1, 'puzzle': PUZZLES['easy'], 'max_nodes': -1}).encode() + b'\n')
+            await writer.drain()
+            answer = json.loads(await asyncio.wait_for(reader.readline(), 10))
+        finally:
+            writer.close()
+        self.assertIn('max_nodes', answer['error'])
+
+    async def test_client_that_never_reads(self):
+        """A client that does not read its answers is held back and does not block other clients."""
+        sock = socket.socket()
+        # a small receive window, so that the answers back up into the service quickly
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (self.host, self.port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        try:
+            # each answer repeats the rejected line in its error, so it is about 80KB long
+            line = json.dumps({'id': 1, 'puzzle': 'x' * 40000}).encode() + b'\n'
+            count = 200
+            for _ in range(count):
+                writer.write(line)  # not drained, as the service stops reading
+
+            requests, stats = None, None
+            for _ in range(100):
+                await asyncio.sleep(0.2)
+                stats = await request_stats(self.host, self.port)
+                if stats['requests'] == requests:
+                    break
+                requests = stats['requests']
+            self.assertLess(stats['requests'], count)
+            self.assertLessEqual(stats['unsent'], 2)
+            self.assertEqual(stats['in_flight'], 0)
+
+            answers = [answer async for answer in send_puzzles([PUZZLES['classic']], self.host, self.port)]
+            self.assertEqual(answers[0]['status'], SOLVED)
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
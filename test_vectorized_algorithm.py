@@ -0,0 +1,57 @@
+# Author: Colin Francis
+# Description: Checks the edge cases of VectorizedSolveSudoku against the other solvers
+import unittest
+from constraint_propagation import PropagationSolveSudoku
+from puzzle_corpus import PUZZLES, layout_from_string, layout_to_string
+from vectorized_algorithm import VectorizedSolveSudoku
+
+
+class VectorizedSolveSudokuTest(unittest.TestCase):
+    """Solves small batches that mix solvable, searched and impossible puzzles."""
+    def test_empty_batch(self):
+        """A batch without puzzles gives no results."""
+        self.assertEqual(VectorizedSolveSudoku([]).solve(), [])
+
+    def test_matches_propagation_solver(self):
+        """Every corpus puzzle gets the solution PropagationSolveSudoku finds."""
+        batch = [layout_from_string(puzzle) for puzzle in PUZZLES.values()]
+        self.assertEqual(VectorizedSolveSudoku(batch).solve(), [True] * len(batch))
+        for puzzle, layout in zip(PUZZLES.values(), batch):
+            solver = PropagationSolveSudoku(puzzle)
+            solver.solve()
+            self.assertEqual(layout_to_string(layout), solver.get_puzzle().to_string())
+
+    def test_search_is_counted(self):
+        """Only the puzzles that propagation cannot finish are searched."""
+        batch = [layout_from_string(PUZZLES['classic']), layout_from_string('.' * 81)]
+        solve = VectorizedSolveSudoku(batch)
+        self.assertEqual(solve.solve(), [True, True])
+        self.assertEqual(solve.get_searched_count(), 1)
+        self.assertNotIn('.', layout_to_string(batch[1]))
+
+    def test_zero_blanks_and_full_board(self):
+        """'0' is read as a blank, and a board that is already full is left as it is."""
+        solution = layout_to_string(self._solved(PUZZLES['classic']))
+        batch = [layout_from_string(PUZZLES['classic'].replace('.', '0')), layout_from_string(solution)]
+        self.assertEqual(VectorizedSolveSudoku(batch).solve(), [True, True])
+        self.assertEqual([layout_to_string(layout) for layout in batch], [solution, solution])
+
+    def test_impossible_puzzles(self):
+        """Repeated numbers, dead ends and unknown characters fail and leave the puzzle unchanged."""
+        puzzle = PUZZLES['classic']
+        lines = ['11' + '.' * 79, '12345678.' + '........9' + '.' * 63, 'x' + puzzle[1:], 'A' + puzzle[1:],
+                 '?' + puzzle[1:]]
+        batch = [layout_from_string(line) for line in lines] + [layout_from_string(puzzle)]
+        self.assertEqual(VectorizedSolveSudoku(batch).solve(), [False] * len(lines) + [True])
+        self.assertEqual([layout_to_string(layout) for layout in batch[:-1]], lines)
+
+    @staticmethod
+    def _solved(puzzle: str) -> list:
+        """Returns the solution of a puzzle as a layout."""
+        layout = layout_from_string(puzzle)
+        VectorizedSolveSudoku([layout]).solve()
+        return layout
+
+
+if __name__ == "__main__":
+    unittest.main()